@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Precomputed Analytics Refresh
+Keeps the tables in analytics_schema.sql in step with congressional_trades.
+
+Loaders call refresh_analytics() with the politicians and trade dates they
+just touched, so each run only recomputes what changed. Names and days whose
+refresh fails are queued in analytics_refresh_pending (analytics_schema.sql,
+section 6) and retried by the next refresh.
+
+Usage:
+  python analytics_refresh.py              # Full rebuild of every table
+  python analytics_refresh.py --name "Nancy Pelosi" --name "Dan Crenshaw"
+  python analytics_refresh.py --day 2024-03-01 --day 2024-03-04
+"""
+
+import os
+import argparse
+from dotenv import load_dotenv
+from supabase import create_client
+
+load_dotenv()
+
+# Names/days per RPC call - keeps the request body small on large backfills
+REFRESH_BATCH_SIZE = 500
+
+# Failed incremental refreshes, retried next time (analytics_schema.sql, section 6)
+PENDING_TABLE = "analytics_refresh_pending"
+
+# Per-politician tables (analytics_schema.sql), refreshed together
+POLITICIAN_REFRESH_RPCS = [
+    ("refresh_politician_signal_scores", "signal scores"),
+    ("refresh_politician_summary", "leaderboard summary"),
+]
+
+
+def _pending(supabase, kind):
+    """Keys queued by earlier failed refreshes - an unreadable queue just means no retries this run"""
+    try:
+        result = supabase.table(PENDING_TABLE).select("key").eq("kind", kind).execute()
+        return [row["key"] for row in result.data or []]
+    except Exception as e:
+        print(f"  [ANALYTICS] Warning: Could not read the {kind} retry queue: {e}")
+        return []
+
+
+def _settle_pending(supabase, kind, done, failed):
+    """
+    Queue the keys that failed and dequeue `done` - queued keys that have now
+    refreshed (None: everything of this kind). Raises if the failures can't be
+    recorded - the run must fail rather than forget them.
+    """
+    if failed:
+        supabase.table(PENDING_TABLE).upsert(
+            [{"kind": kind, "key": key} for key in sorted(failed)], on_conflict="kind,key"
+        ).execute()
+        print(f"  [ANALYTICS] Queued {len(failed)} {kind} refreshes for the next run")
+
+    try:
+        if done is None:
+            supabase.table(PENDING_TABLE).delete().eq("kind", kind).execute()
+            return
+        done = sorted(done)
+        for i in range(0, len(done), REFRESH_BATCH_SIZE):
+            supabase.table(PENDING_TABLE).delete().eq("kind", kind)\
+                .in_("key", done[i : i + REFRESH_BATCH_SIZE]).execute()
+    except Exception as e:
+        # Harmless - they're just refreshed once more next run
+        print(f"  [ANALYTICS] Warning: Could not clear the {kind} retry queue: {e}")
+
+
+def refresh_politician_aggregates(supabase, member_names=None):
+    """
+    Recompute per-politician aggregates (signal scores and leaderboard summary)
+    for the given names (None = everyone), plus any queued by a failed refresh.
+    Returns the number of politicians refreshed.
+    """
+    if member_names is None:
+        refreshed = 0
+        for rpc, label in POLITICIAN_REFRESH_RPCS:
+            result = supabase.rpc(rpc, {"p_member_names": None}).execute()
+            refreshed = result.data or 0
+            print(f"  [ANALYTICS] Rebuilt {label} for {refreshed} politicians")
+        _settle_pending(supabase, "politician", None, ())
+        return refreshed
+
+    queued = set(_pending(supabase, "politician"))
+    names = sorted({name for name in member_names if name} | queued)
+    if not names:
+        return 0
+
+    refreshed = 0
+    failed = set()
+    for rpc, label in POLITICIAN_REFRESH_RPCS:
+        refreshed = 0
+        for i in range(0, len(names), REFRESH_BATCH_SIZE):
+            batch = names[i : i + REFRESH_BATCH_SIZE]
+            try:
+                result = supabase.rpc(rpc, {"p_member_names": batch}).execute()
+                refreshed += result.data or 0
+            except Exception as e:
+                failed.update(batch)
+                print(f"  [ANALYTICS] Error refreshing {label}: {e}")
+
+        print(f"  [ANALYTICS] Refreshed {label} for {refreshed} politicians")
+
+    _settle_pending(supabase, "politician", queued - failed, failed)
+    return refreshed
+
+
+def refresh_daily_rollup(supabase, trade_dates=None):
+    """
+    Recompute trade_daily_rollup for the given trade dates (None = every day),
+    plus any queued by a failed refresh.
+    Returns the number of rollup rows written.
+    """
+    if trade_dates is None:
+        result = supabase.rpc("refresh_trade_daily_rollup", {"p_days": None}).execute()
+        written = result.data or 0
+        print(f"  [ANALYTICS] Rebuilt daily rollup ({written} rows)")
+        _settle_pending(supabase, "day", None, ())
+        return written
+
+    queued = set(_pending(supabase, "day"))
+    days = sorted({str(day)[:10] for day in trade_dates if day} | queued)
+    if not days:
+        return 0
+
+    written = 0
+    failed = set()
+    for i in range(0, len(days), REFRESH_BATCH_SIZE):
+        batch = days[i : i + REFRESH_BATCH_SIZE]
+        try:
+            result = supabase.rpc("refresh_trade_daily_rollup", {"p_days": batch}).execute()
+            written += result.data or 0
+        except Exception as e:
+            failed.update(batch)
+            print(f"  [ANALYTICS] Error refreshing daily rollup: {e}")
+
+    print(f"  [ANALYTICS] Refreshed daily rollup for {len(days)} days ({written} rows)")
+    _settle_pending(supabase, "day", queued - failed, failed)
+    return written
+
+
+def refresh_analytics(supabase, member_names=None, trade_dates=None):
+    """Refresh every precomputed table after a load. None = rebuild everything."""
+    refresh_politician_aggregates(supabase, member_names)
+    refresh_daily_rollup(supabase, trade_dates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh precomputed analytics tables")
+    parser.add_argument("--name", action="append",
+                        help="Only refresh this politician (repeatable)")
+    parser.add_argument("--day", action="append",
+                        help="Only refresh the daily rollup for this trade date, YYYY-MM-DD (repeatable)")
+    args = parser.parse_args()
+
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    if args.name or args.day:
+        refresh_analytics(supabase, args.name or [], args.day or [])
+    else:
+        refresh_analytics(supabase)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+-- =====================================================
+-- Congressional Trading Intelligence
+-- Precomputed Analytics Schema
+-- =====================================================
+-- Tables the API reads instead of scanning congressional_trades per request,
+-- and the functions the loaders call to keep them current.
+-- Run after create_table.sql and ingest_schema.sql in the Supabase SQL Editor.
+
+-- =====================================================
+-- 1. POLITICIAN SIGNAL SCORES
+-- =====================================================
+-- Score (1-5) per politician from trade volume and disclosure timing.
+-- Served by /signal-scores; refreshed by refresh_politician_signal_scores()
+
+CREATE TABLE IF NOT EXISTS public.politician_signal_scores (
+    member_name TEXT PRIMARY KEY,
+    trade_count INTEGER NOT NULL,
+    avg_disclosure_lag_days INTEGER,
+    signal_score SMALLINT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_signal_scores_trade_count
+    ON public.politician_signal_scores(trade_count DESC);
+
+ALTER TABLE public.politician_signal_scores ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access" ON public.politician_signal_scores;
+CREATE POLICY "Allow public read access" ON public.politician_signal_scores
+    FOR SELECT USING (true);
+
+-- Recompute scores for the given politicians (NULL = everyone)
+-- Scoring:
+--   1 point base
+--   +1 for 50+ trades, +1 for 100+ trades
+--   +1 for average disclosure lag <= 30 days, +1 for <= 14 days
+CREATE OR REPLACE FUNCTION refresh_politician_signal_scores(p_member_names TEXT[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    WITH stats AS (
+        SELECT
+            member_name,
+            COUNT(*) AS trade_count,
+            ROUND(AVG(disclosure_date - trade_date)
+                  FILTER (WHERE disclosure_date >= trade_date))::INTEGER AS avg_lag
+        FROM public.congressional_trades
+        WHERE p_member_names IS NULL OR member_name = ANY(p_member_names)
+        GROUP BY member_name
+    )
+    INSERT INTO public.politician_signal_scores
+        (member_name, trade_count, avg_disclosure_lag_days, signal_score, updated_at)
+    SELECT
+        member_name,
+        trade_count,
+        avg_lag,
+        LEAST(5,
+            1
+            + (trade_count >= 50)::INTEGER
+            + (trade_count >= 100)::INTEGER
+            + COALESCE(avg_lag <= 30, false)::INTEGER
+            + COALESCE(avg_lag <= 14, false)::INTEGER
+        ),
+        NOW()
+    FROM stats
+    ON CONFLICT (member_name) DO UPDATE SET
+        trade_count = EXCLUDED.trade_count,
+        avg_disclosure_lag_days = EXCLUDED.avg_disclosure_lag_days,
+        signal_score = EXCLUDED.signal_score,
+        updated_at = EXCLUDED.updated_at;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+
+    -- Politicians whose trades are all gone
+    DELETE FROM public.politician_signal_scores s
+    WHERE (p_member_names IS NULL OR s.member_name = ANY(p_member_names))
+      AND NOT EXISTS (
+          SELECT 1 FROM public.congressional_trades t WHERE t.member_name = s.member_name
+      );
+
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- =====================================================
+-- 2. DAILY TRADE ROLLUP
+-- =====================================================
+-- Counts and amount sums per day x ticker x sector x party x chamber.
+-- Any N-day window reads at most N x groups rows here instead of scanning
+-- congressional_trades. Loaders call refresh_trade_daily_rollup() with the
+-- trade dates they touched; each of those days is recomputed from scratch,
+-- so updates and deletes are handled the same way as inserts.
+
+-- Sector isn't provided by every source; NULL groups as 'Unknown'
+ALTER TABLE public.congressional_trades ADD COLUMN IF NOT EXISTS sector TEXT;
+
+-- Superseded by the rollup - the windowed functions no longer scan trades
+DROP INDEX IF EXISTS public.idx_trade_date_ticker_sector_type;
+
+CREATE TABLE IF NOT EXISTS public.trade_daily_rollup (
+    day DATE NOT NULL,
+    ticker TEXT NOT NULL,
+    sector TEXT NOT NULL,                 -- 'Unknown' when the trade has none
+    party TEXT NOT NULL,                  -- 'Unknown' when the trade has none
+    chamber TEXT NOT NULL,                -- 'Unknown' when the trade has none
+    trade_count INTEGER NOT NULL,
+    buys INTEGER NOT NULL,
+    sells INTEGER NOT NULL,               -- Anything other than a purchase
+    amount_low_sum NUMERIC,
+    amount_high_sum NUMERIC,
+    PRIMARY KEY (day, ticker, sector, party, chamber)
+);
+
+ALTER TABLE public.trade_daily_rollup ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access" ON public.trade_daily_rollup;
+CREATE POLICY "Allow public read access" ON public.trade_daily_rollup
+    FOR SELECT USING (true);
+
+-- Recompute the rollup for the given trade dates (NULL = every day)
+CREATE OR REPLACE FUNCTION refresh_trade_daily_rollup(p_days DATE[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    -- Two loaders refreshing the same day would collide on the primary key
+    PERFORM pg_advisory_xact_lock(hashtext('trade_daily_rollup'));
+
+    DELETE FROM public.trade_daily_rollup
+    WHERE p_days IS NULL OR day = ANY(p_days);
+
+    INSERT INTO public.trade_daily_rollup
+        (day, ticker, sector, party, chamber, trade_count, buys, sells, amount_low_sum, amount_high_sum)
+    SELECT
+        trade_date,
+        ticker,
+        COALESCE(sector, 'Unknown'),
+        COALESCE(party, 'Unknown'),
+        COALESCE(chamber, 'Unknown'),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE trade_type = 'Purchase'),
+        COUNT(*) FILTER (WHERE trade_type IS DISTINCT FROM 'Purchase'),
+        SUM(amount_low),
+        SUM(amount_high)
+    FROM public.congressional_trades
+    WHERE p_days IS NULL OR trade_date = ANY(p_days)
+    GROUP BY 1, 2, 3, 4, 5;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- =====================================================
+-- 3. WINDOWED AGGREGATES
+-- =====================================================
+-- /analytics/trending, /analytics/sector-rotation and the 30-day count in
+-- /stats sum the rollup and receive only the grouped result, however many
+-- trades fall inside the window. Latency at 10x/100x table size:
+-- benchmarks/analytics_rpc_fixture.sql
+
+-- Most-traded tickers since p_since
+CREATE OR REPLACE FUNCTION trending_tickers(p_since DATE, p_limit INTEGER DEFAULT 20)
+RETURNS TABLE (ticker TEXT, trade_count BIGINT, buys BIGINT, sells BIGINT) AS $$
+    SELECT r.ticker, SUM(r.trade_count), SUM(r.buys), SUM(r.sells)
+    FROM public.trade_daily_rollup r
+    WHERE r.day >= p_since
+    GROUP BY r.ticker
+    ORDER BY 2 DESC, r.ticker
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Buy/sell counts per sector since p_since, busiest first
+CREATE OR REPLACE FUNCTION sector_rotation(p_since DATE)
+RETURNS TABLE (sector TEXT, buys BIGINT, sells BIGINT) AS $$
+    SELECT r.sector, SUM(r.buys), SUM(r.sells)
+    FROM public.trade_daily_rollup r
+    WHERE r.day >= p_since
+    GROUP BY r.sector
+    ORDER BY SUM(r.trade_count) DESC, r.sector;
+$$ LANGUAGE sql STABLE;
+
+-- Trades since p_since
+CREATE OR REPLACE FUNCTION count_trades_since(p_since DATE)
+RETURNS BIGINT AS $$
+    SELECT COALESCE(SUM(trade_count), 0) FROM public.trade_daily_rollup WHERE day >= p_since;
+$$ LANGUAGE sql STABLE;
+
+-- =====================================================
+-- 4. POLITICIAN SUMMARY
+-- =====================================================
+-- Per-politician totals over the full dataset, served by
+-- /analytics/leaderboard and /politician/{name}. Refreshed for the politicians
+-- a load touched, alongside their signal scores (refresh_politician_aggregates()).
+-- One row per canonical politician (politician_id, ingest_schema.sql section 4)
+-- covering all their spellings; trades without an id yet get one row per
+-- member_name. Needs ingest_schema.sql run first.
+
+CREATE TABLE IF NOT EXISTS public.politician_summary (
+    summary_key TEXT NOT NULL,            -- 'id:<politician_id>', or 'name:<member_name>' without an id
+    politician_id BIGINT,
+    member_name TEXT NOT NULL,            -- Canonical name, or the spelling itself without an id
+    member_names TEXT[] NOT NULL DEFAULT '{}', -- Every spelling counted in this row
+    party TEXT,                           -- Latest party on record
+    chamber TEXT,                         -- Latest chamber on record
+    total_trades INTEGER NOT NULL,
+    purchases INTEGER NOT NULL DEFAULT 0,
+    sales INTEGER NOT NULL DEFAULT 0,
+    unique_tickers INTEGER NOT NULL,
+    tickers TEXT[] NOT NULL DEFAULT '{}', -- Sorted
+    sectors_traded INTEGER NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT politician_summary_key PRIMARY KEY (summary_key)
+);
+
+-- Columns added since the table was first created
+ALTER TABLE public.politician_summary
+    ADD COLUMN IF NOT EXISTS purchases INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS sales INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS tickers TEXT[] NOT NULL DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS summary_key TEXT,
+    ADD COLUMN IF NOT EXISTS politician_id BIGINT,
+    ADD COLUMN IF NOT EXISTS member_names TEXT[] NOT NULL DEFAULT '{}';
+
+-- Tables keyed by member_name: the rows are derived, so empty them and let
+-- the rebuild at the end of this section fill them in under the new key
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'politician_summary_key') THEN
+        DELETE FROM public.politician_summary;
+        ALTER TABLE public.politician_summary DROP CONSTRAINT IF EXISTS politician_summary_pkey;
+        ALTER TABLE public.politician_summary ALTER COLUMN summary_key SET NOT NULL;
+        ALTER TABLE public.politician_summary
+            ADD CONSTRAINT politician_summary_key PRIMARY KEY (summary_key);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_politician_summary_total_trades
+    ON public.politician_summary(total_trades DESC);
+
+ALTER TABLE public.politician_summary ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access" ON public.politician_summary;
+CREATE POLICY "Allow public read access" ON public.politician_summary
+    FOR SELECT USING (true);
+
+-- Recompute summaries for the politicians the given spellings belong to
+-- (NULL = everyone). A spelling's politician is looked up both in the trades
+-- and in the current summary, so deleted or re-assigned spellings still
+-- refresh the row they used to count towards.
+CREATE OR REPLACE FUNCTION refresh_politician_summary(p_member_names TEXT[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+    v_ids BIGINT[];
+BEGIN
+    SELECT array_agg(DISTINCT politician_id) INTO v_ids
+    FROM (
+        SELECT politician_id FROM public.congressional_trades
+        WHERE member_name = ANY(p_member_names) AND politician_id IS NOT NULL
+        UNION
+        SELECT politician_id FROM public.politician_summary
+        WHERE member_names && p_member_names AND politician_id IS NOT NULL
+    ) ids;
+
+    INSERT INTO public.politician_summary
+        (summary_key, politician_id, member_name, member_names, party, chamber, total_trades,
+         purchases, sales, unique_tickers, tickers, sectors_traded, updated_at)
+    SELECT
+        t.summary_key,
+        MAX(t.politician_id),
+        COALESCE(MAX(p.canonical_name), MIN(t.member_name)),
+        array_agg(DISTINCT t.member_name ORDER BY t.member_name),
+        (array_agg(t.party ORDER BY t.trade_date DESC) FILTER (WHERE t.party IS NOT NULL))[1],
+        (array_agg(t.chamber ORDER BY t.trade_date DESC) FILTER (WHERE t.chamber IS NOT NULL))[1],
+        COUNT(*),
+        COUNT(*) FILTER (WHERE t.trade_type = 'Purchase'),
+        COUNT(*) FILTER (WHERE t.trade_type = 'Sale'),
+        COUNT(DISTINCT t.ticker),
+        array_agg(DISTINCT t.ticker ORDER BY t.ticker),
+        COUNT(DISTINCT t.sector),
+        NOW()
+    FROM (
+        SELECT *, COALESCE('id:' || politician_id, 'name:' || member_name) AS summary_key
+        FROM public.congressional_trades
+        WHERE p_member_names IS NULL
+           OR politician_id = ANY(v_ids)
+           OR (politician_id IS NULL AND member_name = ANY(p_member_names))
+    ) t
+    LEFT JOIN public.politicians p ON p.id = t.politician_id
+    GROUP BY t.summary_key
+    ON CONFLICT (summary_key) DO UPDATE SET
+        politician_id = EXCLUDED.politician_id,
+        member_name = EXCLUDED.member_name,
+        member_names = EXCLUDED.member_names,
+        party = EXCLUDED.party,
+        chamber = EXCLUDED.chamber,
+        total_trades = EXCLUDED.total_trades,
+        purchases = EXCLUDED.purchases,
+        sales = EXCLUDED.sales,
+        unique_tickers = EXCLUDED.unique_tickers,
+        tickers = EXCLUDED.tickers,
+        sectors_traded = EXCLUDED.sectors_traded,
+        updated_at = EXCLUDED.updated_at;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+
+    -- Rows whose trades are all gone (or now counted under a politician id)
+    DELETE FROM public.politician_summary s
+    WHERE (p_member_names IS NULL OR s.member_names && p_member_names OR s.politician_id = ANY(v_ids))
+      AND NOT EXISTS (
+          SELECT 1 FROM public.congressional_trades t WHERE t.politician_id = s.politician_id
+      )
+      AND (s.politician_id IS NOT NULL OR NOT EXISTS (
+          SELECT 1 FROM public.congressional_trades t
+          WHERE t.politician_id IS NULL AND t.member_name = s.member_name
+      ));
+
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Fresh installs and tables just re-keyed above start out filled
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM public.politician_summary) THEN
+        PERFORM refresh_politician_summary();
+    END IF;
+END $$;
+
+-- =====================================================
+-- 5. POLITICIAN PROFILE
+-- =====================================================
+-- Everything /politician/{name} returns in one round trip: the summary row
+-- plus the newest p_trades trades. The name is resolved against
+-- politician_summary (a few hundred rows) - exact match on any spelling first,
+-- otherwise the busiest politician whose name contains it.
+-- When the API has already resolved the name to a canonical politician
+-- (p_politician_id, ingest_schema.sql section 4) its summary row is read by
+-- key. Trades are read through idx_politician_id_trade_date, or by member_name
+-- for rows without an id. Returns NULL when nobody matches.
+
+DROP FUNCTION IF EXISTS politician_profile(TEXT, INTEGER);
+CREATE OR REPLACE FUNCTION politician_profile(
+    p_name TEXT,
+    p_trades INTEGER DEFAULT 10,
+    p_politician_id BIGINT DEFAULT NULL
+)
+RETURNS JSON AS $$
+DECLARE
+    v_summary public.politician_summary;
+    v_trades JSON;
+BEGIN
+    IF p_politician_id IS NOT NULL THEN
+        SELECT * INTO v_summary
+        FROM public.politician_summary
+        WHERE summary_key = 'id:' || p_politician_id;
+    ELSE
+        SELECT * INTO v_summary
+        FROM public.politician_summary s
+        WHERE s.member_name ILIKE p_name
+           OR EXISTS (SELECT 1 FROM unnest(s.member_names) n WHERE n ILIKE p_name)
+        ORDER BY s.total_trades DESC
+        LIMIT 1;
+
+        IF NOT FOUND THEN
+            SELECT * INTO v_summary
+            FROM public.politician_summary s
+            WHERE s.member_name ILIKE '%' || p_name || '%'
+               OR EXISTS (SELECT 1 FROM unnest(s.member_names) n WHERE n ILIKE '%' || p_name || '%')
+            ORDER BY s.total_trades DESC
+            LIMIT 1;
+        END IF;
+    END IF;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    IF v_summary.politician_id IS NOT NULL THEN
+        SELECT json_agg(t ORDER BY t.trade_date DESC, t.id DESC) INTO v_trades
+        FROM (
+            SELECT *
+            FROM public.congressional_trades
+            WHERE politician_id = v_summary.politician_id
+            ORDER BY trade_date DESC, id DESC
+            LIMIT GREATEST(p_trades, 0)
+        ) t;
+    ELSE
+        SELECT json_agg(t ORDER BY t.trade_date DESC, t.id DESC) INTO v_trades
+        FROM (
+            SELECT *
+            FROM public.congressional_trades
+            WHERE member_name = v_summary.member_name AND politician_id IS NULL
+            ORDER BY trade_date DESC, id DESC
+            LIMIT GREATEST(p_trades, 0)
+        ) t;
+    END IF;
+
+    RETURN json_build_object(
+        'politician', v_summary.member_name,
+        'politician_id', v_summary.politician_id,
+        'party', v_summary.party,
+        'chamber', v_summary.chamber,
+        'total_trades', v_summary.total_trades,
+        'purchases', v_summary.purchases,
+        'sales', v_summary.sales,
+        'unique_tickers', v_summary.unique_tickers,
+        'tickers', v_summary.tickers,
+        'recent_trades', COALESCE(v_trades, '[]'::JSON)
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- =====================================================
+-- 6. REFRESH RETRY QUEUE
+-- =====================================================
+-- Politicians ('politician', member_name) and trade dates ('day', YYYY-MM-DD)
+-- whose incremental refresh failed. analytics_refresh.py records them here and
+-- folds them into the next refresh, so a failed RPC doesn't leave the tables
+-- above stale until the next full rebuild.
+
+CREATE TABLE IF NOT EXISTS public.analytics_refresh_pending (
+    kind TEXT NOT NULL,                   -- 'politician' or 'day'
+    key TEXT NOT NULL,
+    queued_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (kind, key)
+);
+
+ALTER TABLE public.analytics_refresh_pending ENABLE ROW LEVEL SECURITY;
+-- No policies: only the service role (loaders) touches the queue
+
+-- =====================================================
+-- VERIFICATION QUERIES
+-- =====================================================
+
+-- Full rebuild (run once after creating the tables):
+-- SELECT refresh_politician_signal_scores();
+-- SELECT refresh_trade_daily_rollup();
+-- SELECT refresh_politician_summary();
+
+-- Top scores:
+-- SELECT * FROM politician_signal_scores ORDER BY trade_count DESC LIMIT 10;
+
+-- Leaderboard:
+-- SELECT * FROM politician_summary ORDER BY total_trades DESC LIMIT 50;
+
+-- Profile with the 20 newest trades (by name, or by canonical id):
+-- SELECT politician_profile('Nancy Pelosi', 20);
+-- SELECT politician_profile(NULL, 20, (SELECT politician_id FROM politician_summary WHERE 'Nancy Pelosi' = ANY(member_names) LIMIT 1));
+
+-- One person counted under more than one leaderboard row (a spelling still without an id):
+-- SELECT a.member_name, b.member_name FROM politician_summary a
+--     JOIN politician_summary b ON a.summary_key < b.summary_key AND a.member_names && b.member_names;
+
+-- Refreshes waiting for a retry (should be empty after a healthy run):
+-- SELECT kind, COUNT(*), MIN(queued_at) FROM analytics_refresh_pending GROUP BY kind;
+
+-- Trending tickers / sector rotation for the last 30 days:
+-- SELECT * FROM trending_tickers(CURRENT_DATE - 30);
+-- SELECT * FROM sector_rotation(CURRENT_DATE - 30);
@@ -207,7 +207,35 @@ CREATE INDEX idx_sub_events_type ON subscription_events(event_type);
 CREATE INDEX idx_sub_events_created ON subscription_events(created_at);
 
 -- =====================================================
--- 5. TRIGGER FUNCTIONS
+-- 5. API USAGE TABLE
+-- =====================================================
+-- Per-minute request counters for analytics, billing and api_calls_per_day.
+-- Written in batches by the API (see record_api_usage below)
+
+CREATE TABLE IF NOT EXISTS api_usage (
+    user_id UUID REFERENCES user_profiles(id) ON DELETE CASCADE NOT NULL,
+    endpoint TEXT NOT NULL,            -- Route template, e.g. /api/v1/trades
+    minute TIMESTAMPTZ NOT NULL,       -- Start of the minute (UTC)
+    status_class SMALLINT NOT NULL,    -- 2 = 2xx, 4 = 4xx, 5 = 5xx
+    request_count INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (user_id, endpoint, minute, status_class)
+);
+
+-- Enable Row Level Security
+ALTER TABLE api_usage ENABLE ROW LEVEL SECURITY;
+
+-- Policy: Users can view their own usage
+CREATE POLICY "Users can view own API usage"
+    ON api_usage
+    FOR SELECT
+    USING (auth.uid() = user_id);
+
+-- Index for time-window rollups
+CREATE INDEX idx_api_usage_minute ON api_usage(minute);
+
+-- =====================================================
+-- 6. TRIGGER FUNCTIONS
 -- =====================================================
 
 -- Auto-update updated_at timestamp
@@ -247,7 +275,7 @@ CREATE TRIGGER on_user_profile_created
     EXECUTE FUNCTION create_user_preferences();
 
 -- =====================================================
--- 6. HELPER FUNCTIONS
+-- 7. HELPER FUNCTIONS
 -- =====================================================
 
 -- Check if user has access to a feature based on subscription tier
@@ -329,8 +357,54 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Write back a batch of buffered last_login timestamps
+-- p_rows: [{"id", "last_login"}, ...]
+-- Update-only: profiles deleted since the login was buffered stay deleted,
+-- and no other column (email, tier) is touched.
+CREATE OR REPLACE FUNCTION record_last_logins(p_rows JSON)
+RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    UPDATE user_profiles p
+    SET last_login = v.last_login
+    FROM json_to_recordset(p_rows) AS v(id UUID, last_login TIMESTAMPTZ)
+    WHERE p.id = v.id;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Add a batch of aggregated usage counters
+-- p_rows: [{"user_id", "endpoint", "minute", "status_class", "request_count"}, ...]
+-- Rows for users without a profile (deleted since the request) are skipped,
+-- so one unknown id can't fail the whole batch on the foreign key.
+CREATE OR REPLACE FUNCTION record_api_usage(p_rows JSON)
+RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    INSERT INTO api_usage (user_id, endpoint, minute, status_class, request_count)
+    SELECT r.user_id, r.endpoint, r.minute, r.status_class, r.request_count
+    FROM json_to_recordset(p_rows) AS r(
+        user_id UUID,
+        endpoint TEXT,
+        minute TIMESTAMPTZ,
+        status_class SMALLINT,
+        request_count INTEGER
+    )
+    JOIN user_profiles p ON p.id = r.user_id
+    ON CONFLICT (user_id, endpoint, minute, status_class)
+    DO UPDATE SET request_count = api_usage.request_count + EXCLUDED.request_count;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
 -- =====================================================
--- 7. INITIAL DATA
+-- 8. INITIAL DATA
 -- =====================================================
 
 -- Create a service role user profile (for system operations)
@@ -340,6 +414,7 @@ COMMENT ON TABLE user_profiles IS 'Extended user profile data with subscription
 COMMENT ON TABLE user_preferences IS 'User notification and alert preferences';
 COMMENT ON TABLE alert_history IS 'Audit log of all alerts sent to users';
 COMMENT ON TABLE subscription_events IS 'Subscription lifecycle events for billing and analytics';
+COMMENT ON TABLE api_usage IS 'Per-minute API request counters per user and endpoint';
 
 -- =====================================================
 -- VERIFICATION QUERIES
@@ -0,0 +1,265 @@
+"""
+Columnar Batch Normalizer
+Normalizes a chunk of raw source records at once into columns instead of
+building one trade dict per record.
+
+- Each field is pulled out as a whole column with a single comprehension
+- Low-cardinality fields (trade type, chamber, amount range, district, ticker)
+  go through a mapping table built from the column's distinct values, so each
+  distinct value is normalized once per batch
+- Validity is decided on the key columns first; only surviving records have
+  their remaining fields extracted
+
+Pure Python on purpose - the scrapers run on bare CI runners without pandas.
+
+Usage:
+    columns = normalize_batch(records, "hsw")
+    loader.load_columns(columns)     # COPYs straight from the columns; or columns.rows() for dicts
+"""
+
+import json
+from itertools import compress, repeat
+
+from normalization import parse_amount, normalize_trade_type, normalize_chamber, extract_state
+
+
+# Columns that hold the raw record and are only serialized to JSON when rows
+# are built - records dropped earlier (e.g. behind the watermark) never pay for it
+LAZY_JSON_COLUMNS = {"raw_data"}
+
+_encode_json = json.JSONEncoder().encode  # Same output as json.dumps, minus the per-call setup
+
+
+class TradeColumns:
+    """Equal-length column lists keyed by trade field name."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def rows(self, start=0, stop=None):
+        """Trade dicts for rows [start:stop] - built only when a caller needs them."""
+        names = list(self.columns)
+        sliced = [
+            [_encode_json(v) for v in values[start:stop]] if name in LAZY_JSON_COLUMNS else values[start:stop]
+            for name, values in self.columns.items()
+        ]
+        return list(map(dict, map(zip, repeat(names), zip(*sliced))))
+
+    def slice(self, start=0, stop=None):
+        """Rows [start:stop] as columns."""
+        return TradeColumns({name: values[start:stop] for name, values in self.columns.items()})
+
+    def take(self, mask):
+        """Keep the rows where mask is true."""
+        return TradeColumns({name: list(compress(values, mask)) for name, values in self.columns.items()})
+
+    @classmethod
+    def concat(cls, batches):
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls({})
+        names = list(batches[0].columns)
+        return cls({name: [v for b in batches for v in b.columns[name]] for name in names})
+
+
+# ============================================
+# COLUMN HELPERS
+# ============================================
+
+def _column(records, *keys, default=""):
+    """Value of the first key, falling back through the rest (like nested dict.get)."""
+    if len(keys) == 1:
+        key = keys[0]
+        return [r.get(key, default) for r in records]
+    first, rest = keys[0], keys[1:]
+    return [r[first] if first in r else _fallback(r, rest, default) for r in records]
+
+
+def _fallback(record, keys, default):
+    for key in keys:
+        if key in record:
+            return record[key]
+    return default
+
+
+def _safe(fn, value, default):
+    try:
+        return fn(value)
+    except Exception:
+        return default
+
+
+def _categorical(values, fn, default=None):
+    """Map a column through fn, calling fn once per distinct value."""
+    try:
+        table = {v: _safe(fn, v, default) for v in set(values)}
+    except TypeError:  # Unhashable values somewhere in the column
+        return [_safe(fn, v, default) for v in values]
+    return [table[v] for v in values]
+
+
+def _stripped(values):
+    return [v.strip() if isinstance(v, str) else "" for v in values]
+
+
+def _truncated(values, length=200):
+    return [v[:length] if isinstance(v, str) else "" for v in values]
+
+
+def _amount_columns(amounts):
+    pairs = _categorical(amounts, parse_amount, default=(None, None))
+    return [p[0] for p in pairs], [p[1] for p in pairs]
+
+
+# ============================================
+# SOURCES
+# ============================================
+
+def _hsw(records, context=None):
+    ticker = _stripped(_column(records, "ticker"))
+    trade_type = _categorical(_column(records, "type", "transaction_type"), normalize_trade_type)
+    trade_date = _column(records, "transaction_date", "trade_date", default=None)
+    member_name = _stripped(_column(records, "representative", "politician"))
+
+    valid = [
+        bool(t) and t != "--" and t != "N/A" and len(t) <= 10 and bool(tt) and bool(td) and bool(m)
+        for t, tt, td, m in zip(ticker, trade_type, trade_date, member_name)
+    ]
+    records = list(compress(records, valid))
+    n = len(records)
+    amount_low, amount_high = _amount_columns(_column(records, "amount"))
+
+    return TradeColumns({
+        "member_name": list(compress(member_name, valid)),
+        "chamber": ["House"] * n,
+        "party": _column(records, "party", default=None),
+        "state": _categorical(_column(records, "district"), extract_state),
+        "ticker": _categorical(list(compress(ticker, valid)), str.upper),
+        "company_name": _truncated(_column(records, "asset_description", "asset")),
+        "asset_type": ["Stock"] * n,
+        "trade_type": list(compress(trade_type, valid)),
+        "amount_low": amount_low,
+        "amount_high": amount_high,
+        "trade_date": list(compress(trade_date, valid)),
+        "disclosure_date": _column(records, "disclosure_date", default=None),
+        "source_url": _column(records, "ptr_link", "source_url"),
+        "raw_data": records,
+    })
+
+
+def _finnhub(records, ticker):
+    member_name = _stripped(_column(records, "name"))
+    trade_date = _column(records, "transactionDate")
+    trade_type = _categorical(_column(records, "transactionType"), normalize_trade_type)
+
+    valid = [bool(m) and bool(td) and bool(tt) for m, td, tt in zip(member_name, trade_date, trade_type)]
+    records = list(compress(records, valid))
+    n = len(records)
+
+    # Finnhub provides amountFrom/amountTo directly; fall back to the range string
+    amount_low = _column(records, "amountFrom", default=None)
+    amount_high = _column(records, "amountTo", default=None)
+    missing = [i for i, (lo, hi) in enumerate(zip(amount_low, amount_high)) if not lo or not hi]
+    if missing:
+        parsed = _amount_columns([records[i].get("transactionAmount", "") for i in missing])
+        for i, lo, hi in zip(missing, *parsed):
+            amount_low[i], amount_high[i] = lo, hi
+
+    return TradeColumns({
+        "member_name": list(compress(member_name, valid)),
+        "chamber": _categorical(_column(records, "position"), normalize_chamber),
+        "party": [None] * n,  # Finnhub doesn't reliably provide party
+        "state": [None] * n,  # Finnhub doesn't provide state
+        "ticker": [ticker.upper()] * n,
+        "company_name": _truncated(_column(records, "assetName")),
+        "asset_type": ["Stock"] * n,
+        "trade_type": list(compress(trade_type, valid)),
+        "amount_low": amount_low,
+        "amount_high": amount_high,
+        "trade_date": list(compress(trade_date, valid)),
+        "disclosure_date": _column(records, "filingDate", default=None),
+        "source_url": _column(records, "sourceUrl"),
+        "raw_data": records,
+    })
+
+
+_CAPITOL_TRADE_TYPES = {"buy": "Purchase", "sell": "Sale"}
+
+
+def _capitol_trades(records, context=None):
+    politicians = [r.get("politician") or {} for r in records]
+    member_name = [p.get("firstName", "") + " " + p.get("lastName", "") for p in politicians]
+    ticker = _column(records, "ticker")
+    trade_date = _column(records, "txDate")
+
+    valid = [bool(t) and bool(m) and bool(td) for t, m, td in zip(ticker, member_name, trade_date)]
+    records = list(compress(records, valid))
+    politicians = list(compress(politicians, valid))
+    sizes = [r.get("size") or {} for r in records]
+
+    return TradeColumns({
+        "member_name": list(compress(member_name, valid)),
+        "chamber": ["Senate" if p.get("chamber") == "senate" else "House" for p in politicians],
+        "party": [p.get("party", "") for p in politicians],
+        "state": [p.get("state", "") for p in politicians],
+        "ticker": list(compress(ticker, valid)),
+        "company_name": _truncated(_column(records, "assetDescription")),
+        "asset_type": _column(records, "assetType", default="Stock"),
+        "trade_type": [_CAPITOL_TRADE_TYPES.get(t, "Exchange") for t in _column(records, "txType", default=None)],
+        "amount_low": [s.get("low") for s in sizes],
+        "amount_high": [s.get("high") for s in sizes],
+        "trade_date": list(compress(trade_date, valid)),
+        "disclosure_date": _column(records, "pubDate"),
+        "source_url": [f"https://capitoltrades.com/trades/{r.get('id', '')}" for r in records],
+        "raw_data": records,
+    })
+
+
+def _quiver(records, context=None):
+    member_name = [r.get("Name") or "Unknown" for r in records]
+    ticker = _categorical([r.get("Ticker") or "" for r in records], lambda t: str(t).upper(), default="")
+    trade_date = _column(records, "Traded", default=None)
+
+    valid = [bool(td) and bool(t) and m != "Unknown" for td, t, m in zip(trade_date, ticker, member_name)]
+    records = list(compress(records, valid))
+    amount_low, amount_high = _amount_columns(_column(records, "Trade_Size_USD", default=None))
+
+    return TradeColumns({
+        "member_name": list(compress(member_name, valid)),
+        "trade_date": list(compress(trade_date, valid)),
+        "disclosure_date": _column(records, "Filed", default=None),
+        "ticker": list(compress(ticker, valid)),
+        "trade_type": [r.get("Transaction") or "Unknown" for r in records],
+        "amount_low": amount_low,
+        "amount_high": amount_high,
+        "party": _column(records, "Party", default=None),
+        "chamber": _column(records, "Chamber", default=None),
+        "company_name": [r.get("Company") or r.get("Description") for r in records],
+    })
+
+
+NORMALIZERS = {
+    "hsw": _hsw,
+    "finnhub": _finnhub,
+    "capitol_trades": _capitol_trades,
+    "quiver": _quiver,
+}
+
+
+def normalize_batch(records, source, context=None):
+    """
+    Normalize a chunk of raw records from `source` into TradeColumns, dropping
+    unusable ones. `context` is source-specific (the ticker for Finnhub).
+    """
+    records = [r for r in records if isinstance(r, dict)]
+    if not records:
+        return TradeColumns({})
+    return NORMALIZERS[source](records, context)
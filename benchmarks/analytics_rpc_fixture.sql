@@ -0,0 +1,75 @@
+-- =====================================================
+-- Analytics RPC benchmark fixture
+-- =====================================================
+-- Latency of trending_tickers() / sector_rotation() / count_trades_since()
+-- (analytics_schema.sql, served from trade_daily_rollup) against the row scan
+-- the API used to download, with congressional_trades inflated to 10x and
+-- 100x its current size.
+--
+-- Each scale runs inside a transaction that is rolled back, so the synthetic
+-- rows (and the statistics gathered on them) never become visible to the API.
+-- Needs a direct connection (psql) - the Supabase SQL Editor times out at
+-- 100x on large tables:
+--
+--   psql "$DATABASE_URL" -f benchmarks/analytics_rpc_fixture.sql
+--
+-- Compare "Execution Time" between each RPC and the old row scan. The row
+-- scan's numbers exclude transferring every row as JSON and counting them
+-- in Python, which the RPCs avoid entirely.
+
+\timing on
+
+-- Copies are kept distinct on the natural key by suffixing member_name
+CREATE OR REPLACE FUNCTION pg_temp.inflate_trades(p_factor INTEGER)
+RETURNS BIGINT AS $$
+DECLARE
+    v_rows BIGINT;
+BEGIN
+    INSERT INTO public.congressional_trades
+        (member_name, trade_date, disclosure_date, ticker, trade_type,
+         amount_low, amount_high, party, chamber, company_name, sector)
+    SELECT t.member_name || ' #' || n, t.trade_date, t.disclosure_date, t.ticker, t.trade_type,
+           t.amount_low, t.amount_high, t.party, t.chamber, t.company_name, t.sector
+    FROM public.congressional_trades t
+    CROSS JOIN generate_series(1, p_factor - 1) AS n;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    PERFORM refresh_trade_daily_rollup();
+    ANALYZE public.congressional_trades;
+    ANALYZE public.trade_daily_rollup;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ---------- 1x (current table) ----------
+
+SELECT COUNT(*) AS rows_1x FROM public.congressional_trades;
+
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT ticker, trade_type FROM public.congressional_trades WHERE trade_date >= CURRENT_DATE - 30;
+EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM trending_tickers(CURRENT_DATE - 30);
+EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM sector_rotation(CURRENT_DATE - 30);
+EXPLAIN (ANALYZE, BUFFERS) SELECT count_trades_since(CURRENT_DATE - 30);
+
+-- ---------- 10x ----------
+
+BEGIN;
+SELECT pg_temp.inflate_trades(10) AS rows_added_10x;
+
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT ticker, trade_type FROM public.congressional_trades WHERE trade_date >= CURRENT_DATE - 30;
+EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM trending_tickers(CURRENT_DATE - 30);
+EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM sector_rotation(CURRENT_DATE - 30);
+EXPLAIN (ANALYZE, BUFFERS) SELECT count_trades_since(CURRENT_DATE - 30);
+ROLLBACK;
+
+-- ---------- 100x ----------
+
+BEGIN;
+SELECT pg_temp.inflate_trades(100) AS rows_added_100x;
+
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT ticker, trade_type FROM public.congressional_trades WHERE trade_date >= CURRENT_DATE - 30;
+EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM trending_tickers(CURRENT_DATE - 30);
+EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM sector_rotation(CURRENT_DATE - 30);
+EXPLAIN (ANALYZE, BUFFERS) SELECT count_trades_since(CURRENT_DATE - 30);
+ROLLBACK;
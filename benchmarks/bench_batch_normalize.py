@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Row-wise vs columnar normalization benchmark
+Normalizes synthetic House Stock Watcher records the way scraper.py used to
+(one dict per record inside a try/except) and with batch_normalize.normalize_batch,
+then times the full path to the COPY payload TradeLoader sends (trade dicts vs
+columns encoded directly).
+
+Usage (from the repo root):
+  python benchmarks/bench_batch_normalize.py
+  python benchmarks/bench_batch_normalize.py --records 500000 --batch 5000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_normalize import normalize_batch
+from trade_loader import copy_payload
+from normalization import AMOUNT_RANGES, parse_amount, normalize_trade_type, extract_state
+
+
+# ============================================
+# BEFORE: scraper.py's per-record normalizer
+# ============================================
+
+def legacy_normalize_hsw_record(record):
+    ticker = record.get("ticker", "").strip()
+    if not ticker or ticker == "--" or ticker == "N/A" or len(ticker) > 10:
+        return None
+
+    trade_type = normalize_trade_type(record.get("type", record.get("transaction_type", "")))
+    if not trade_type:
+        return None
+
+    amount_low, amount_high = parse_amount(record.get("amount", ""))
+
+    trade_date = record.get("transaction_date", record.get("trade_date"))
+    disclosure_date = record.get("disclosure_date")
+    if not trade_date:
+        return None
+
+    member_name = record.get("representative", record.get("politician", "")).strip()
+    if not member_name:
+        return None
+
+    return {
+        "member_name": member_name,
+        "chamber": "House",
+        "party": record.get("party", None),
+        "state": extract_state(record.get("district", "")),
+        "ticker": ticker.upper(),
+        "company_name": record.get("asset_description", record.get("asset", ""))[:200],
+        "asset_type": "Stock",
+        "trade_type": trade_type,
+        "amount_low": amount_low,
+        "amount_high": amount_high,
+        "trade_date": trade_date,
+        "disclosure_date": disclosure_date,
+        "source_url": record.get("ptr_link", record.get("source_url", "")),
+        "raw_data": json.dumps(record),
+    }
+
+
+def legacy(records):
+    trades = []
+    for record in records:
+        try:
+            trade = legacy_normalize_hsw_record(record)
+        except Exception:
+            continue
+        if trade:
+            trades.append(trade)
+    return trades
+
+
+# ============================================
+# WORKLOAD
+# ============================================
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "GOOGL", "META", "--", "N/A", ""]
+TYPES = ["purchase", "sale_full", "sale_partial", "exchange"]
+MEMBERS = [f"Hon. Member {i}" for i in range(440)]
+DISTRICTS = [f"{s}{n:02d}" for s in ("CA", "TX", "NY", "FL", "PA") for n in range(1, 30)]
+
+
+def make_records(n, seed=42):
+    rng = random.Random(seed)
+    return [
+        {
+            "disclosure_year": 2024,
+            "disclosure_date": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024",
+            "transaction_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "owner": rng.choice(["self", "joint", "spouse", "--"]),
+            "ticker": rng.choice(TICKERS),
+            "asset_description": "Common Stock",
+            "type": rng.choice(TYPES),
+            "amount": rng.choice(list(AMOUNT_RANGES)),
+            "representative": rng.choice(MEMBERS),
+            "district": rng.choice(DISTRICTS),
+            "ptr_link": "https://disclosures-clerk.house.gov/public_disc/ptr-pdfs/2024/20024000.pdf",
+            "cap_gains_over_200_usd": False,
+        }
+        for _ in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row-wise vs columnar normalization")
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=1000, help="Records per normalize_batch call")
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    batches = [records[i : i + args.batch] for i in range(0, len(records), args.batch)]
+
+    started = time.perf_counter()
+    before = legacy(records)
+    before_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after = [normalize_batch(b, "hsw") for b in batches]
+    after_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after_rows = [row for columns in after for row in columns.rows()]
+    rows_s = time.perf_counter() - started
+
+    assert after_rows == before, "columnar output differs from row-wise output"
+
+    # Incremental run: only filings from the last month survive the watermark
+    def recent(date):
+        return date[:2] == "12"
+
+    started = time.perf_counter()
+    before_recent = [t for t in legacy(records) if recent(t["disclosure_date"])]
+    before_recent_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after_recent = []
+    for b in batches:
+        columns = normalize_batch(b, "hsw")
+        after_recent.extend(columns.take([recent(d) for d in columns["disclosure_date"]]).rows())
+    after_recent_s = time.perf_counter() - started
+
+    assert after_recent == before_recent
+
+    # Full backfill to the wire: normalize + the loader's COPY CSV payload
+    started = time.perf_counter()
+    before_csv = [copy_payload(legacy(b))[1].getvalue() for b in batches]
+    before_csv_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    after_csv = [copy_payload(normalize_batch(b, "hsw"))[1].getvalue() for b in batches]
+    after_csv_s = time.perf_counter() - started
+
+    assert after_csv == before_csv, "columnar COPY payload differs from row-wise payload"
+
+    n = len(records)
+    print(f"Normalizing {n:,} HSW records ({len(before):,} valid), batches of {args.batch}")
+    print(f"  row-wise          {before_s:7.3f}s  {n / before_s:>12,.0f} records/sec")
+    print(f"  columnar          {after_s:7.3f}s  {n / after_s:>12,.0f} records/sec  ({before_s / after_s:.1f}x)")
+    print(f"  columnar + rows() {after_s + rows_s:7.3f}s  {n / (after_s + rows_s):>12,.0f} records/sec  "
+          f"({before_s / (after_s + rows_s):.1f}x)  <- REST payload (PostgREST needs trade dicts)")
+    print(f"Incremental run ({len(before_recent):,} rows past the watermark)")
+    print(f"  row-wise          {before_recent_s:7.3f}s  {n / before_recent_s:>12,.0f} records/sec")
+    print(f"  columnar          {after_recent_s:7.3f}s  {n / after_recent_s:>12,.0f} records/sec  "
+          f"({before_recent_s / after_recent_s:.1f}x)")
+    print("Full backfill to the COPY payload")
+    print(f"  row-wise          {before_csv_s:7.3f}s  {n / before_csv_s:>12,.0f} records/sec")
+    print(f"  columnar          {after_csv_s:7.3f}s  {n / after_csv_s:>12,.0f} records/sec  "
+          f"({before_csv_s / after_csv_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
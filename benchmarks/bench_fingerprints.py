@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Fingerprint index benchmark
+Re-ingests a synthetic House Stock Watcher dump where only a small share of
+records is new: once normalizing everything (the old behaviour) and once
+dropping already-seen records through fingerprint_index.FingerprintIndex first.
+
+Usage (from the repo root):
+  python benchmarks/bench_fingerprints.py
+  python benchmarks/bench_fingerprints.py --records 500000 --new 0.05
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_normalize import normalize_batch
+from fingerprint_index import FingerprintIndex
+from json_stream import iter_json_array
+from bench_batch_normalize import make_records
+
+
+def normalize_all(records, batch):
+    rows = 0
+    for i in range(0, len(records), batch):
+        rows += len(normalize_batch(records[i : i + batch], "hsw").rows())
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fingerprint skipping on a re-ingest")
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--new", type=float, default=0.01, help="Share of records not seen before")
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Parse the dump the way scraper.py streams it, keeping each record's text
+    body = json.dumps(make_records(args.records)).encode("utf-8")
+    chunks = [body[i : i + 65536] for i in range(0, len(body), 65536)]
+    pairs = list(iter_json_array(chunks, with_text=True))
+    records = [record for record, _ in pairs]
+    texts = [text for _, text in pairs]
+    old = int(len(records) * (1 - args.new))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fingerprints.sqlite")
+
+        # Previous run saw everything but the tail
+        index = FingerprintIndex(path)
+        index.filter("hsw", records[:old], texts[:old])
+        index.commit()
+        index.close()
+
+        started = time.perf_counter()
+        before = normalize_all(records, args.batch)
+        before_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = FingerprintIndex(path)
+        after = 0
+        for i in range(0, len(records), args.batch):
+            fresh = index.filter("hsw", records[i : i + args.batch], texts[i : i + args.batch])
+            if fresh:
+                after += len(normalize_batch(fresh, "hsw").rows())
+        index.commit()
+        after_s = time.perf_counter() - started
+        skipped = index.skipped
+        index.close()
+        size = os.path.getsize(path)
+
+    n = len(records)
+    print(f"Re-ingesting {n:,} HSW records, {n - old:,} new ({skipped:,} skipped by fingerprint)")
+    print(f"  normalize all       {before_s:7.3f}s  {n / before_s:>12,.0f} records/sec  ({before:,} rows)")
+    print(f"  fingerprint + delta {after_s:7.3f}s  {n / after_s:>12,.0f} records/sec  ({after:,} rows, "
+          f"{before_s / after_s:.1f}x)")
+    print(f"  index size          {size / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Amount / trade-type parsing benchmark
+Compares the per-record parsing scraper.py used to do (table scan + inline
+`import re` on every call) with the memoized parsers in normalization.py.
+
+Usage (from the repo root):
+  python benchmarks/bench_normalize.py
+  python benchmarks/bench_normalize.py --records 500000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import normalization
+from normalization import AMOUNT_RANGES
+
+
+# ============================================
+# BEFORE: scraper.py as it was
+# ============================================
+
+def legacy_parse_amount(amount_str):
+    if not amount_str:
+        return None, None
+
+    amount_str = amount_str.strip()
+
+    if amount_str in AMOUNT_RANGES:
+        return AMOUNT_RANGES[amount_str]
+
+    for key, (low, high) in AMOUNT_RANGES.items():
+        if key in amount_str or amount_str in key:
+            return low, high
+
+    import re
+    numbers = re.findall(r'[\d,]+', amount_str)
+    if len(numbers) >= 2:
+        try:
+            return int(numbers[0].replace(',', '')), int(numbers[1].replace(',', ''))
+        except ValueError:
+            pass
+    elif len(numbers) == 1:
+        try:
+            val = int(numbers[0].replace(',', ''))
+            return val, val
+        except ValueError:
+            pass
+
+    return None, None
+
+
+def legacy_normalize_trade_type(raw_type):
+    if not raw_type:
+        return None
+    raw = raw_type.lower().strip()
+    if "purchase" in raw or "buy" in raw:
+        return "Purchase"
+    elif "sale" in raw or "sell" in raw:
+        return "Sale"
+    elif "exchange" in raw or "swap" in raw:
+        return "Exchange"
+    return None
+
+
+# ============================================
+# WORKLOAD
+# ============================================
+
+# Roughly what the HSW dump looks like: mostly canonical ranges, plus the
+# padded / free-form strings that miss the exact lookup
+AMOUNTS = list(AMOUNT_RANGES) * 20 + [
+    " $1,001 - $15,000 ",
+    "$1,001 - $15,000.00",
+    "1001 - 15000",
+    "$15,000",
+    "Spouse/DC Over $1,000,000",
+    "",
+]
+TYPES = ["purchase", "sale_full", "sale_partial", "exchange", "Purchase", "Sale (Full)", "Sale (Partial)"]
+
+
+def make_records(n, seed=42):
+    rng = random.Random(seed)
+    return [(rng.choice(AMOUNTS), rng.choice(TYPES)) for _ in range(n)]
+
+
+def run(label, records, parse_amount, normalize_trade_type):
+    started = time.perf_counter()
+    for amount, trade_type in records:
+        parse_amount(amount)
+        normalize_trade_type(trade_type)
+    elapsed = time.perf_counter() - started
+    rate = len(records) / elapsed
+    print(f"  {label:8s} {elapsed:8.3f}s  {rate:>12,.0f} records/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark amount/trade-type parsing")
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+
+    # Same answers before and after, apart from decimals the old regex split in two
+    for amount, _ in set(records):
+        if "." not in amount:
+            assert legacy_parse_amount(amount) == normalization.parse_amount(amount), amount
+
+    print(f"Parsing {len(records):,} records ({len(set(records))} distinct value pairs)")
+    before = run("before", records, legacy_parse_amount, legacy_normalize_trade_type)
+    after = run("after", records, normalization.parse_amount, normalization.normalize_trade_type)
+    print(f"  speedup  {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
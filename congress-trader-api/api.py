@@ -45,10 +45,10 @@ def get_stats():
     tickers_result = supabase.table("congressional_trades").select("ticker").execute()
     unique_tickers = len(set([t["ticker"] for t in tickers_result.data]))
 
-    # Get recent trades count (last 30 days)
+    # Get recent trades count (last 30 days), summed from the daily rollup
     thirty_days_ago = (datetime.now() - timedelta(days=30)).date().isoformat()
-    recent_result = supabase.table("congressional_trades").select("id", count="exact").gte("trade_date", thirty_days_ago).execute()
-    recent_trades = recent_result.count
+    recent_result = supabase.rpc("count_trades_since", {"p_since": thirty_days_ago}).execute()
+    recent_trades = recent_result.data or 0
 
     return {
         "total_trades": total_trades,
@@ -157,26 +157,14 @@ def get_politician_trades(name: str, limit: int = 500):
     return result.data
 
 @app.get("/politician/{name}")
-def get_politician_profile(name: str):
-    result = supabase.table("congressional_trades").select("*").ilike("member_name", f"%{name}%").execute()
+def get_politician_profile(name: str, include_trades: int = 10):
+    """Profile counts, tickers and the newest include_trades trades in one query."""
+    include_trades = max(0, min(include_trades, 500))
+    result = supabase.rpc("politician_profile", {"p_name": name, "p_trades": include_trades}).execute()
     
     if not result.data:
         return {"message": f"No trades found for {name}"}
     
-    trades = result.data
-    tickers = list(set([t["ticker"] for t in trades]))
-    purchases = len([t for t in trades if t["trade_type"] == "Purchase"])
-    sales = len([t for t in trades if t["trade_type"] == "Sale"])
-    
-    return {
-        "politician": trades[0]["member_name"],
-        "party": trades[0].get("party"),
-        "chamber": trades[0].get("chamber"),
-        "state": trades[0].get("state"),
-        "total_trades": len(trades),
-        "purchases": purchases,
-        "sales": sales,
-        "unique_tickers": len(tickers),
-        "tickers": sorted(tickers),
-        "recent_trades": trades[:10]
-    }
+    profile = result.data
+    profile.setdefault("state", None)
+    return profile
@@ -3,10 +3,13 @@ Congressional Trading Intelligence API v2.0
 Now with Authentication, Subscription Tiers, and Premium Features!
 """
 
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from supabase import create_client
 import os
+import asyncio
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
@@ -18,8 +21,23 @@ from auth_middleware import (
     get_optional_user,
     require_subscription,
     require_feature,
-    get_user_limits
+    get_user_limits,
+    invalidate_user_cache,
+    load_tier_rules,
+    profile_cache,
+    identify_caller,
+    rate_limiter,
+    usage_recorder,
+    flush_api_usage,
+    flush_last_logins,
+    LAST_LOGIN_FLUSH_SECONDS
 )
+from cache import ResponseCache
+from pagination import fetch_page
+from export import EXPORT_FORMATS, gzip_stream
+from name_index import NameIndex
+from rate_limit import RateLimitMiddleware
+from usage import UsageMiddleware, USAGE_FLUSH_SECONDS
 
 load_dotenv()
 
@@ -39,6 +57,21 @@ ALLOWED_ORIGINS = [
     "http://localhost:8080",
 ]
 
+# Rate limits are checked before any endpoint touches Supabase.
+# Added before CORS so that 429 responses still carry CORS headers.
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limiter,
+    identify=identify_caller
+)
+
+# Usage is recorded around the rate limiter so 429s are counted too
+app.add_middleware(
+    UsageMiddleware,
+    recorder=usage_recorder,
+    identify=identify_caller
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -52,6 +85,89 @@ supabase = create_client(
     os.getenv("SUPABASE_KEY")
 )
 
+# /stats is hit on every dashboard page load - share one answer across requests
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "60"))
+stats_cache = ResponseCache(ttl_seconds=STATS_CACHE_TTL_SECONDS)
+
+# Politician name -> canonical id, for lookups and autocomplete (name_index.py)
+POLITICIAN_INDEX_REFRESH_SECONDS = float(os.getenv("POLITICIAN_INDEX_REFRESH_SECONDS", "600"))
+politician_index = NameIndex()
+
+# PostgREST returns at most this many rows per request
+DIRECTORY_PAGE_SIZE = 1000
+
+def _select_all(table: str, columns: str) -> List[Dict[str, Any]]:
+    """Every row of a small table, one page at a time"""
+    rows = []
+    while True:
+        page = supabase.table(table).select(columns)\
+            .range(len(rows), len(rows) + DIRECTORY_PAGE_SIZE - 1)\
+            .execute().data
+        rows.extend(page)
+        if len(page) < DIRECTORY_PAGE_SIZE:
+            return rows
+
+def load_politician_index():
+    """Rebuild politician_index from the politician directory (ingest_schema.sql)"""
+    politicians = _select_all("politicians", "id,canonical_name,chamber,state")
+    aliases = _select_all("politician_aliases", "alias,politician_id")
+    trade_counts = {
+        row["politician_id"]: row["total_trades"]
+        for row in _select_all("politician_summary", "politician_id,total_trades")
+        if row["politician_id"] is not None
+    }
+    politician_index.rebuild(politicians, aliases, trade_counts)
+
+def _filter_politician(query, name: str):
+    """
+    Restrict a congressional_trades query to one politician
+    Equality on the indexed politician_id when the name resolves to exactly one
+    politician; the old substring match is kept for names the directory
+    doesn't know yet and for names shared by several politicians.
+    """
+    politician_id = politician_index.resolve(name)
+    if politician_id is not None:
+        return query.eq("politician_id", politician_id)
+    return query.ilike("member_name", f"%{name}%")
+
+# =====================================================
+# BACKGROUND TASKS
+# =====================================================
+
+async def _run_periodically(job, interval_seconds: float):
+    """Run a blocking job in the threadpool every interval until cancelled"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(job)
+        except Exception as e:
+            print(f"Background job {job.__name__} failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Tier rules are read once here instead of via RPC on every request
+    await run_in_threadpool(load_tier_rules)
+
+    try:
+        await run_in_threadpool(load_politician_index)
+    except Exception as e:
+        print(f"Could not load politician index, falling back to name matching: {str(e)}")
+
+    app.state.background_tasks = [
+        asyncio.create_task(_run_periodically(load_politician_index, POLITICIAN_INDEX_REFRESH_SECONDS)),
+        asyncio.create_task(_run_periodically(flush_last_logins, LAST_LOGIN_FLUSH_SECONDS)),
+        asyncio.create_task(_run_periodically(flush_api_usage, USAGE_FLUSH_SECONDS)),
+    ]
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in app.state.background_tasks:
+        task.cancel()
+
+    # Final flush so buffered writes survive a deploy/restart
+    await run_in_threadpool(flush_last_logins)
+    await run_in_threadpool(flush_api_usage)
+
 # =====================================================
 # PYDANTIC MODELS (Request/Response schemas)
 # =====================================================
@@ -101,16 +217,17 @@ def health_check():
     return {
         "status": "healthy",
         "database": db_status,
+        "cache": {
+            "stats": stats_cache.stats(),
+            "profiles": profile_cache.stats()
+        },
+        "rate_limiter": rate_limiter.stats(),
+        "usage": usage_recorder.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
-@app.get("/stats")
-async def get_stats(user: Optional[Dict] = Depends(get_optional_user)):
-    """
-    Get dashboard statistics
-    Free users: Basic stats only
-    Paid users: Enhanced stats with real-time data
-    """
+def _compute_base_stats() -> Dict[str, Any]:
+    """Totals shown to every visitor (up to three Supabase round trips)"""
     # Basic stats for everyone — use count="exact" with head=True to avoid fetching rows
     total_result = supabase.table("congressional_trades").select("id", count="exact").execute()
     total_trades = total_result.count
@@ -130,21 +247,33 @@ async def get_stats(user: Optional[Dict] = Depends(get_optional_user)):
         tick_result = supabase.table("congressional_trades").select("ticker").execute()
         unique_tickers = len(set(t["ticker"] for t in tick_result.data))
 
-    stats = {
+    return {
         "total_trades": total_trades,
         "unique_politicians": unique_politicians,
         "unique_tickers": unique_tickers,
     }
 
+def _compute_recent_trade_count() -> int:
+    """Trades in the last 30 days (paid users only) - summed from the daily rollup"""
+    thirty_days_ago = (datetime.now() - timedelta(days=30)).date().isoformat()
+    recent_result = supabase.rpc("count_trades_since", {"p_since": thirty_days_ago}).execute()
+    return recent_result.data or 0
+
+@app.get("/stats")
+async def get_stats(user: Optional[Dict] = Depends(get_optional_user)):
+    """
+    Get dashboard statistics
+    Free users: Basic stats only
+    Paid users: Enhanced stats with real-time data
+    """
+    # Served from the shared cache - Supabase sees at most one refresh per TTL
+    stats = dict(await stats_cache.get_or_compute("stats:base", _compute_base_stats))
+
     # Enhanced stats for paid users
     if user and user["subscription_tier"] in ["insider", "elite"]:
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).date().isoformat()
-        recent_result = supabase.table("congressional_trades")\
-            .select("id", count="exact")\
-            .gte("trade_date", thirty_days_ago)\
-            .execute()
-
-        stats["recent_trades_30d"] = recent_result.count
+        stats["recent_trades_30d"] = await stats_cache.get_or_compute(
+            "stats:recent_30d", _compute_recent_trade_count
+        )
         stats["premium_features_unlocked"] = True
 
     return stats
@@ -153,16 +282,23 @@ async def get_stats(user: Optional[Dict] = Depends(get_optional_user)):
 # FREE TIER ENDPOINTS (7-day delayed data)
 # =====================================================
 
+# Largest page a listing endpoint will return
+MAX_PAGE_SIZE = 1000
+
 @app.get("/trades")
 async def get_trades(
-    limit: int = 100,
-    offset: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     user: Optional[Dict] = Depends(get_optional_user)
 ):
     """
     Get congressional trades
     Free: 7-day delayed
     Insider/Elite: Real-time
+
+    Pass the returned next_cursor back as ?cursor= for the next page
+    (offset still works but gets slower the deeper you go)
     """
     # Apply delay for free users
     if not user or user["subscription_tier"] == "free":
@@ -171,55 +307,60 @@ async def get_trades(
         # rather than the most recent tiny trades which are unimpressive
         query = supabase.table("congressional_trades")\
             .select("*")\
-            .lte("trade_date", delay_date)\
-            .order("amount_low", desc=True, nullsfirst=False)
+            .lte("trade_date", delay_date)
+        sort_column = "amount_low"
         delayed = True
     else:
         # Paid users get real-time sorted by date (newest first)
         query = supabase.table("congressional_trades")\
-            .select("*")\
-            .order("trade_date", desc=True)
+            .select("*")
+        sort_column = "trade_date"
         delayed = False
 
-    result = query.limit(limit).range(offset, offset + limit - 1).execute()
+    trades, next_cursor = fetch_page(query, sort_column, limit, offset, cursor)
 
     return {
-        "trades": result.data,
-        "count": len(result.data),
+        "trades": trades,
+        "count": len(trades),
+        "next_cursor": next_cursor,
         "delayed": delayed,
         "upgrade_message": "Upgrade to Insider for real-time trades" if delayed else None
     }
 
+@app.get("/politicians/search")
+async def search_politicians(q: str, limit: int = 10):
+    """
+    Autocomplete politician names (public data)
+    Served from the in-memory name index - prefix matches on any word of any
+    spelling, typo-tolerant fallback when nothing matches
+    """
+    limit = max(1, min(limit, 50))
+    return {"query": q, "results": politician_index.search(q, limit)}
+
+# Most trades /politician/{name}?include_trades= will return
+PROFILE_MAX_TRADES = 500
+
 @app.get("/politician/{name}")
-async def get_politician_profile(name: str):
+async def get_politician_profile(name: str, include_trades: int = 10):
     """
     Get politician trading profile (public data)
+
+    One round trip: counts and tickers for every spelling of the politician,
+    plus the newest include_trades trades (up to PROFILE_MAX_TRADES) as recent_trades
     """
-    result = supabase.table("congressional_trades")\
-        .select("*")\
-        .ilike("member_name", f"%{name}%")\
-        .execute()
+    include_trades = max(0, min(include_trades, PROFILE_MAX_TRADES))
+    result = supabase.rpc("politician_profile", {
+        "p_name": name,
+        "p_trades": include_trades,
+        "p_politician_id": politician_index.resolve(name)
+    }).execute()
 
     if not result.data:
         raise HTTPException(status_code=404, detail=f"No trades found for {name}")
 
-    trades = result.data
-    tickers = list(set([t["ticker"] for t in trades]))
-    purchases = len([t for t in trades if t["trade_type"] == "Purchase"])
-    sales = len([t for t in trades if t["trade_type"] == "Sale"])
-
-    return {
-        "politician": trades[0]["member_name"],
-        "party": trades[0].get("party"),
-        "chamber": trades[0].get("chamber"),
-        "state": trades[0].get("state"),
-        "total_trades": len(trades),
-        "purchases": purchases,
-        "sales": sales,
-        "unique_tickers": len(tickers),
-        "tickers": sorted(tickers),
-        "recent_trades": trades[:10]
-    }
+    profile = result.data
+    profile.setdefault("state", None)  # Not stored in congressional_trades
+    return profile
 
 @app.get("/politician/{name}/trades")
 async def get_politician_trades(name: str):
@@ -227,9 +368,8 @@ async def get_politician_trades(name: str):
     Get all trades for a politician by name — flat list format.
     Used by the dashboard search feature.
     """
-    result = supabase.table("congressional_trades")\
-        .select("*")\
-        .ilike("member_name", f"%{name}%")\
+    query = supabase.table("congressional_trades").select("*")
+    result = _filter_politician(query, name)\
         .order("trade_date", desc=True)\
         .execute()
 
@@ -260,52 +400,16 @@ async def get_trades_by_ticker(ticker: str):
 async def get_signal_scores():
     """
     Return pre-computed signal scores per politician.
-    Calculates from trade history: trade count + avg disclosure lag.
+    Scores (trade count + avg disclosure lag) are materialized into
+    politician_signal_scores by the loaders - see analytics_refresh.py.
     Public endpoint — star ratings shown to all users (detail locked for free tier in UI).
     """
-    result = supabase.table("congressional_trades")\
-        .select("member_name, trade_date, disclosure_date")\
+    result = supabase.table("politician_signal_scores")\
+        .select("member_name, trade_count, avg_disclosure_lag_days, signal_score")\
+        .order("trade_count", desc=True)\
         .execute()
 
-    # Aggregate per politician
-    stats: Dict[str, Any] = {}
-    for t in result.data:
-        name = t["member_name"]
-        if name not in stats:
-            stats[name] = {"trade_count": 0, "lags": []}
-        stats[name]["trade_count"] += 1
-
-        # Calculate disclosure lag if both dates present
-        if t.get("trade_date") and t.get("disclosure_date"):
-            try:
-                td = datetime.strptime(t["trade_date"], "%Y-%m-%d")
-                dd = datetime.strptime(t["disclosure_date"], "%Y-%m-%d")
-                lag = (dd - td).days
-                if lag >= 0:
-                    stats[name]["lags"].append(lag)
-            except (ValueError, TypeError):
-                pass
-
-    scores = []
-    for name, s in stats.items():
-        count = s["trade_count"]
-        avg_lag = round(sum(s["lags"]) / len(s["lags"])) if s["lags"] else None
-
-        # Score 1-5: more trades + lower lag = higher score
-        score = 1
-        if count >= 50:  score += 1
-        if count >= 100: score += 1
-        if avg_lag is not None and avg_lag <= 30: score += 1
-        if avg_lag is not None and avg_lag <= 14: score += 1
-
-        scores.append({
-            "member_name": name,
-            "trade_count": count,
-            "avg_disclosure_lag_days": avg_lag,
-            "signal_score": min(score, 5)
-        })
-
-    return scores
+    return result.data
 
 # =====================================================
 # AUTHENTICATED ENDPOINTS (Login required)
@@ -354,6 +458,7 @@ async def update_preferences(
         .update(update_data)\
         .eq("user_id", user["id"])\
         .execute()
+    invalidate_user_cache(user["id"])
 
     return {
         "message": "Preferences updated successfully",
@@ -415,6 +520,7 @@ async def add_to_watchlist(
                 .update({"watched_politicians": current_list})\
                 .eq("user_id", user["id"])\
                 .execute()
+            invalidate_user_cache(user["id"])
 
     elif item.type == "ticker":
         current_list = prefs_data.get("watched_tickers", [])
@@ -424,6 +530,7 @@ async def add_to_watchlist(
                 .update({"watched_tickers": current_list})\
                 .eq("user_id", user["id"])\
                 .execute()
+            invalidate_user_cache(user["id"])
 
     return {"message": f"Added {item.value} to watchlist"}
 
@@ -484,39 +591,18 @@ async def get_trending_stocks(
     """
     cutoff_date = (datetime.now() - timedelta(days=days)).date().isoformat()
 
-    result = supabase.table("congressional_trades")\
-        .select("ticker, trade_type")\
-        .gte("trade_date", cutoff_date)\
-        .execute()
-
-    # Count by ticker
-    ticker_counts = {}
-    ticker_sentiment = {}
-
-    for trade in result.data:
-        ticker = trade["ticker"]
-        if ticker not in ticker_counts:
-            ticker_counts[ticker] = 0
-            ticker_sentiment[ticker] = {"buys": 0, "sells": 0}
+    # Grouped in the database (analytics_schema.sql) - only the top 20 come back
+    result = supabase.rpc("trending_tickers", {"p_since": cutoff_date, "p_limit": 20}).execute()
 
-        ticker_counts[ticker] += 1
-
-        if trade["trade_type"] == "Purchase":
-            ticker_sentiment[ticker]["buys"] += 1
-        else:
-            ticker_sentiment[ticker]["sells"] += 1
-
-    # Sort by count
     trending = []
-    for ticker, count in sorted(ticker_counts.items(), key=lambda x: x[1], reverse=True)[:20]:
-        sentiment = ticker_sentiment[ticker]
-        net_buys = sentiment["buys"] - sentiment["sells"]
+    for row in result.data or []:
+        net_buys = row["buys"] - row["sells"]
 
         trending.append({
-            "ticker": ticker,
-            "trade_count": count,
-            "buys": sentiment["buys"],
-            "sells": sentiment["sells"],
+            "ticker": row["ticker"],
+            "trade_count": row["trade_count"],
+            "buys": row["buys"],
+            "sells": row["sells"],
             "sentiment": "Bullish" if net_buys > 0 else "Bearish" if net_buys < 0 else "Neutral"
         })
 
@@ -557,48 +643,31 @@ async def get_politician_leaderboard(
     """
     Get politician trading leaderboard with advanced analytics
     Requires: Elite subscription
+
+    Served from politician_summary, which the loaders keep current over the
+    full dataset (see analytics_refresh.py)
     """
-    result = supabase.table("congressional_trades")\
-        .select("member_name, party, ticker, sector")\
-        .limit(5000)\
+    result = supabase.table("politician_summary")\
+        .select("politician_id, member_name, party, total_trades, unique_tickers, sectors_traded", count="exact")\
+        .order("total_trades", desc=True)\
+        .limit(50)\
         .execute()
 
-    # Calculate stats per politician
-    politician_stats = {}
-
-    for trade in result.data:
-        name = trade["member_name"]
-        if name not in politician_stats:
-            politician_stats[name] = {
-                "name": name,
-                "party": trade.get("party"),
-                "total_trades": 0,
-                "unique_stocks": set(),
-                "sectors": set()
-            }
-
-        stats = politician_stats[name]
-        stats["total_trades"] += 1
-        stats["unique_stocks"].add(trade["ticker"])
-        if trade.get("sector"):
-            stats["sectors"].add(trade["sector"])
-
-    # Format and sort
-    leaderboard = []
-    for name, stats in politician_stats.items():
-        leaderboard.append({
-            "politician": name,
-            "party": stats["party"],
-            "total_trades": stats["total_trades"],
-            "unique_stocks": len(stats["unique_stocks"]),
-            "sectors_traded": len(stats["sectors"])
-        })
-
-    leaderboard.sort(key=lambda x: x["total_trades"], reverse=True)
+    leaderboard = [
+        {
+            "politician": row["member_name"],
+            "politician_id": row["politician_id"],
+            "party": row["party"],
+            "total_trades": row["total_trades"],
+            "unique_stocks": row["unique_tickers"],
+            "sectors_traded": row["sectors_traded"]
+        }
+        for row in result.data
+    ]
 
     return {
-        "leaderboard": leaderboard[:50],
-        "total_politicians": len(leaderboard)
+        "leaderboard": leaderboard,
+        "total_politicians": result.count
     }
 
 @app.get("/analytics/sector-rotation")
@@ -612,39 +681,21 @@ async def get_sector_rotation(
     """
     cutoff_date = (datetime.now() - timedelta(days=days)).date().isoformat()
 
-    result = supabase.table("congressional_trades")\
-        .select("sector, trade_type")\
-        .gte("trade_date", cutoff_date)\
-        .execute()
-
-    # Count by sector
-    sector_stats = {}
-
-    for trade in result.data:
-        sector = trade.get("sector", "Unknown")
-        if sector not in sector_stats:
-            sector_stats[sector] = {"buys": 0, "sells": 0}
-
-        if trade["trade_type"] == "Purchase":
-            sector_stats[sector]["buys"] += 1
-        else:
-            sector_stats[sector]["sells"] += 1
+    # Grouped in the database (analytics_schema.sql), busiest sector first
+    result = supabase.rpc("sector_rotation", {"p_since": cutoff_date}).execute()
 
-    # Format results
     sectors = []
-    for sector, stats in sector_stats.items():
-        net = stats["buys"] - stats["sells"]
+    for row in result.data or []:
+        net = row["buys"] - row["sells"]
         sectors.append({
-            "sector": sector,
-            "total_trades": stats["buys"] + stats["sells"],
-            "buys": stats["buys"],
-            "sells": stats["sells"],
+            "sector": row["sector"],
+            "total_trades": row["buys"] + row["sells"],
+            "buys": row["buys"],
+            "sells": row["sells"],
             "net_position": net,
             "sentiment": "Bullish" if net > 5 else "Bearish" if net < -5 else "Neutral"
         })
 
-    sectors.sort(key=lambda x: x["total_trades"], reverse=True)
-
     return {
         "period_days": days,
         "sectors": sectors
@@ -656,8 +707,9 @@ async def get_sector_rotation(
 
 @app.get("/api/v1/trades")
 async def api_get_trades(
-    limit: int = 1000,
-    offset: int = 0,
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     politician: Optional[str] = None,
     ticker: Optional[str] = None,
     user: Dict = Depends(require_feature('api_access'))
@@ -666,23 +718,78 @@ async def api_get_trades(
     Programmatic API access to trade data
     Requires: Elite subscription
     Rate limit: 1000 requests/hour
+
+    Walk the full history with ?cursor=<next_cursor> - constant cost per page,
+    and pages don't shift when new trades are loaded mid-walk
     """
     query = supabase.table("congressional_trades").select("*")
 
     if politician:
-        query = query.ilike("member_name", f"%{politician}%")
+        query = _filter_politician(query, politician)
     if ticker:
         query = query.ilike("ticker", ticker)
 
-    result = query.order("trade_date", desc=True).limit(limit).range(offset, offset + limit - 1).execute()
+    data, next_cursor = fetch_page(query, "trade_date", limit, offset, cursor)
 
     return {
-        "data": result.data,
-        "count": len(result.data),
+        "data": data,
+        "count": len(data),
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": next_cursor
     }
 
+# Rows read from the database per round trip during an export
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+def _iter_trade_chunks(politician: Optional[str], ticker: Optional[str]):
+    """Yield the filtered trades newest-first, one keyset page at a time"""
+    cursor = None
+    while True:
+        query = supabase.table("congressional_trades").select("*")
+        if politician:
+            query = _filter_politician(query, politician)
+        if ticker:
+            query = query.ilike("ticker", ticker)
+
+        rows, cursor = fetch_page(query, "trade_date", EXPORT_CHUNK_SIZE, cursor=cursor)
+        yield rows
+
+        if not cursor:
+            break
+
+@app.get("/api/v1/trades/export")
+async def api_export_trades(
+    request: Request,
+    format: str = "ndjson",
+    politician: Optional[str] = None,
+    ticker: Optional[str] = None,
+    user: Dict = Depends(require_feature('api_access'))
+):
+    """
+    Stream the full trade history as NDJSON or CSV
+    Requires: Elite subscription
+
+    Rows are streamed as they are read, so memory stays flat however
+    large the export. Gzipped when the client sends Accept-Encoding: gzip.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    stream, media_type, extension = EXPORT_FORMATS[format]
+    body = stream(_iter_trade_chunks(politician, ticker))
+    headers = {"Content-Disposition": f'attachment; filename="congressional_trades.{extension}"'}
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
 # =====================================================
 # ADMIN ENDPOINTS (Future: Admin panel)
 # =====================================================
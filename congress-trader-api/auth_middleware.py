@@ -9,17 +9,95 @@ from supabase import create_client
 import os
 from dotenv import load_dotenv
 from functools import wraps
+from datetime import datetime, timezone
+import threading
+import hashlib
 import jwt
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+from cache import LRUCache
+from rate_limit import RateLimiter, backend_from_env
+from usage import UsageRecorder
 
 load_dotenv()
 
 # Initialize Supabase client
+SUPABASE_URL = os.getenv("SUPABASE_URL")
 supabase = create_client(
-    os.getenv("SUPABASE_URL"),
+    SUPABASE_URL,
     os.getenv("SUPABASE_KEY")
 )
 
+# Local JWT verification settings
+# HS256 projects sign with the JWT secret (Project Settings -> API -> JWT Secret);
+# projects on asymmetric signing keys publish them at the JWKS endpoint instead
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+JWKS_CACHE_SECONDS = int(os.getenv("JWKS_CACHE_SECONDS", "600"))
+
+# How often buffered last_login timestamps are written back
+LAST_LOGIN_FLUSH_SECONDS = float(os.getenv("LAST_LOGIN_FLUSH_SECONDS", "30"))
+
+# Per-user profile/tier/limits cache
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+profile_cache = LRUCache(maxsize=PROFILE_CACHE_SIZE, ttl_seconds=PROFILE_CACHE_TTL_SECONDS)
+
+# Token hash -> user id for tokens only Supabase Auth could verify (no local
+# key), so identify_caller can still find the caller's bucket and tier
+token_users = LRUCache(maxsize=PROFILE_CACHE_SIZE, ttl_seconds=PROFILE_CACHE_TTL_SECONDS)
+
+# =====================================================
+# TIER RULES
+# =====================================================
+# Python copy of get_tier_limits() / user_has_access() from auth_schema.sql,
+# so tier checks don't cost an RPC per request.
+# load_tier_rules() refreshes TIER_LIMITS from the database at startup.
+
+TIER_LIMITS: Dict[str, Dict[str, Any]] = {
+    "free": {
+        "max_watched_politicians": 0,
+        "trade_delay_days": 7,
+        "email_alerts": False,
+        "australian_data": False,
+        "analytics": False,
+        "api_calls_per_day": 0
+    },
+    "insider": {
+        "max_watched_politicians": 5,
+        "trade_delay_days": 0,
+        "email_alerts": True,
+        "australian_data": False,
+        "analytics": True,
+        "api_calls_per_day": 100
+    },
+    "elite": {
+        "max_watched_politicians": -1,  # unlimited
+        "trade_delay_days": 0,
+        "email_alerts": True,
+        "australian_data": True,
+        "analytics": True,
+        "api_calls_per_day": 1000
+    }
+}
+
+# Feature -> tiers allowed to use it (lowest tier first)
+FEATURE_TIERS: Dict[str, tuple] = {
+    "realtime_trades": ("insider", "elite"),
+    "email_alerts": ("insider", "elite"),
+    "australian_data": ("elite",),
+    "analytics": ("elite",),
+    "api_access": ("elite",)
+}
+
+ACTIVE_SUBSCRIPTION_STATUSES = ("active", "trialing")
+
+# Shared limiter - bucket sizes come from TIER_LIMITS (see rate_limit.py)
+rate_limiter = RateLimiter(backend_from_env(), TIER_LIMITS)
+
+# Buffered API usage events (drained by flush_api_usage)
+usage_recorder = UsageRecorder()
+
 # Security scheme for Bearer tokens
 security = HTTPBearer()
 optional_security = HTTPBearer(auto_error=False)
@@ -34,6 +112,53 @@ class AuthorizationError(HTTPException):
     def __init__(self, detail: str = "Insufficient permissions"):
         super().__init__(status_code=403, detail=detail)
 
+# =====================================================
+# LOCAL TOKEN VERIFICATION
+# =====================================================
+
+_jwks_client: Optional[jwt.PyJWKClient] = None
+
+def _get_jwks_client() -> Optional[jwt.PyJWKClient]:
+    """Lazily build the JWKS client - keys are fetched once and cached in-process"""
+    global _jwks_client
+    if _jwks_client is None and SUPABASE_URL:
+        _jwks_client = jwt.PyJWKClient(
+            f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+            cache_keys=True,
+            lifespan=JWKS_CACHE_SECONDS
+        )
+    return _jwks_client
+
+def verify_token_locally(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a Supabase access token without a network round trip
+
+    Returns the token claims if the signature, expiry and audience check out,
+    or None if this process has no key to verify the token with.
+    Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError for bad tokens.
+    """
+    algorithm = jwt.get_unverified_header(token).get("alg")
+
+    if algorithm == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            return None
+        key = SUPABASE_JWT_SECRET
+    elif algorithm in ("RS256", "ES256"):
+        jwks_client = _get_jwks_client()
+        if not jwks_client:
+            return None
+        key = jwks_client.get_signing_key_from_jwt(token).key
+    else:
+        return None
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=SUPABASE_JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]}
+    )
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> Dict[str, Any]:
     """
     Extract and validate JWT token from request headers
@@ -47,44 +172,59 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
     token = credentials.credentials
 
     try:
-        # Verify JWT with Supabase
-        user_response = supabase.auth.get_user(token)
-
-        if not user_response or not user_response.user:
-            raise AuthenticationError("Invalid or expired token")
-
-        user = user_response.user
+        # Verify JWT locally first - only fall back to Supabase Auth when we can't
+        try:
+            claims = verify_token_locally(token)
+        except jwt.ExpiredSignatureError:
+            raise
+        except jwt.PyJWTError:
+            claims = None
+
+        if claims:
+            user_id = claims["sub"]
+            user_email = claims.get("email")
+        else:
+            user_response = supabase.auth.get_user(token)
+
+            if not user_response or not user_response.user:
+                raise AuthenticationError("Invalid or expired token")
+
+            user_id = user_response.user.id
+            user_email = user_response.user.email
+            token_users.set(_token_digest(token), user_id)
+
+        # Fetch user profile (cached - only misses go to the database)
+        entry = profile_cache.get(user_id)
+        if entry is None:
+            profile_response = supabase.table("user_profiles")\
+                .select("*")\
+                .eq("id", user_id)\
+                .maybe_single()\
+                .execute()
+
+            if not profile_response.data:
+                # User authenticated but no profile exists - create one
+                profile_data = {
+                    "id": user_id,
+                    "email": user_email,
+                    "subscription_tier": "free",
+                    "subscription_status": "inactive"
+                }
+                create_response = supabase.table("user_profiles").insert(profile_data).execute()
+                profile = create_response.data[0]
+            else:
+                profile = profile_response.data
 
-        # Fetch user profile from database
-        profile_response = supabase.table("user_profiles")\
-            .select("*")\
-            .eq("id", user.id)\
-            .maybe_single()\
-            .execute()
+            entry = cache_profile(profile)
 
-        if not profile_response.data:
-            # User authenticated but no profile exists - create one
-            profile_data = {
-                "id": user.id,
-                "email": user.email,
-                "subscription_tier": "free",
-                "subscription_status": "inactive"
-            }
-            create_response = supabase.table("user_profiles").insert(profile_data).execute()
-            profile = create_response.data[0]
-        else:
-            profile = profile_response.data
+        profile = entry["profile"]
 
-        # Update last_login timestamp
-        from datetime import datetime, timezone
-        supabase.table("user_profiles")\
-            .update({"last_login": datetime.now(timezone.utc).isoformat()})\
-            .eq("id", user.id)\
-            .execute()
+        # Update last_login timestamp (buffered - written back by flush_last_logins)
+        record_login(user_id)
 
         return {
-            "id": user.id,
-            "email": user.email,
+            "id": user_id,
+            "email": user_email or profile.get("email"),
             "subscription_tier": profile["subscription_tier"],
             "subscription_status": profile["subscription_status"],
             "stripe_customer_id": profile.get("stripe_customer_id")
@@ -98,6 +238,92 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
         print(f"Auth error: {str(e)}")
         raise AuthenticationError("Authentication failed")
 
+# =====================================================
+# LAST LOGIN WRITE-BEHIND
+# =====================================================
+
+_pending_logins: Dict[str, Dict[str, Any]] = {}
+_pending_logins_lock = threading.Lock()
+
+def record_login(user_id: str):
+    """
+    Remember that a user was just seen - no database call
+    Repeat visits before the next flush collapse into one row with the latest timestamp
+    """
+    row = {
+        "id": user_id,
+        "last_login": datetime.now(timezone.utc).isoformat()
+    }
+    with _pending_logins_lock:
+        _pending_logins[user_id] = row
+
+def flush_last_logins() -> int:
+    """
+    Write every buffered last_login in one bulk update (record_last_logins RPC)
+    Called on an interval by the API and once more at shutdown.
+    Returns the number of profiles updated.
+    """
+    global _pending_logins
+
+    with _pending_logins_lock:
+        if not _pending_logins:
+            return 0
+        rows: List[Dict[str, Any]] = list(_pending_logins.values())
+        _pending_logins = {}
+
+    try:
+        # Update-only, so a profile deleted since the login was buffered isn't recreated
+        result = supabase.rpc('record_last_logins', {'p_rows': rows}).execute()
+        return result.data or 0
+    except Exception as e:
+        print(f"last_login flush failed ({len(rows)} users): {str(e)}")
+        # Put them back for the next attempt without clobbering newer logins
+        with _pending_logins_lock:
+            for row in rows:
+                _pending_logins.setdefault(row["id"], row)
+        return 0
+
+# =====================================================
+# PROFILE CACHE
+# =====================================================
+
+def effective_tier(tier: Optional[str], status: Optional[str]) -> str:
+    """Tier the user actually gets - lapsed subscriptions fall back to free"""
+    if status not in ACTIVE_SUBSCRIPTION_STATUSES:
+        return "free"
+    return tier if tier in TIER_LIMITS else "free"
+
+def cache_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Store a freshly read profile with its resolved tier and limits"""
+    tier = effective_tier(profile.get("subscription_tier"), profile.get("subscription_status"))
+    entry = {
+        "profile": profile,
+        "tier": tier,
+        "limits": TIER_LIMITS[tier]
+    }
+    profile_cache.set(profile["id"], entry)
+    return entry
+
+def invalidate_user_cache(user_id: str):
+    """Call after writing a user's profile or preferences"""
+    profile_cache.invalidate(user_id)
+
+def load_tier_rules():
+    """
+    Refresh TIER_LIMITS from the get_tier_limits() database function
+    Called once at startup; the built-in table is kept if the RPC is unavailable.
+    """
+    for tier in list(TIER_LIMITS):
+        try:
+            result = supabase.rpc('get_tier_limits', {'p_tier': tier}).execute()
+            if isinstance(result.data, dict) and "error" not in result.data:
+                TIER_LIMITS[tier] = result.data
+        except Exception as e:
+            print(f"Could not load tier limits for '{tier}', using defaults: {str(e)}")
+
+    # Cached entries hold references to the old limits
+    profile_cache.clear()
+
 async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_security)) -> Optional[Dict[str, Any]]:
     """
     Optional authentication - doesn't require login but returns user if authenticated
@@ -167,7 +393,7 @@ def require_subscription(required_tier: str):
 def require_feature(feature_name: str):
     """
     Decorator to check if user has access to a specific feature
-    Uses the database function user_has_access()
+    Mirrors the database function user_has_access() (see FEATURE_TIERS)
 
     Features:
     - realtime_trades: Access to live trade data (Insider+)
@@ -181,25 +407,16 @@ def require_feature(feature_name: str):
         async def au_trades(user=Depends(require_feature('australian_data'))):
             return {"trades": "data"}
     """
-    async def feature_checker(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
-        # Call database function to check access
-        result = supabase.rpc(
-            'user_has_access',
-            {'p_user_id': user['id'], 'p_feature': feature_name}
-        ).execute()
+    allowed_tiers = FEATURE_TIERS.get(feature_name, ())
 
-        has_access = result.data
+    async def feature_checker(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+        # Same rules as the database function, evaluated against the cached profile
+        user_tier = effective_tier(user.get("subscription_tier"), user.get("subscription_status"))
+        has_access = user_tier in allowed_tiers
 
         if not has_access:
             # Determine which tier is needed
-            tier_map = {
-                'realtime_trades': 'insider',
-                'email_alerts': 'insider',
-                'australian_data': 'elite',
-                'analytics': 'elite',
-                'api_access': 'elite'
-            }
-            required_tier = tier_map.get(feature_name, 'elite')
+            required_tier = allowed_tiers[0] if allowed_tiers else 'elite'
 
             raise AuthorizationError(
                 f"This feature requires '{required_tier}' subscription. "
@@ -224,24 +441,18 @@ async def get_user_limits(user_id: str) -> Dict[str, Any]:
             "api_calls_per_day": 100
         }
     """
-    # Get user's tier
-    profile = supabase.table("user_profiles")\
-        .select("subscription_tier, subscription_status")\
-        .eq("id", user_id)\
-        .single()\
-        .execute()
-
-    tier = profile.data["subscription_tier"]
-    status = profile.data["subscription_status"]
-
-    # If subscription inactive, force free tier
-    if status not in ["active", "trialing"]:
-        tier = "free"
-
-    # Get limits from database function
-    limits = supabase.rpc('get_tier_limits', {'p_tier': tier}).execute()
+    # Get user's tier (usually already cached by get_current_user)
+    entry = profile_cache.get(user_id)
+    if entry is None:
+        profile = supabase.table("user_profiles")\
+            .select("*")\
+            .eq("id", user_id)\
+            .single()\
+            .execute()
+        entry = cache_profile(profile.data)
 
-    return limits.data
+    # Inactive subscriptions were already forced to free when the entry was built
+    return dict(entry["limits"])
 
 def get_api_key_user():
     """
@@ -275,26 +486,67 @@ def get_api_key_user():
 # HELPER FUNCTIONS
 # =====================================================
 
-async def check_rate_limit(user_id: str, endpoint: str) -> bool:
-    """
-    Check if user has exceeded rate limits
-    Returns True if allowed, False if rate limit exceeded
+# Tier charged for a token whose profile isn't cached (see identify_caller)
+UNCACHED_TIER = "elite"
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _user_bucket(user_id: str) -> Tuple[str, str]:
+    # Tier is known once get_current_user has cached the profile
+    entry = profile_cache.get(user_id)
+    return f"user:{user_id}", entry["tier"] if entry else UNCACHED_TIER
 
-    Rate limits by tier:
-    - Free: 10 requests/hour
-    - Insider: 100 requests/hour
-    - Elite: 1000 requests/hour
+def identify_caller(request) -> Tuple[str, str]:
     """
-    # TODO: Implement Redis-based rate limiting
-    # For now, always return True
-    return True
+    Cheap caller identification for the rate limiter - no database calls
+    Returns (identity, tier): the user id for verified tokens, the token hash
+    for tokens this process has no key to check, otherwise the client address
+    with the 'anonymous' tier.
+
+    A user whose profile isn't cached yet (cold worker, expiry, eviction) is
+    charged as UNCACHED_TIER - get_current_user caches the real tier during
+    this same request, so only that one request is affected and paying users
+    never hit the free bucket by accident. The same goes for tokens that can
+    only be checked with Supabase Auth (e.g. SUPABASE_JWT_SECRET unset on an
+    HS256 project): get_current_user records which user the token belongs to.
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+        try:
+            claims = verify_token_locally(token)
+        except jwt.PyJWTError:
+            # Forged, expired or malformed - rate limited by address below
+            claims = False
+
+        if claims:
+            return _user_bucket(claims["sub"])
+        if claims is None:
+            digest = _token_digest(token)
+            user_id = token_users.get(digest)
+            if user_id:
+                return _user_bucket(user_id)
+            return f"token:{digest}", UNCACHED_TIER
+
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}", "anonymous"
 
 async def log_api_usage(user_id: str, endpoint: str, response_code: int):
     """
     Log API usage for analytics and billing
+    Only appends to the in-memory buffer - flush_api_usage() writes it out
+    """
+    usage_recorder.record(user_id, endpoint, response_code)
+
+def flush_api_usage() -> int:
+    """
+    Write buffered usage as per-minute counters in one RPC call
+    Called on an interval by the API and once more at shutdown.
     """
-    # TODO: Implement usage tracking
-    pass
+    return usage_recorder.flush(
+        lambda rows: supabase.rpc('record_api_usage', {'p_rows': rows}).execute()
+    )
 
 def format_auth_error(tier_required: str, current_tier: str) -> Dict[str, Any]:
     """
@@ -0,0 +1,174 @@
+"""
+In-process caches for the Congressional Trading Intelligence API
+Keeps hot aggregate responses out of Supabase between refreshes
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+
+class _RefreshAbandoned(Exception):
+    """The caller computing a value was cancelled before it finished"""
+
+
+class ResponseCache:
+    """
+    TTL cache with single-flight recomputation
+
+    - Fresh entries are served straight from memory
+    - When an entry expires, the first caller recomputes it while every
+      other caller keeps getting the stale value until the refresh lands
+    - Callers that arrive before any value exists wait on the same refresh
+      instead of each starting their own
+
+    Compute functions are plain (blocking) callables - they run in the
+    threadpool so a slow Supabase round trip never stalls the event loop.
+
+    Usage:
+        stats_cache = ResponseCache(ttl_seconds=60)
+
+        @app.get("/stats")
+        async def stats():
+            return await stats_cache.get_or_compute("stats", compute_stats)
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        # Counters exposed on /health
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if entry:
+                # Someone is already refreshing - serve the stale copy
+                self.stale_hits += 1
+                return entry[1]
+            # Nothing to serve yet - piggyback on the refresh in progress
+            self.hits += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _RefreshAbandoned:
+                # The leader's request was cancelled (client went away) - take over
+                return await self.get_or_compute(key, compute)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            value = await run_in_threadpool(compute)
+        except Exception as e:
+            self.errors += 1
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so asyncio doesn't warn when nobody waited
+            if entry:
+                # Better a slightly old answer than a 500
+                return entry[1]
+            raise
+        else:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+            if not future.done():
+                # Cancelled mid-compute (CancelledError isn't an Exception) - wake
+                # the waiting callers instead of leaving them on a future that never resolves
+                future.set_exception(_RefreshAbandoned())
+                future.exception()
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry, or everything when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else None,
+        }
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with per-entry expiry
+
+    Used for small per-user lookups (profile, tier, limits) that are read on
+    nearly every authenticated request but change rarely.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "maxsize": self.maxsize,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
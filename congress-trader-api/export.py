@@ -0,0 +1,55 @@
+"""
+Streaming bulk export helpers
+Turn an iterator of row chunks into NDJSON or CSV bytes (optionally gzipped)
+without ever holding more than one chunk in memory.
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List
+
+Chunks = Iterable[List[Dict[str, Any]]]
+
+
+def ndjson_stream(chunks: Chunks) -> Iterator[bytes]:
+    """One JSON object per line"""
+    for rows in chunks:
+        if rows:
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+
+def csv_stream(chunks: Chunks) -> Iterator[bytes]:
+    """CSV with a header row taken from the first row's columns"""
+    buffer = io.StringIO()
+    writer = None
+
+    for rows in chunks:
+        if not rows:
+            continue
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerows(rows)
+
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def gzip_stream(body: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a byte stream on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for piece in body:
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# format name -> (stream function, media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_stream, "application/x-ndjson", "ndjson"),
+    "csv": (csv_stream, "text/csv", "csv"),
+}
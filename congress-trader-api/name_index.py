@@ -0,0 +1,156 @@
+"""
+In-memory politician name index for the Congressional Trading Intelligence API
+Resolves whatever a user typed ("pelosi", "Nancy", "Pelosi, Nancy") to a
+canonical politician id without touching the database, and backs autocomplete.
+
+Built from the politicians / politician_aliases tables (ingest_schema.sql,
+section 4) - a few thousand spellings at most, so it lives in memory and is
+rebuilt periodically. Trade lookups then filter on politician_id, which is an
+index lookup instead of an ILIKE '%name%' scan.
+
+- Prefix index: every prefix of every word of every spelling -> politician ids,
+  so each query word narrows candidates with one dict lookup
+- Trigram index: typo-tolerant fallback ("pelosy") scored by trigram overlap
+
+Different members can share a name (the directory tells them apart by chamber
+and state), so resolve() only returns an id when exactly one politician
+matches; otherwise callers fall back to matching member_name.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Titles users (and sources) put in front of names
+_NAME_NOISE = {"hon", "honorable", "rep", "representative", "sen", "senator", "dr", "mr", "mrs", "ms"}
+
+# Minimum trigram similarity for a fuzzy match to count
+MIN_TRIGRAM_SIMILARITY = 0.3
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase ASCII words, titles dropped: "Hon. José Serrano" -> "jose serrano" """
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode().lower()
+    text = text.replace("'", "")
+    return " ".join(w for w in re.split(r"[^a-z]+", text) if w and w not in _NAME_NOISE)
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Prefix + trigram index over politician spellings
+
+    Usage:
+        index = NameIndex()
+        index.rebuild(politicians, aliases, trade_counts)
+        index.resolve("pelosi")          # -> politician id or None
+        index.search("nan", limit=10)    # -> autocomplete entries
+    """
+
+    def __init__(self):
+        # (entries, exact, prefixes, trigrams) - replaced as a whole by rebuild()
+        # and read once per call, so readers never mix two generations
+        self._state = ({}, {}, {}, {})
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def rebuild(self, politicians: Iterable[Dict[str, Any]], aliases: Iterable[Dict[str, Any]],
+                trade_counts: Optional[Dict[int, int]] = None):
+        """
+        Replace the index contents
+        politicians: rows with id, canonical_name and optionally chamber, state
+        aliases: rows with alias, politician_id
+        trade_counts: politician id -> trades, used to rank ambiguous matches
+        """
+        trade_counts = trade_counts or {}
+        entries = {
+            p["id"]: {"id": p["id"], "name": p["canonical_name"], "chamber": p.get("chamber") or None,
+                      "state": p.get("state") or None, "aliases": set(), "trades": trade_counts.get(p["id"], 0)}
+            for p in politicians
+        }
+        for row in aliases:
+            entry = entries.get(row["politician_id"])
+            if entry:
+                entry["aliases"].add(row["alias"])
+
+        exact: Dict[str, Set[int]] = defaultdict(set)
+        prefixes: Dict[str, Set[int]] = defaultdict(set)
+        trigrams: Dict[str, Set[int]] = defaultdict(set)
+        for entry in entries.values():
+            for spelling in entry["aliases"] | {entry["name"]}:
+                normalized = normalize_name(spelling)
+                if not normalized:
+                    continue
+                exact[normalized].add(entry["id"])
+                for word in normalized.split():
+                    for end in range(1, len(word) + 1):
+                        prefixes[word[:end]].add(entry["id"])
+                for gram in _trigrams(normalized):
+                    trigrams[gram].add(entry["id"])
+
+        self._state = (entries, dict(exact), dict(prefixes), dict(trigrams))
+
+    def _matches(self, query: str) -> List[Dict[str, Any]]:
+        """Index entries for the query, best first"""
+        words = normalize_name(query).split()
+        if not words:
+            return []
+
+        entries, _, prefixes, trigrams = self._state
+        candidates: Optional[Set[int]] = None
+        for word in words:
+            ids = prefixes.get(word, set())
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+
+        if candidates:
+            # Busiest traders first, then alphabetical
+            matches = sorted((entries[i] for i in candidates), key=lambda e: (-e["trades"], e["name"]))
+        else:
+            grams = _trigrams(" ".join(words))
+            shared: Dict[int, int] = defaultdict(int)
+            for gram in grams:
+                for politician_id in trigrams.get(gram, ()):
+                    shared[politician_id] += 1
+            scored = [
+                (count / len(grams), politician_id) for politician_id, count in shared.items()
+                if count / len(grams) >= MIN_TRIGRAM_SIMILARITY
+            ]
+            scored.sort(key=lambda s: (-s[0], -entries[s[1]]["trades"], entries[s[1]]["name"]))
+            matches = [entries[politician_id] for _, politician_id in scored]
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Politicians matching the query: every word must prefix a word of some
+        spelling; falls back to trigram similarity when nothing matches
+        """
+        return [
+            {"id": e["id"], "name": e["name"], "chamber": e["chamber"], "state": e["state"],
+             "aliases": sorted(e["aliases"]), "trades": e["trades"]}
+            for e in self._matches(query)[:limit]
+        ]
+
+    def resolve(self, name: str) -> Optional[int]:
+        """
+        Canonical id for a name: exact spelling first, otherwise the search
+        match. None when nothing matches, when the name matches more than one
+        politician (ambiguous), or when the index hasn't been built yet.
+        """
+        normalized = normalize_name(name)
+        if not normalized:
+            return None
+
+        ids = self._state[1].get(normalized)
+        if ids:
+            return next(iter(ids)) if len(ids) == 1 else None
+
+        matches = self._matches(name)
+        return matches[0]["id"] if len(matches) == 1 else None
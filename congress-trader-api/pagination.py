@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination for trade listings
+
+Pages are ordered by (sort column DESC, id DESC) and the next page starts
+strictly after the last row returned, with a leading `sort column <= value`
+bound so Postgres seeks the matching (column DESC, id DESC) index (create_table.sql)
+instead of scanning. Deep pages cost the same as the first one and rows
+inserted by the scrapers mid-walk don't shift pages.
+
+Nullable sort columns sort NULLS LAST and are walked in two phases: the
+non-NULL rows by range, then the NULL rows by id alone.
+
+Cursors are opaque to clients: base64 of [sort column, last value, last id].
+Cursor values end up in PostgREST filter strings, so they are type-checked
+before use.
+"""
+
+import base64
+import json
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+_NUMBER_RE = re.compile(r"-?\d+(\.\d+)?")
+
+
+def _is_date(value: Any) -> bool:
+    try:
+        return isinstance(value, str) and len(value) == 10 and bool(date.fromisoformat(value))
+    except ValueError:
+        return False
+
+
+def _is_number(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, (int, float)) or (isinstance(value, str) and bool(_NUMBER_RE.fullmatch(value)))
+
+
+# Columns listings may sort by: (cursor value check, nullable)
+SORT_COLUMNS = {
+    "trade_date": (_is_date, False),
+    "amount_low": (_is_number, True),
+}
+
+
+def encode_cursor(sort_column: str, row: Dict[str, Any]) -> str:
+    return _encode(sort_column, row.get(sort_column), row["id"])
+
+
+def _encode(sort_column: str, value: Any, row_id: Optional[int]) -> str:
+    payload = json.dumps([sort_column, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column: str) -> Tuple[Any, Any]:
+    """
+    Returns (last sort value, last id) or raises a 400 for tampered/foreign cursors
+    (None, None) is the start of a nullable column's NULL rows.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        column, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if column != sort_column:
+        raise HTTPException(status_code=400, detail="Cursor belongs to a different sort order")
+
+    is_valid, nullable = SORT_COLUMNS[sort_column]
+    if value is None:
+        valid = nullable and (row_id is None or (isinstance(row_id, int) and not isinstance(row_id, bool)))
+    else:
+        valid = is_valid(value) and isinstance(row_id, int) and not isinstance(row_id, bool)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return value, row_id
+
+
+def apply_keyset(query, sort_column: str, cursor: Optional[str] = None):
+    """Add the keyset ordering, and the 'after this row' filter when a cursor is given"""
+    _, nullable = SORT_COLUMNS[sort_column]
+    query = query.order(sort_column, desc=True, nullsfirst=False if nullable else None)\
+        .order("id", desc=True)
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_column)
+        if value is None:
+            # Into the NULLs at the end - only the id decides
+            query = query.is_(sort_column, "null")
+            if row_id is not None:
+                query = query.lt("id", row_id)
+        else:
+            # The plain range bound is what lets the planner seek the index;
+            # the or_() then only trims ties on the boundary value
+            query = query.lte(sort_column, value).or_(
+                f"{sort_column}.lt.{value},id.lt.{row_id}"
+            )
+
+    return query
+
+
+def fetch_page(query, sort_column: str, limit: int, offset: int = 0,
+               cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Run a listing query one page at a time
+    Cursor pagination when a cursor is given; plain offset otherwise (kept for
+    older clients - same ordering, so both styles see the same sequence).
+
+    Returns (rows, next_cursor) - next_cursor is None on the last page.
+    """
+    query = apply_keyset(query, sort_column, cursor)
+
+    if cursor:
+        result = query.limit(limit).execute()
+    else:
+        result = query.range(offset, offset + limit - 1).execute()
+
+    rows = result.data
+    if rows and len(rows) == limit:
+        next_cursor = encode_cursor(sort_column, rows[-1])
+    elif cursor and SORT_COLUMNS[sort_column][1] and decode_cursor(cursor, sort_column)[0] is not None:
+        # Cursor pages of a nullable column stop at its NULLs - walk those next
+        next_cursor = _encode(sort_column, None, None)
+    else:
+        next_cursor = None
+    return rows, next_cursor
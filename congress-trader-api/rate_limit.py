@@ -0,0 +1,303 @@
+"""
+Rate limiting for the Congressional Trading Intelligence API
+Token buckets per caller and endpoint class, sized from subscription tiers
+
+Endpoint classes:
+- api: /api/v1/* - hourly tier limit plus the tier's api_calls_per_day quota
+- web: everything else - a per-minute guard against scripted clients
+
+Backends:
+- MemoryBackend: per-process (default)
+- SQLiteBackend: shared by every uvicorn worker on the same host
+  (RATE_LIMIT_BACKEND=sqlite:///path/to/ratelimit.db)
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# Requests per hour on /api/v1/* by tier
+# "anonymous" is per client address: callers without a token, or with one
+# that fails verification (forged/expired), so they can't hammer get_current_user
+HOURLY_API_LIMITS = {
+    "anonymous": int(os.getenv("ANONYMOUS_API_LIMIT_PER_HOUR", "10")),
+    "free": 10,
+    "insider": 100,
+    "elite": 1000
+}
+
+# Requests per minute on everything else (dashboard pages, public endpoints)
+WEB_RATE_LIMIT_PER_MINUTE = int(os.getenv("WEB_RATE_LIMIT_PER_MINUTE", "120"))
+
+# How often MemoryBackend drops buckets that have refilled completely
+PRUNE_INTERVAL_SECONDS = float(os.getenv("RATE_LIMIT_PRUNE_SECONDS", "60"))
+
+# One token bucket: `capacity` tokens, refilled continuously at `refill_per_second`
+Bucket = namedtuple("Bucket", ["key", "capacity", "refill_per_second"])
+
+
+def _refill(tokens: float, updated: float, now: float, bucket: Bucket) -> float:
+    elapsed = max(0.0, now - updated)
+    return min(bucket.capacity, tokens + elapsed * bucket.refill_per_second)
+
+
+def _retry_after(tokens: float, bucket: Bucket, cost: float) -> float:
+    if bucket.refill_per_second <= 0:
+        return math.inf
+    return (cost - tokens) / bucket.refill_per_second
+
+
+# =====================================================
+# BACKENDS
+# =====================================================
+
+class RateLimitBackend:
+    """
+    Storage for bucket state
+
+    take() must be atomic across every bucket it is given: either all of
+    them have `cost` tokens and all are charged, or none are.
+    Backends whose take() can block set blocking = True and are called
+    from the threadpool.
+    """
+
+    blocking = False
+
+    def take(self, buckets: List[Bucket], cost: float = 1.0) -> float:
+        """Charge the buckets. Returns 0 if allowed, else seconds until retry."""
+        raise NotImplementedError
+
+    def _settle(self, state: Dict[str, Tuple[float, float]], buckets: List[Bucket],
+                cost: float, now: float) -> Tuple[float, Dict[str, Tuple[float, float]]]:
+        """Shared bucket math - returns (retry_after, new state for each bucket)"""
+        levels = {}
+        retry_after = 0.0
+        for bucket in buckets:
+            tokens, updated = state.get(bucket.key, (bucket.capacity, now))
+            tokens = _refill(tokens, updated, now, bucket)
+            levels[bucket.key] = tokens
+            if tokens < cost:
+                retry_after = max(retry_after, _retry_after(tokens, bucket, cost))
+
+        if retry_after:
+            # Denied - nothing is charged, but keep the refilled levels
+            return retry_after, {key: (tokens, now) for key, tokens in levels.items()}
+
+        return 0.0, {key: (tokens - cost, now) for key, tokens in levels.items()}
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Buckets in a dict - fast, but each worker process has its own
+    A missing bucket is a full one, so buckets that have refilled are
+    dropped every PRUNE_INTERVAL_SECONDS to keep one-off callers from piling up.
+    """
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[float, float]] = {}
+        self._buckets: Dict[str, Bucket] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.time()
+
+    def take(self, buckets: List[Bucket], cost: float = 1.0) -> float:
+        now = time.time()
+        with self._lock:
+            retry_after, updates = self._settle(self._state, buckets, cost, now)
+            self._state.update(updates)
+            for bucket in buckets:
+                self._buckets[bucket.key] = bucket
+            if now - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                self._prune(now)
+        return retry_after
+
+    def _prune(self, now: float):
+        full = [
+            key for key, (tokens, updated) in self._state.items()
+            if _refill(tokens, updated, now, self._buckets[key]) >= self._buckets[key].capacity
+        ]
+        for key in full:
+            del self._state[key]
+            del self._buckets[key]
+        self._last_prune = now
+
+
+class SQLiteBackend(RateLimitBackend):
+    """
+    Buckets in a local SQLite file so several uvicorn workers share limits
+    Each take() is one short IMMEDIATE transaction - it can wait on another
+    worker's lock, so the middleware runs it in the threadpool.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def take(self, buckets: List[Bucket], cost: float = 1.0) -> float:
+        conn = self._connection()
+        keys = [bucket.key for bucket in buckets]
+        placeholders = ",".join("?" for _ in keys)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT key, tokens, updated FROM rate_limit_buckets WHERE key IN ({placeholders})",
+                keys
+            ).fetchall()
+            state = {key: (tokens, updated) for key, tokens, updated in rows}
+
+            retry_after, updates = self._settle(state, buckets, cost, time.time())
+            conn.executemany(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                [(key, tokens, updated) for key, (tokens, updated) in updates.items()]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return retry_after
+
+
+def backend_from_env() -> RateLimitBackend:
+    """
+    Pick the backend from RATE_LIMIT_BACKEND
+    - memory (default)
+    - sqlite:///path/to/file.db
+    """
+    setting = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    if setting.startswith("sqlite:///"):
+        return SQLiteBackend(setting[len("sqlite:///"):])
+    return MemoryBackend()
+
+
+# =====================================================
+# LIMITER
+# =====================================================
+
+def endpoint_class(path: str) -> str:
+    return "api" if path.startswith("/api/") else "web"
+
+
+class RateLimiter:
+    """
+    Maps (caller, tier, endpoint) to token buckets and charges them
+
+    tier_limits is the TIER_LIMITS table from auth_middleware - read on every
+    call, so a refresh of the tier rules takes effect immediately.
+    """
+
+    def __init__(self, backend: RateLimitBackend, tier_limits: Dict[str, Dict[str, Any]]):
+        self.backend = backend
+        self.tier_limits = tier_limits
+        self.allowed = 0
+        self.limited = 0
+
+    def buckets_for(self, identity: str, tier: str, path: str) -> List[Bucket]:
+        kind = endpoint_class(path)
+
+        if kind == "web":
+            per_minute = WEB_RATE_LIMIT_PER_MINUTE
+            return [Bucket(f"{identity}:web:minute", per_minute, per_minute / 60)]
+
+        # Tier is part of the key so an upgrade starts with a full bucket
+        buckets = []
+        per_hour = HOURLY_API_LIMITS.get(tier, 0)
+        if per_hour > 0:
+            buckets.append(Bucket(f"{identity}:{tier}:api:hour", per_hour, per_hour / 3600))
+
+        per_day = self.tier_limits.get(tier, {}).get("api_calls_per_day", 0)
+        if per_day > 0:
+            buckets.append(Bucket(f"{identity}:{tier}:api:day", per_day, per_day / 86400))
+
+        return buckets
+
+    def check(self, identity: str, tier: str, path: str) -> float:
+        """Charge one request. Returns 0 if allowed, else seconds until retry."""
+        buckets = self.buckets_for(identity, tier, path)
+        if not buckets:
+            # No API quota for this tier - let the endpoint's own 401/403 explain why
+            return 0.0
+
+        retry_after = self.backend.take(buckets)
+        if retry_after:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "allowed": self.allowed,
+            "limited": self.limited
+        }
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Enforce the limiter before any endpoint runs
+
+    identify(request) returns (identity, tier) for the caller - a user id for
+    authenticated requests, the client address otherwise.
+    """
+
+    def __init__(self, app, limiter: RateLimiter,
+                 identify: Callable[[Any], Tuple[str, str]],
+                 exempt_paths: Optional[Tuple[str, ...]] = ("/", "/health")):
+        super().__init__(app)
+        self.limiter = limiter
+        self.identify = identify
+        self.exempt_paths = exempt_paths or ()
+
+    async def dispatch(self, request, call_next):
+        if request.method == "OPTIONS" or request.url.path in self.exempt_paths:
+            return await call_next(request)
+
+        identity, tier = self.identify(request)
+        request.state.caller = (identity, tier)
+        if self.limiter.backend.blocking:
+            retry_after = await run_in_threadpool(self.limiter.check, identity, tier, request.url.path)
+        else:
+            retry_after = self.limiter.check(identity, tier, request.url.path)
+
+        if retry_after:
+            seconds = "86400" if math.isinf(retry_after) else str(max(1, math.ceil(retry_after)))
+            return JSONResponse(
+                status_code=429,
+                content={
+                    "error": "Rate limit exceeded",
+                    "message": f"Too many requests. Retry in {seconds} seconds.",
+                    "your_tier": tier,
+                    "upgrade_url": "https://congresstracker.com.au/pricing"
+                },
+                headers={"Retry-After": seconds}
+            )
+
+        return await call_next(request)
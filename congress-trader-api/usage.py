@@ -0,0 +1,133 @@
+"""
+API usage tracking for analytics and billing
+Requests append one tuple to an in-memory ring buffer; a background task
+drains it into per-minute counters (api_usage table, see auth_schema.sql)
+"""
+
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+USAGE_BUFFER_SIZE = int(os.getenv("USAGE_BUFFER_SIZE", "100000"))
+USAGE_FLUSH_SECONDS = float(os.getenv("USAGE_FLUSH_SECONDS", "15"))
+
+# (user_id, endpoint, minute, status_class)
+UsageKey = Tuple[str, str, int, int]
+
+
+class UsageRecorder:
+    """
+    Lock-free usage buffer
+
+    deque.append / deque.popleft are atomic, so request handlers and the
+    drain task never contend. If the drain falls behind by more than
+    USAGE_BUFFER_SIZE events the oldest ones are overwritten (and counted).
+    """
+
+    def __init__(self, maxlen: int = USAGE_BUFFER_SIZE):
+        self._events: deque = deque(maxlen=maxlen)
+        self._retry: Dict[UsageKey, int] = {}
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+
+    def record(self, user_id: str, endpoint: str, status_code: int):
+        """Hot path - one append, no I/O"""
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append((user_id, endpoint, int(time.time()) // 60 * 60, status_code // 100))
+        self.recorded += 1
+
+    def drain(self) -> Dict[UsageKey, int]:
+        """Pop everything buffered so far and count it per key"""
+        counts: Dict[UsageKey, int] = {}
+        events = self._events
+        while True:
+            try:
+                key = events.popleft()
+            except IndexError:
+                break
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def flush(self, write: Callable[[List[Dict[str, Any]]], Any]) -> int:
+        """
+        Drain the buffer and hand aggregated rows to `write` in one call
+        Rows that fail to write are retried once on the next flush.
+        Returns the number of requests written.
+        """
+        counts = self.drain()
+        retry, self._retry = self._retry, {}
+        for key, count in retry.items():
+            counts[key] = counts.get(key, 0) + count
+
+        if not counts:
+            return 0
+
+        rows = [
+            {
+                "user_id": user_id,
+                "endpoint": endpoint,
+                "minute": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(minute)),
+                "status_class": status_class,
+                "request_count": count
+            }
+            for (user_id, endpoint, minute, status_class), count in counts.items()
+        ]
+
+        try:
+            write(rows)
+        except Exception as e:
+            if retry:
+                print(f"Usage flush failed twice, dropping {sum(retry.values())} requests: {str(e)}")
+                # Drop only what was already retried - fresh increments for the same keys stay
+                for key, count in retry.items():
+                    counts[key] -= count
+                    if counts[key] <= 0:
+                        del counts[key]
+            else:
+                print(f"Usage flush failed, will retry: {str(e)}")
+            self._retry = counts
+            return 0
+
+        written = sum(counts.values())
+        self.flushed += written
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._events),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "dropped": self.dropped
+        }
+
+
+class UsageMiddleware(BaseHTTPMiddleware):
+    """
+    Record every authenticated request once the response is ready
+
+    Reuses the caller identified by RateLimitMiddleware (request.state.caller)
+    and labels requests by route template, e.g. /politician/{name}.
+    """
+
+    def __init__(self, app, recorder: UsageRecorder,
+                 identify: Callable[[Any], Tuple[str, str]]):
+        super().__init__(app)
+        self.recorder = recorder
+        self.identify = identify
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+
+        if request.method != "OPTIONS":
+            identity, _ = getattr(request.state, "caller", None) or self.identify(request)
+            if identity.startswith("user:"):
+                route = request.scope.get("route")
+                endpoint = getattr(route, "path", request.url.path)
+                self.recorder.record(identity[len("user:"):], endpoint, response.status_code)
+
+        return response
@@ -20,6 +20,12 @@ CREATE INDEX IF NOT EXISTS idx_trade_date ON public.congressional_trades(trade_d
 CREATE INDEX IF NOT EXISTS idx_member_name ON public.congressional_trades(member_name);
 CREATE INDEX IF NOT EXISTS idx_trade_type ON public.congressional_trades(trade_type);
 
+-- Keyset pagination (congress-trader-api/pagination.py): one index per listing order
+-- Free tier: ORDER BY amount_low DESC NULLS LAST, id DESC
+-- Paid tiers and /api/v1/trades: ORDER BY trade_date DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_amount_low_id ON public.congressional_trades(amount_low DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS idx_trade_date_id ON public.congressional_trades(trade_date DESC, id DESC);
+
 -- Enable Row Level Security (optional, but recommended)
 ALTER TABLE public.congressional_trades ENABLE ROW LEVEL SECURITY;
 
@@ -0,0 +1,76 @@
+"""
+Staged Diff-Apply
+Replaces the contents of congressional_trades with a full snapshot without
+ever leaving the table empty or half-loaded.
+
+1. Empty congressional_trades_staging
+2. Load the snapshot into staging with TradeLoader (COPY or REST batches)
+3. apply_congressional_trades_staging() (ingest_schema.sql) inserts new keys,
+   updates changed rows and deletes missing keys in one transaction - rows
+   staging rejected are still in the feed, so their keys are passed along
+   and their live rows are kept
+
+The API reads the old table until step 3 commits, and only rows that
+actually changed are written to congressional_trades.
+
+Usage:
+    PoliticianDirectory(supabase).assign(trades)
+    result = apply_snapshot(supabase, trades)
+    refresh_analytics(supabase, result["member_names"], result["trade_dates"])
+"""
+
+from ingest_state import NATURAL_KEY, iso_date
+from trade_loader import TradeLoader
+
+STAGING_TABLE = "congressional_trades_staging"
+
+# Columns staging shares with congressional_trades (create_table.sql,
+# plus politician_id from ingest_schema.sql section 4)
+STAGED_COLUMNS = (
+    "member_name", "trade_date", "disclosure_date", "ticker", "trade_type",
+    "amount_low", "amount_high", "party", "chamber", "company_name", "politician_id",
+)
+
+# Refuse snapshots that would delete more than this share of the table -
+# a truncated feed should fail the run, not empty the dashboard
+MAX_DELETE_FRACTION = 0.5
+
+
+def apply_snapshot(supabase, trades, max_delete_fraction=MAX_DELETE_FRACTION):
+    """
+    Make congressional_trades match `trades`. Returns {"staged", "rejected",
+    "inserted", "updated", "deleted", "member_names", "trade_dates"}. Raises if
+    the apply is refused - congressional_trades is left untouched in that case.
+    """
+    supabase.rpc("reset_congressional_trades_staging", {}).execute()
+
+    loader = TradeLoader(supabase, STAGING_TABLE, ignore_duplicates=False)
+    loader.load([{c: t.get(c) for c in STAGED_COLUMNS} for t in trades])
+    loader.close()
+    staged = len(loader.seen) - len(loader.failed)
+    print(f"  [DIFF] Staged {staged} rows in {loader.calls} requests ({len(loader.failed)} rejected)")
+
+    # Not staged, but not gone from the feed either - don't delete their live rows
+    keep_keys = [
+        {**{c: t.get(c) for c in NATURAL_KEY}, "trade_date": iso_date(t.get("trade_date"))}
+        for t in loader.failed
+    ]
+
+    result = supabase.rpc("apply_congressional_trades_staging", {
+        "p_max_delete_fraction": max_delete_fraction,
+        "p_keep_keys": keep_keys,
+    }).execute()
+    row = (result.data or [{}])[0]
+
+    applied = {
+        "staged": staged,
+        "rejected": len(loader.failed),
+        "inserted": row.get("inserted") or 0,
+        "updated": row.get("updated") or 0,
+        "deleted": row.get("deleted") or 0,
+        "member_names": row.get("member_names") or [],
+        "trade_dates": row.get("trade_dates") or [],
+    }
+    print(f"  [DIFF] Applied: {applied['inserted']} inserted, {applied['updated']} updated, "
+          f"{applied['deleted']} deleted ({len(applied['member_names'])} politicians changed)")
+    return applied
@@ -2,14 +2,27 @@
 """
 Quiver Quantitative API - Congressional Trading Data Fetcher (FIXED)
 Uses correct authentication: 'Token' not 'Bearer'
+
+Each run applies the fetched snapshot as a diff (see diff_apply.py): only new,
+changed and removed trades are written, in one transaction.
+
+Usage:
+  python fetch_quiver_fixed.py                # Diff-apply the Quiver snapshot
+  python fetch_quiver_fixed.py --full-reload  # Clear the table and reload everything
 """
 
-import requests
 import json
+import argparse
 from supabase import create_client
 from dotenv import load_dotenv
 import os
 from datetime import datetime
+from analytics_refresh import refresh_analytics
+from http_cache import cached_get
+from trade_loader import TradeLoader
+from batch_normalize import normalize_batch
+from diff_apply import apply_snapshot
+from politician_directory import PoliticianDirectory
 
 load_dotenv()
 
@@ -19,10 +32,12 @@ supabase = create_client(
     os.getenv("SUPABASE_KEY")
 )
 
-def fetch_quiver_congressional_trades():
+def fetch_quiver_congressional_trades(responses=None):
     """
     Fetch congressional trading data from Quiver API
     Correct authentication: Authorization: Token <your_token>
+    Requests are conditional - the successful response is appended to
+    `responses` so main() can tell whether anything changed.
     """
 
     QUIVER_API_KEY = os.getenv("QUIVER_API_KEY")
@@ -51,9 +66,11 @@ def fetch_quiver_congressional_trades():
     for endpoint in endpoints_to_try:
         try:
             print(f"  Trying: {endpoint}")
-            response = requests.get(endpoint, headers=headers, timeout=30)
+            response = cached_get(endpoint, headers=headers, timeout=30)
 
             if response.status_code == 200:
+                if responses is not None:
+                    responses.append(response)
                 data = response.json()
                 if isinstance(data, list) and len(data) > 0:
                     print(f"✅ Successfully fetched {len(data)} trades from {endpoint}")
@@ -85,8 +102,6 @@ def normalize_quiver_data(raw_trades):
     """
     Convert Quiver API format to our database schema
     """
-    normalized = []
-
     print(f"🔄 Normalizing {len(raw_trades)} trades...")
 
     # DEBUG: Print first trade to see actual field names
@@ -99,59 +114,13 @@ def normalize_quiver_data(raw_trades):
         print("\n📋 Available fields:", list(raw_trades[0].keys()))
         print("="*80 + "\n")
 
-    for trade in raw_trades:
-        try:
-            # FIXED: Using actual Quiver API field names
-            member_name = trade.get("Name") or "Unknown"
-
-            ticker = (trade.get("Ticker") or "").upper()
-
-            trade_type = trade.get("Transaction") or "Unknown"
-
-            normalized_trade = {
-                "member_name": member_name,
-                "trade_date": trade.get("Traded"),  # FIXED: Quiver uses "Traded"
-                "disclosure_date": trade.get("Filed"),  # FIXED: Quiver uses "Filed"
-                "ticker": ticker,
-                "trade_type": trade_type,
-                "amount_low": parse_amount(trade.get("Trade_Size_USD"), is_high=False),  # Quiver uses "Trade_Size_USD"
-                "amount_high": parse_amount(trade.get("Trade_Size_USD"), is_high=True),  # Quiver uses "Trade_Size_USD"
-                "party": trade.get("Party"),
-                "chamber": trade.get("Chamber"),
-                "company_name": trade.get("Company") or trade.get("Description")
-            }
-
-            # Only add if we have essential data (MUST have trade_date!)
-            if not normalized_trade["trade_date"]:
-                continue  # Skip trades without date
-            if not normalized_trade["ticker"] or normalized_trade["member_name"] == "Unknown":
-                continue  # Skip trades without ticker or member
-
-            normalized.append(normalized_trade)
-
-        except Exception as e:
-            print(f"⚠️  Skipping trade: {e}")
-            continue
+    # Field mapping (Quiver uses "Name", "Traded", "Filed", "Trade_Size_USD", ...)
+    # lives in batch_normalize._quiver. Trades without a date, ticker or member are dropped.
+    normalized = normalize_batch(raw_trades, "quiver").rows()
 
     print(f"✅ Normalized {len(normalized)} valid trades")
     return normalized
 
-def parse_amount(amount_str, is_high=False):
-    """Parse amount range"""
-    if not amount_str:
-        return None
-
-    try:
-        amount_str = str(amount_str).replace("$", "").replace(",", "")
-
-        if "-" in amount_str:
-            parts = amount_str.split("-")
-            return int(float(parts[1].strip())) if is_high else int(float(parts[0].strip()))
-        else:
-            return int(float(amount_str.strip()))
-    except:
-        return None
-
 def clear_old_data():
     """Clear existing trades"""
     try:
@@ -170,28 +139,34 @@ def save_to_database(trades):
 
     print(f"\n💾 Saving {len(trades)} trades to database...")
 
-    batch_size = 100
-    success_count = 0
-
-    for i in range(0, len(trades), batch_size):
-        batch = trades[i:i + batch_size]
-        try:
-            supabase.table("congressional_trades").insert(batch).execute()
-            success_count += len(batch)
-            print(f"✅ Saved batch {i//batch_size + 1} ({len(batch)} trades)")
-        except Exception as e:
-            print(f"❌ Error saving batch: {e}")
+    # Upsert on the natural key in adaptive batches; bad rows are isolated
+    # by bisection instead of failing their whole batch
+    loader = TradeLoader(supabase, "congressional_trades", ignore_duplicates=False)
+    success_count = loader.load(trades)
+    loader.close()
 
-    print(f"\n🎉 Successfully saved {success_count}/{len(trades)} trades!")
+    if loader.failed:
+        print(f"❌ {len(loader.failed)} trades rejected by the database")
+    print(f"\n🎉 Successfully saved {success_count}/{len(trades)} trades! ({loader.calls} requests)")
     return success_count
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch congressional trades from Quiver")
+    parser.add_argument("--full-reload", action="store_true",
+                        help="Clear congressional_trades and reload it instead of applying a diff")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("📊 QUIVER API - CONGRESSIONAL TRADING FETCHER")
     print("=" * 60)
 
     # Fetch from Quiver
-    raw_trades = fetch_quiver_congressional_trades()
+    responses = []
+    raw_trades = fetch_quiver_congressional_trades(responses)
+
+    if responses and all(r.unchanged for r in responses):
+        print("\n✅ Quiver data unchanged since the last load - nothing to do")
+        return
 
     if not raw_trades:
         print("\n❌ No data fetched from Quiver API")
@@ -210,11 +185,34 @@ def main():
         print(f"📈 TOTAL TRADES FETCHED: {len(normalized_trades)}")
         print("=" * 60)
 
-        # Clear and save
-        clear_old_data()
-        saved_count = save_to_database(normalized_trades)
+        # Canonical politician ids, so API lookups don't depend on spelling
+        PoliticianDirectory(supabase).assign(normalized_trades)
+
+        if args.full_reload:
+            # Clear and save
+            clear_old_data()
+            saved_count = save_to_database(normalized_trades)
+            # Table was reloaded from scratch - rebuild every politician and day
+            changed_names = changed_days = None
+        else:
+            print(f"\n💾 Applying {len(normalized_trades)} trades as a diff...")
+            try:
+                applied = apply_snapshot(supabase, normalized_trades)
+            except Exception as e:
+                print(f"\n❌ Diff-apply failed, table left as it was: {e}")
+                print("💡 Run with --full-reload to replace the table anyway")
+                return
+            saved_count = applied["staged"]
+            changed_names = applied["member_names"]
+            changed_days = applied["trade_dates"]
 
         if saved_count > 0:
+            for response in responses:
+                response.mark_processed()
+
+            if changed_names is None or changed_names or changed_days:
+                refresh_analytics(supabase, changed_names, changed_days)
+
             print("\n📋 Sample trades:")
             for trade in normalized_trades[:5]:
                 print(f"  • {trade['member_name']}: {trade['ticker']} ({trade['trade_type']})")
@@ -4,12 +4,16 @@ Congressional Trading Data Fetcher
 Uses multiple free APIs to get real congressional trading data
 """
 
-import requests
 import json
 from supabase import create_client
 from dotenv import load_dotenv
 import os
 from datetime import datetime
+from analytics_refresh import refresh_analytics
+from http_cache import cached_get
+from trade_loader import TradeLoader
+from normalization import amount_bound
+from politician_directory import PoliticianDirectory
 
 load_dotenv()
 
@@ -19,6 +23,17 @@ supabase = create_client(
     os.getenv("SUPABASE_KEY")
 )
 
+# Every successful response this run, so an all-304 run can skip the reload
+responses = []
+
+
+def fetch(url, timeout):
+    """Conditional GET through http_cache, remembering successful responses."""
+    response = cached_get(url, timeout=timeout)
+    if response.status_code == 200:
+        responses.append(response)
+    return response
+
 def fetch_from_finnhub():
     """
     Fetch from Finnhub API (you already have API key!)
@@ -35,7 +50,7 @@ def fetch_from_finnhub():
     for ticker in tickers:
         try:
             url = f"https://finnhub.io/api/v1/stock/congress-trading?symbol={ticker}&token={API_KEY}"
-            response = requests.get(url, timeout=10)
+            response = fetch(url, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -57,7 +72,7 @@ def fetch_from_house_stock_watcher():
 
     try:
         url = "https://house-stock-watcher-data.s3-us-west-2.amazonaws.com/data/all_transactions.json"
-        response = requests.get(url, timeout=15)
+        response = fetch(url, timeout=15)
 
         if response.status_code == 200:
             data = response.json()
@@ -87,7 +102,7 @@ def fetch_from_fmp():
     try:
         # Senate trades
         url = f"https://financialmodelingprep.com/api/v4/senate-trading?apikey={FMP_KEY}"
-        response = requests.get(url, timeout=10)
+        response = fetch(url, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -95,7 +110,7 @@ def fetch_from_fmp():
 
             # House trades
             url2 = f"https://financialmodelingprep.com/api/v4/senate-disclosure?apikey={FMP_KEY}"
-            response2 = requests.get(url2, timeout=10)
+            response2 = fetch(url2, timeout=10)
 
             if response2.status_code == 200:
                 house_data = response2.json()
@@ -126,8 +141,8 @@ def normalize_trade_data(raw_data, source):
                     "disclosure_date": trade.get("filingDate"),
                     "ticker": trade.get("symbol", "").upper(),
                     "trade_type": trade.get("type", "Unknown"),
-                    "amount_low": parse_amount(trade.get("amount", "")),
-                    "amount_high": parse_amount(trade.get("amount", ""), is_high=True),
+                    "amount_low": amount_bound(trade.get("amount", "")),
+                    "amount_high": amount_bound(trade.get("amount", ""), is_high=True),
                     "party": None,  # Finnhub doesn't provide this
                     "chamber": "Unknown",
                     "company_name": None
@@ -140,8 +155,8 @@ def normalize_trade_data(raw_data, source):
                     "disclosure_date": trade.get("disclosure_date"),
                     "ticker": trade.get("ticker", "").upper(),
                     "trade_type": trade.get("type", "Unknown"),
-                    "amount_low": parse_amount(trade.get("amount", "")),
-                    "amount_high": parse_amount(trade.get("amount", ""), is_high=True),
+                    "amount_low": amount_bound(trade.get("amount", "")),
+                    "amount_high": amount_bound(trade.get("amount", ""), is_high=True),
                     "party": trade.get("party"),
                     "chamber": "House",
                     "company_name": trade.get("asset_description")
@@ -168,27 +183,6 @@ def normalize_trade_data(raw_data, source):
 
     return normalized
 
-def parse_amount(amount_str, is_high=False):
-    """
-    Parse amount ranges like "$1,001 - $15,000"
-    """
-    if not amount_str:
-        return None
-
-    try:
-        # Remove $ and commas
-        amount_str = str(amount_str).replace("$", "").replace(",", "")
-
-        # Check for range
-        if "-" in amount_str:
-            parts = amount_str.split("-")
-            return int(parts[1].strip()) if is_high else int(parts[0].strip())
-        else:
-            # Single value
-            return int(amount_str.strip())
-    except:
-        return None
-
 def save_to_database(trades):
     """
     Save trades to Supabase
@@ -206,20 +200,24 @@ def save_to_database(trades):
     except Exception as e:
         print(f"⚠️  Error clearing old data: {e}")
 
-    # Insert new data in batches
-    batch_size = 100
-    success_count = 0
+    PoliticianDirectory(supabase).assign(trades)
 
-    for i in range(0, len(trades), batch_size):
-        batch = trades[i:i + batch_size]
-        try:
-            supabase.table("congressional_trades").insert(batch).execute()
-            success_count += len(batch)
-            print(f"✅ Saved batch {i//batch_size + 1} ({len(batch)} trades)")
-        except Exception as e:
-            print(f"❌ Error saving batch: {e}")
+    # Upsert on the natural key in adaptive batches; bad rows are isolated
+    # by bisection instead of failing their whole batch
+    loader = TradeLoader(supabase, "congressional_trades", ignore_duplicates=False)
+    success_count = loader.load(trades)
+    loader.close()
 
-    print(f"\n🎉 Successfully saved {success_count}/{len(trades)} trades!")
+    if loader.failed:
+        print(f"❌ {len(loader.failed)} trades rejected by the database")
+    print(f"\n🎉 Successfully saved {success_count}/{len(trades)} trades! ({loader.calls} requests)")
+
+    if success_count:
+        for response in responses:
+            response.mark_processed()
+
+        # Table was reloaded from scratch - rebuild every precomputed table
+        refresh_analytics(supabase)
 
 def main():
     print("=" * 60)
@@ -241,6 +239,11 @@ def main():
     if fmp_data:
         all_trades.extend(normalize_trade_data(fmp_data, "fmp"))
 
+    # Every source answered 304 for data we already loaded - keep the table as is
+    if responses and all(r.unchanged for r in responses):
+        print("\n✅ No source changed since the last load - nothing to do")
+        return
+
     print("\n" + "=" * 60)
     print(f"📈 TOTAL TRADES COLLECTED: {len(all_trades)}")
     print("=" * 60)
@@ -0,0 +1,140 @@
+"""
+Source Record Fingerprints
+Local index of every raw record already ingested, so a run only normalizes
+and loads records it hasn't seen before.
+
+- A fingerprint is a 64-bit blake2b hash of the record's JSON text. Streamed
+  sources pass the text exactly as it arrived (json_stream with_text=True),
+  which skips re-serializing every record; otherwise the record is encoded
+  canonically (sorted keys, no whitespace). A feed that changes its
+  formatting just costs one full pass - the loads are idempotent upserts
+- Fingerprints live in a small SQLite file, one table keyed by (source, hash);
+  a source's hashes are read into a set the first time it's filtered
+- New fingerprints stay pending until commit(), which callers run only after
+  the load has gone through - a failed load is retried in full next time.
+  Rows the database rejected are discard()ed first, so they are retried too
+
+Usage:
+    index = FingerprintIndex()
+    records = index.filter("hsw", records)   # Only records not seen before
+    ...load...
+    index.discard("hsw", rejected_hashes)
+    index.commit()
+
+    with FingerprintIndex() as index:        # closes the SQLite file on exit
+        ...
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from hashlib import blake2b
+
+FINGERPRINT_DB = os.getenv("FINGERPRINT_DB", ".ingest_fingerprints.sqlite")
+
+_canonical = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str).encode
+
+
+def fingerprint(record, text=None):
+    """Signed 64-bit hash of a raw record or its source text (fits SQLite's INTEGER)."""
+    if text is None:
+        text = _canonical(record)
+    digest = blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class FingerprintIndex:
+    def __init__(self, path=FINGERPRINT_DB):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " source TEXT NOT NULL,"
+            " hash INTEGER NOT NULL,"
+            " PRIMARY KEY (source, hash)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._known = {}     # source -> set of committed hashes
+        self._pending = {}   # source -> set of hashes seen this run
+
+        self.checked = 0
+        self.skipped = 0
+
+    def _hashes(self, source):
+        if source not in self._known:
+            rows = self._conn.execute("SELECT hash FROM fingerprints WHERE source = ?", (source,))
+            self._known[source] = {h for (h,) in rows}
+            self._pending[source] = set()
+        return self._known[source], self._pending[source]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def filter(self, source, records, texts=None, skip_seen=True, with_hashes=False):
+        """
+        Records from `source` not ingested before (nor earlier in this run).
+        `texts` are the records' source JSON, when the caller has it.
+        With skip_seen=False nothing is dropped, but fingerprints are still
+        recorded - for full reloads that should leave the index up to date.
+        with_hashes=True returns (records, hashes) so rows can be discard()ed later.
+        """
+        if texts is None:
+            texts = [None] * len(records)
+        with self._lock:
+            known, pending = self._hashes(source)
+            fresh = []
+            hashes = []
+            for record, text in zip(records, texts):
+                h = fingerprint(record, text)
+                if h in known or h in pending:
+                    if skip_seen:
+                        continue
+                else:
+                    pending.add(h)
+                fresh.append(record)
+                hashes.append(h)
+
+            self.checked += len(records)
+            self.skipped += len(records) - len(fresh)
+            return (fresh, hashes) if with_hashes else fresh
+
+    def discard(self, source, hashes):
+        """Un-pend fingerprints of records that didn't load, so the next run retries them."""
+        with self._lock:
+            pending = self._pending.get(source)
+            if pending:
+                pending.difference_update(hashes)
+
+    def commit(self):
+        """Persist this run's new fingerprints. Call once the load has succeeded."""
+        with self._lock:
+            for source, pending in self._pending.items():
+                if not pending:
+                    continue
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO fingerprints (source, hash) VALUES (?, ?)",
+                    ((source, h) for h in pending),
+                )
+                self._known[source] |= pending
+                pending.clear()
+            self._conn.commit()
+
+    def forget(self, source):
+        """Drop every fingerprint for a source (e.g. after its table was cleared)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM fingerprints WHERE source = ?", (source,))
+            self._conn.commit()
+            self._known.pop(source, None)
+            self._pending.pop(source, None)
+
+    def stats(self):
+        return {"checked": self.checked, "skipped": self.skipped}
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,224 @@
+"""
+Conditional HTTP Cache
+Shared GET layer for the scrapers: remembers each URL's ETag / Last-Modified,
+sends conditional requests, and keeps the last body on disk (gzip) so that
+
+- a 304 costs one round trip instead of re-downloading the whole payload
+- scrapers can skip parsing and loading when the source hasn't changed
+  since the last successful load (`response.unchanged`)
+- re-runs and --dry-run can replay the cached bodies offline (--offline or
+  HTTP_CACHE_OFFLINE=1)
+
+Usage:
+    resp = cached_get(url, headers=HEADERS, stream=True)
+    if resp.unchanged:
+        return                       # Already loaded this exact payload
+    for chunk in resp.iter_content(65536): ...
+    ...load...
+    resp.mark_processed()            # Only after the load went through
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import requests
+
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".http_cache")
+
+# Serve only from the on-disk cache, never touch the network
+_offline = os.getenv("HTTP_CACHE_OFFLINE", "").lower() in ("1", "true", "yes")
+
+_CHUNK_SIZE = 65536
+
+
+def set_offline(enabled=True):
+    global _offline
+    _offline = enabled
+
+
+def is_offline():
+    return _offline
+
+
+def _cache_key(url, params):
+    raw = url + "?" + json.dumps(sorted((params or {}).items()), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class CachedResponse:
+    """
+    The subset of requests.Response the scrapers use. A 304 (or an offline
+    replay) looks like a 200 whose body comes from disk; check `not_modified`
+    / `unchanged` to tell them apart.
+    """
+
+    def __init__(self, url, key, status_code, meta=None, response=None, content=None,
+                 from_cache=False, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.from_cache = from_cache
+        self.not_modified = not_modified
+        self._key = key
+        self._meta = meta or {}
+        self._response = response
+        self._content = content
+
+    # --- cache files ---
+
+    @property
+    def _body_path(self):
+        return os.path.join(HTTP_CACHE_DIR, self._key + ".body.gz")
+
+    @property
+    def _meta_path(self):
+        return os.path.join(HTTP_CACHE_DIR, self._key + ".meta.json")
+
+    def _save_meta(self):
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, self._meta_path)
+
+    def _store(self, response, content=None):
+        """Record validators for a fresh 200 (body already written unless `content` given)."""
+        if content is not None:
+            tmp = self._body_path + ".tmp"
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(content)
+            os.replace(tmp, self._body_path)
+
+        self._meta = {
+            "url": self.url.split("?")[0],  # Query strings can carry API keys
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "processed": False,
+        }
+        self._save_meta()
+
+    # --- requests.Response-like API ---
+
+    @property
+    def unchanged(self):
+        """304 for a payload that a previous run already loaded successfully."""
+        return self.not_modified and bool(self._meta.get("processed"))
+
+    def iter_content(self, chunk_size=_CHUNK_SIZE):
+        if self._content is not None:
+            for i in range(0, len(self._content), chunk_size):
+                yield self._content[i : i + chunk_size]
+        elif self.from_cache:
+            with gzip.open(self._body_path, "rb") as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        elif self._response is not None:
+            yield from self._tee(chunk_size)
+
+    def _tee(self, chunk_size):
+        """Stream a fresh 200 from the network while writing it to the cache."""
+        response, self._response = self._response, None
+        if response.status_code != 200:
+            yield from response.iter_content(chunk_size=chunk_size)
+            response.close()
+            return
+
+        tmp = self._body_path + ".tmp"
+        complete = False
+        try:
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            response.close()
+            if complete:
+                os.replace(tmp, self._body_path)
+                self._store(response)
+            elif os.path.exists(tmp):
+                os.remove(tmp)
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = b"".join(self.iter_content())
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def mark_processed(self):
+        """Call after the payload has been loaded, so the next 304 can be skipped."""
+        if self._meta and not self._meta.get("processed"):
+            self._meta["processed"] = True
+            self._save_meta()
+
+    def close(self):
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _load_meta(key):
+    try:
+        with open(os.path.join(HTTP_CACHE_DIR, key + ".meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cached_get(url, params=None, headers=None, timeout=30, stream=False):
+    """
+    Conditional GET through the on-disk cache. Returns a CachedResponse.
+    Non-200 responses pass through uncached. Offline with nothing cached -> 504.
+    """
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    key = _cache_key(url, params)
+    meta = _load_meta(key)
+    has_body = meta is not None and os.path.exists(os.path.join(HTTP_CACHE_DIR, key + ".body.gz"))
+
+    if _offline:
+        if not has_body:
+            print(f"  [cache] Offline and nothing cached for {url.split('?')[0]}")
+            return CachedResponse(url, key, 504)
+        return CachedResponse(url, key, 200, meta=meta, from_cache=True)
+
+    request_headers = dict(headers or {})
+    if has_body:
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = requests.get(url, params=params, headers=request_headers, timeout=timeout, stream=stream)
+
+    if response.status_code == 304 and has_body:
+        response.close()
+        print(f"  [cache] {url.split('?')[0]} not modified since {meta.get('fetched_at', '?')[:19]}")
+        return CachedResponse(url, key, 200, meta=meta, from_cache=True, not_modified=True)
+
+    cached = CachedResponse(url, key, response.status_code, response=response)
+    if not stream:
+        content = response.content
+        response.close()
+        cached._response = None
+        cached._content = content
+        if response.status_code == 200:
+            cached._store(response, content)
+    return cached
@@ -0,0 +1,339 @@
+-- =====================================================
+-- Congressional Trading Intelligence
+-- Ingestion Schema
+-- =====================================================
+-- Constraints and bookkeeping tables used by the scrapers/loaders.
+-- Run after create_table.sql in the Supabase SQL Editor. Every statement is
+-- safe to re-run, so new sections are applied by running the whole file again.
+
+-- =====================================================
+-- 1. NATURAL KEY CONSTRAINTS
+-- =====================================================
+-- One row per (member_name, ticker, trade_date, trade_type).
+-- Loaders upsert on this key, so re-running a load never duplicates rows
+-- and no loader has to scan the table for existing keys first.
+
+-- Remove duplicates that slipped in before the constraint existed (keeps the oldest row)
+DELETE FROM public.trades a
+    USING public.trades b
+    WHERE a.id > b.id
+      AND a.member_name = b.member_name
+      AND a.ticker = b.ticker
+      AND a.trade_date = b.trade_date
+      AND a.trade_type = b.trade_type;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'trades_natural_key') THEN
+        ALTER TABLE public.trades
+            ADD CONSTRAINT trades_natural_key
+            UNIQUE (member_name, ticker, trade_date, trade_type);
+    END IF;
+END $$;
+
+DELETE FROM public.congressional_trades a
+    USING public.congressional_trades b
+    WHERE a.id > b.id
+      AND a.member_name = b.member_name
+      AND a.ticker = b.ticker
+      AND a.trade_date = b.trade_date
+      AND a.trade_type = b.trade_type;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'congressional_trades_natural_key') THEN
+        ALTER TABLE public.congressional_trades
+            ADD CONSTRAINT congressional_trades_natural_key
+            UNIQUE (member_name, ticker, trade_date, trade_type);
+    END IF;
+END $$;
+
+-- =====================================================
+-- 2. INGESTION WATERMARKS
+-- =====================================================
+-- How far each source has been loaded (see ingest_state.py)
+
+CREATE TABLE IF NOT EXISTS public.ingestion_watermarks (
+    source TEXT PRIMARY KEY,              -- 'hsw', 'finnhub', 'capitol_trades', ...
+    max_disclosure_date DATE,             -- Latest filing loaded from this source
+    last_source_id TEXT,                  -- Latest source-side record id, where the source has one
+    rows_loaded BIGINT DEFAULT 0,         -- New filings processed by the last run
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE public.ingestion_watermarks ENABLE ROW LEVEL SECURITY;
+-- No policies: only the service role (scrapers) reads or writes watermarks
+
+-- =====================================================
+-- 3. STAGED DIFF-APPLY FOR CONGRESSIONAL_TRADES
+-- =====================================================
+-- Full-snapshot loaders (fetch_quiver_fixed.py) write the snapshot here, then
+-- apply_congressional_trades_staging() inserts new keys, updates changed rows
+-- and deletes keys missing from the snapshot in one transaction. The API keeps
+-- reading the previous table until the apply commits, and unchanged rows are
+-- never rewritten. See diff_apply.py.
+
+CREATE TABLE IF NOT EXISTS public.congressional_trades_staging (
+    member_name TEXT NOT NULL,
+    trade_date DATE NOT NULL,
+    disclosure_date DATE,
+    ticker TEXT NOT NULL,
+    trade_type TEXT NOT NULL,
+    amount_low NUMERIC,
+    amount_high NUMERIC,
+    party TEXT,
+    chamber TEXT,
+    company_name TEXT,
+    politician_id BIGINT,                 -- Canonical id (section 4), NULL if unresolved
+    CONSTRAINT congressional_trades_staging_natural_key
+        UNIQUE (member_name, ticker, trade_date, trade_type)
+);
+
+-- Staging tables created before the politician directory existed
+ALTER TABLE public.congressional_trades_staging ADD COLUMN IF NOT EXISTS politician_id BIGINT;
+
+ALTER TABLE public.congressional_trades_staging ENABLE ROW LEVEL SECURITY;
+-- No policies: only the service role (loaders) touches staging
+
+-- Empty staging before a load (leftovers from a run that died mid-way)
+CREATE OR REPLACE FUNCTION reset_congressional_trades_staging()
+RETURNS VOID AS $$
+BEGIN
+    TRUNCATE public.congressional_trades_staging;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Make congressional_trades match staging. Refuses (and changes nothing) when
+-- staging is empty or the snapshot would delete more than p_max_delete_fraction
+-- of the table - usually a truncated or partial feed rather than real deletions.
+-- Returns the counts plus the politicians and trade dates whose rows changed,
+-- so the analytics refresh only recomputes those (analytics_refresh.py).
+-- A NULL staged politician_id never clears an id already on the row, and rows
+-- still missing one pick it up on the next apply.
+-- p_keep_keys lists the natural keys of snapshot rows staging rejected
+-- ([{"member_name", "ticker", "trade_date", "trade_type"}, ...]): they're in
+-- the feed, so their live rows are kept rather than deleted as missing.
+DROP FUNCTION IF EXISTS apply_congressional_trades_staging(NUMERIC);
+CREATE OR REPLACE FUNCTION apply_congressional_trades_staging(
+    p_max_delete_fraction NUMERIC DEFAULT 0.5,
+    p_keep_keys JSONB DEFAULT '[]'::jsonb
+)
+RETURNS TABLE (inserted INTEGER, updated INTEGER, deleted INTEGER, member_names TEXT[], trade_dates DATE[]) AS $$
+DECLARE
+    v_staged INTEGER;
+    v_total INTEGER;
+    v_missing INTEGER;
+    v_inserted TEXT[];
+    v_updated TEXT[];
+    v_deleted TEXT[];
+    v_inserted_days DATE[];
+    v_updated_days DATE[];
+    v_deleted_days DATE[];
+BEGIN
+    SELECT COUNT(*) INTO v_staged FROM public.congressional_trades_staging;
+    IF v_staged = 0 THEN
+        RAISE EXCEPTION 'congressional_trades_staging is empty - refusing to apply';
+    END IF;
+
+    SELECT COUNT(*) INTO v_total FROM public.congressional_trades;
+    SELECT COUNT(*) INTO v_missing
+    FROM public.congressional_trades t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM public.congressional_trades_staging s
+        WHERE s.member_name = t.member_name AND s.ticker = t.ticker
+          AND s.trade_date = t.trade_date AND s.trade_type = t.trade_type
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM jsonb_to_recordset(p_keep_keys)
+            AS k(member_name TEXT, ticker TEXT, trade_date TEXT, trade_type TEXT)
+        WHERE k.member_name = t.member_name AND k.ticker = t.ticker
+          AND k.trade_date = t.trade_date::TEXT AND k.trade_type = t.trade_type
+    );
+    IF v_total > 0 AND v_missing > v_total * p_max_delete_fraction THEN
+        RAISE EXCEPTION 'snapshot would delete % of % rows - refusing to apply', v_missing, v_total;
+    END IF;
+
+    WITH d AS (
+        DELETE FROM public.congressional_trades t
+        WHERE NOT EXISTS (
+            SELECT 1 FROM public.congressional_trades_staging s
+            WHERE s.member_name = t.member_name AND s.ticker = t.ticker
+              AND s.trade_date = t.trade_date AND s.trade_type = t.trade_type
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM jsonb_to_recordset(p_keep_keys)
+                AS k(member_name TEXT, ticker TEXT, trade_date TEXT, trade_type TEXT)
+            WHERE k.member_name = t.member_name AND k.ticker = t.ticker
+              AND k.trade_date = t.trade_date::TEXT AND k.trade_type = t.trade_type
+        )
+        RETURNING t.member_name, t.trade_date
+    )
+    SELECT array_agg(member_name), array_agg(trade_date) INTO v_deleted, v_deleted_days FROM d;
+
+    WITH u AS (
+        UPDATE public.congressional_trades t SET
+            disclosure_date = s.disclosure_date,
+            amount_low = s.amount_low,
+            amount_high = s.amount_high,
+            party = s.party,
+            chamber = s.chamber,
+            company_name = s.company_name,
+            politician_id = COALESCE(s.politician_id, t.politician_id)
+        FROM public.congressional_trades_staging s
+        WHERE s.member_name = t.member_name AND s.ticker = t.ticker
+          AND s.trade_date = t.trade_date AND s.trade_type = t.trade_type
+          AND (t.disclosure_date, t.amount_low, t.amount_high, t.party, t.chamber, t.company_name,
+               t.politician_id)
+              IS DISTINCT FROM
+              (s.disclosure_date, s.amount_low, s.amount_high, s.party, s.chamber, s.company_name,
+               COALESCE(s.politician_id, t.politician_id))
+        RETURNING t.member_name, t.trade_date
+    )
+    SELECT array_agg(member_name), array_agg(trade_date) INTO v_updated, v_updated_days FROM u;
+
+    WITH i AS (
+        INSERT INTO public.congressional_trades
+            (member_name, trade_date, disclosure_date, ticker, trade_type,
+             amount_low, amount_high, party, chamber, company_name, politician_id)
+        SELECT s.member_name, s.trade_date, s.disclosure_date, s.ticker, s.trade_type,
+               s.amount_low, s.amount_high, s.party, s.chamber, s.company_name, s.politician_id
+        FROM public.congressional_trades_staging s
+        ON CONFLICT (member_name, ticker, trade_date, trade_type) DO NOTHING
+        RETURNING member_name, trade_date
+    )
+    SELECT array_agg(member_name), array_agg(trade_date) INTO v_inserted, v_inserted_days FROM i;
+
+    TRUNCATE public.congressional_trades_staging;
+
+    RETURN QUERY SELECT
+        COALESCE(cardinality(v_inserted), 0),
+        COALESCE(cardinality(v_updated), 0),
+        COALESCE(cardinality(v_deleted), 0),
+        ARRAY(
+            SELECT DISTINCT n
+            FROM unnest(COALESCE(v_inserted, '{}') || COALESCE(v_updated, '{}') || COALESCE(v_deleted, '{}')) AS n
+        ),
+        ARRAY(
+            SELECT DISTINCT d
+            FROM unnest(COALESCE(v_inserted_days, '{}') || COALESCE(v_updated_days, '{}') || COALESCE(v_deleted_days, '{}')) AS d
+        );
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- =====================================================
+-- 4. POLITICIAN DIRECTORY
+-- =====================================================
+-- One row per person, whatever the sources call them. politician_aliases maps
+-- every member_name spelling seen at ingest to its politician; spellings with
+-- the same name_key ("Pelosi, Nancy" / "Hon. Nancy Pelosi" -> 'nancy pelosi',
+-- normalization.py) share a politician. Loaders stamp politician_id on each
+-- trade (politician_directory.py), so the API looks trades up by id instead of
+-- ILIKE '%name%'. Run before the loaders that write politician_id.
+--
+-- The key drops titles and middle initials, so two members can share it: a
+-- politician is (name_key, chamber, state), '' where the source didn't say.
+-- A spelling matching more than one politician gets no id (ambiguous) and the
+-- API falls back to name matching for it.
+
+CREATE TABLE IF NOT EXISTS public.politicians (
+    id BIGSERIAL PRIMARY KEY,
+    canonical_name TEXT NOT NULL,         -- First spelling seen; edit freely
+    name_key TEXT NOT NULL,               -- normalization.name_key()
+    chamber TEXT NOT NULL DEFAULT '',     -- 'House' / 'Senate' / '' unknown
+    state TEXT NOT NULL DEFAULT '',       -- Two-letter code / '' unknown
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT politicians_identity_key UNIQUE (name_key, chamber, state)
+);
+
+CREATE TABLE IF NOT EXISTS public.politician_aliases (
+    alias TEXT NOT NULL,                  -- member_name exactly as a source spells it
+    chamber TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT '',
+    name_key TEXT NOT NULL,
+    politician_id BIGINT NOT NULL REFERENCES public.politicians(id) ON DELETE CASCADE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT politician_aliases_identity_key PRIMARY KEY (alias, chamber, state)
+);
+
+-- Directories created when a name_key / alias alone identified a politician
+ALTER TABLE public.politicians ADD COLUMN IF NOT EXISTS chamber TEXT NOT NULL DEFAULT '';
+ALTER TABLE public.politicians ADD COLUMN IF NOT EXISTS state TEXT NOT NULL DEFAULT '';
+ALTER TABLE public.politician_aliases ADD COLUMN IF NOT EXISTS chamber TEXT NOT NULL DEFAULT '';
+ALTER TABLE public.politician_aliases ADD COLUMN IF NOT EXISTS state TEXT NOT NULL DEFAULT '';
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'politicians_identity_key') THEN
+        ALTER TABLE public.politicians DROP CONSTRAINT IF EXISTS politicians_name_key_key;
+        ALTER TABLE public.politicians
+            ADD CONSTRAINT politicians_identity_key
+            UNIQUE (name_key, chamber, state);
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'politician_aliases_identity_key') THEN
+        ALTER TABLE public.politician_aliases DROP CONSTRAINT IF EXISTS politician_aliases_pkey;
+        ALTER TABLE public.politician_aliases
+            ADD CONSTRAINT politician_aliases_identity_key
+            PRIMARY KEY (alias, chamber, state);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_politician_aliases_politician_id
+    ON public.politician_aliases(politician_id);
+
+ALTER TABLE public.congressional_trades
+    ADD COLUMN IF NOT EXISTS politician_id BIGINT REFERENCES public.politicians(id) ON DELETE SET NULL;
+
+-- Trade lookups by politician, newest first (matches the keyset pagination order)
+CREATE INDEX IF NOT EXISTS idx_politician_id_trade_date
+    ON public.congressional_trades(politician_id, trade_date DESC, id DESC);
+
+-- Public read: the API builds its name search index from these
+ALTER TABLE public.politicians ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.politician_aliases ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access" ON public.politicians;
+CREATE POLICY "Allow public read access" ON public.politicians
+    FOR SELECT USING (true);
+
+DROP POLICY IF EXISTS "Allow public read access" ON public.politician_aliases;
+CREATE POLICY "Allow public read access" ON public.politician_aliases
+    FOR SELECT USING (true);
+
+-- =====================================================
+-- VERIFICATION QUERIES
+-- =====================================================
+
+-- Watermarks after a run:
+-- SELECT * FROM ingestion_watermarks ORDER BY source;
+
+-- Reset a source to force a full reload on the next run:
+-- DELETE FROM ingestion_watermarks WHERE source = 'hsw';
+
+-- Rows waiting in staging (should be 0 between runs):
+-- SELECT COUNT(*) FROM congressional_trades_staging;
+
+-- Spellings that were merged into one politician:
+-- SELECT p.canonical_name, array_agg(a.alias) FROM politicians p
+--     JOIN politician_aliases a ON a.politician_id = p.id
+--     GROUP BY p.id HAVING COUNT(*) > 1;
+
+-- Name keys shared by more than one politician (lookups by these names are ambiguous):
+-- SELECT name_key, array_agg(canonical_name || ' ' || chamber || ' ' || state)
+--     FROM politicians GROUP BY name_key HAVING COUNT(*) > 1;
+
+-- Politicians whose trades span chambers - merged before chamber/state were tracked:
+-- SELECT politician_id, array_agg(DISTINCT member_name), array_agg(DISTINCT chamber)
+--     FROM congressional_trades WHERE politician_id IS NOT NULL
+--     GROUP BY politician_id HAVING COUNT(DISTINCT chamber) > 1;
+
+-- Merge a spelling the name key missed ("Tommy" vs "Thomas"):
+-- UPDATE politician_aliases SET politician_id = <keep> WHERE politician_id = <drop>;
+-- UPDATE congressional_trades SET politician_id = <keep> WHERE politician_id = <drop>;
+-- DELETE FROM politicians WHERE id = <drop>;
+
+-- Trades still without an id (run python politician_directory.py --backfill):
+-- SELECT COUNT(*) FROM congressional_trades WHERE politician_id IS NULL;
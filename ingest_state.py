@@ -0,0 +1,128 @@
+"""
+Ingestion State
+Per-source watermarks so scheduled runs only handle filings newer than the
+last successful load. Stored in the ingestion_watermarks table (ingest_schema.sql)
+so they survive ephemeral CI runners.
+
+The watermark is the latest disclosure_date loaded from a source. Filings can be
+amended or published late, so each run re-reads a small overlap window before the
+watermark - re-inserting those rows is harmless because loads are idempotent
+upserts on the natural key.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+WATERMARK_TABLE = "ingestion_watermarks"
+
+# Re-read this many days before the watermark to catch late/amended filings
+WATERMARK_OVERLAP_DAYS = 14
+
+# Natural key enforced by the unique constraints in ingest_schema.sql
+NATURAL_KEY = ("member_name", "ticker", "trade_date", "trade_type")
+NATURAL_KEY_CONFLICT = ",".join(NATURAL_KEY)
+
+
+def natural_key(trade):
+    return tuple(trade.get(column) for column in NATURAL_KEY)
+
+
+def iso_date(value):
+    """YYYY-MM-DD from the date formats our sources use (ISO, or MM/DD/YYYY from HSW)."""
+    if not value:
+        return None
+    value = str(value).strip()
+    if len(value) >= 10 and value[4] == "-":
+        return value[:10]
+    try:
+        return datetime.strptime(value, "%m/%d/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def get_watermark(supabase, source):
+    """Return the stored watermark row for a source, or None on first run."""
+    try:
+        result = (
+            supabase.table(WATERMARK_TABLE)
+            .select("*")
+            .eq("source", source)
+            .maybe_single()
+            .execute()
+        )
+        return result.data if result else None
+    except Exception as e:
+        print(f"  Warning: Could not read watermark for {source} ({e}). Loading everything.")
+        return None
+
+
+def set_watermark(supabase, source, max_disclosure_date=None, last_source_id=None, rows_loaded=0):
+    """Advance a source's watermark after a successful load."""
+    row = {
+        "source": source,
+        "rows_loaded": rows_loaded,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if max_disclosure_date:
+        row["max_disclosure_date"] = max_disclosure_date
+    if last_source_id:
+        row["last_source_id"] = last_source_id
+
+    try:
+        supabase.table(WATERMARK_TABLE).upsert(row, on_conflict="source").execute()
+        print(f"  [{source}] Watermark -> {max_disclosure_date or last_source_id}")
+    except Exception as e:
+        print(f"  Warning: Could not save watermark for {source} ({e})")
+
+
+def watermark_cutoff(watermark, overlap_days=WATERMARK_OVERLAP_DAYS):
+    """Earliest disclosure_date (YYYY-MM-DD) still worth processing, or None for everything."""
+    if not watermark or not watermark.get("max_disclosure_date"):
+        return None
+    high = datetime.strptime(iso_date(watermark["max_disclosure_date"]), "%Y-%m-%d")
+    return (high - timedelta(days=overlap_days)).strftime("%Y-%m-%d")
+
+
+def filter_since_watermark(trades, watermark, overlap_days=WATERMARK_OVERLAP_DAYS):
+    """
+    Drop trades disclosed before the watermark's overlap window.
+    Trades without a readable disclosure date are always kept (we can't tell their age).
+    """
+    cutoff = watermark_cutoff(watermark, overlap_days)
+    if not cutoff:
+        return trades
+
+    kept = []
+    for t in trades:
+        disclosed = iso_date(t.get("disclosure_date"))
+        if not disclosed or disclosed >= cutoff:
+            kept.append(t)
+    return kept
+
+
+def max_disclosure_date(trades):
+    """Latest YYYY-MM-DD disclosure_date in a batch of trades, or None."""
+    dates = [iso_date(t.get("disclosure_date")) for t in trades]
+    dates = [d for d in dates if d]
+    return max(dates) if dates else None
+
+
+def iso_dates(values):
+    """iso_date over a whole column, parsing each distinct value once."""
+    table = {}
+    out = []
+    for value in values:
+        if value not in table:
+            table[value] = iso_date(value)
+        out.append(table[value])
+    return out
+
+
+def watermark_mask(iso_disclosure_dates, watermark, overlap_days=WATERMARK_OVERLAP_DAYS):
+    """
+    Columnar filter_since_watermark: one keep/drop flag per (already ISO) date,
+    or None when there is no watermark and everything is kept.
+    """
+    cutoff = watermark_cutoff(watermark, overlap_days)
+    if not cutoff:
+        return None
+    return [not d or d >= cutoff for d in iso_disclosure_dates]
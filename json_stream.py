@@ -0,0 +1,114 @@
+"""
+Streaming JSON Array Parser
+Parse a top-level JSON array element by element while the bytes are still
+arriving, so a multi-megabyte dump never has to sit in memory as one string
+or one giant list.
+
+Usage:
+    resp = requests.get(url, stream=True)
+    for record in iter_json_array(resp.iter_content(chunk_size=65536)):
+        ...
+"""
+
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+# Drop consumed text from the buffer once this much has piled up
+_COMPACT_AT = 1 << 16
+
+
+def _skip(buf, pos, chars):
+    while pos < len(buf) and buf[pos] in chars:
+        pos += 1
+    return pos
+
+
+def iter_json_array(chunks, container_keys=("data", "transactions"), encoding="utf-8", with_text=False):
+    """
+    Yield each element of a JSON array from an iterable of byte (or str) chunks.
+
+    If the document turns out to be an object instead of an array, it is read
+    whole and the elements of the first list found under `container_keys` are
+    yielded - some sources wrap their array as {"data": [...]}.
+
+    with_text=True yields (element, source_text) pairs instead, the text being
+    the element exactly as it appeared in the document (None for wrapped
+    documents) - lets callers fingerprint records without re-serializing them.
+    """
+    decode = codecs.getincrementaldecoder(encoding)()
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+
+    def more():
+        nonlocal buf, eof
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            eof = True
+            buf += decode.decode(b"", final=True)
+            return False
+        buf += decode.decode(chunk) if isinstance(chunk, bytes) else chunk
+        return True
+
+    # Find the opening bracket (or brace)
+    while True:
+        pos = _skip(buf, pos, _WHITESPACE)
+        if pos < len(buf):
+            break
+        if not more():
+            return
+
+    if buf[pos] == "{":
+        while more():
+            pass
+        document = json.loads(buf[pos:])
+        for key in container_keys:
+            if isinstance(document.get(key), list):
+                if with_text:
+                    yield from ((element, None) for element in document[key])
+                else:
+                    yield from document[key]
+                return
+        return
+
+    if buf[pos] != "[":
+        raise ValueError(f"Expected a JSON array, found {buf[pos]!r}")
+    pos += 1
+
+    while True:
+        pos = _skip(buf, pos, _WHITESPACE + ",")
+        if pos >= len(buf):
+            if not more():
+                raise ValueError("Unexpected end of JSON array")
+            continue
+
+        if buf[pos] == "]":
+            # Drain trailing whitespace so the chunk source runs to completion
+            while more():
+                pass
+            return
+
+        try:
+            element, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Element continues in the next chunk
+            if not more():
+                raise
+            continue
+
+        if end >= len(buf) and not eof:
+            # A bare number could still be growing - wait for the next chunk
+            if more():
+                continue
+
+        yield (element, buf[pos:end]) if with_text else element
+        pos = end
+
+        if pos > _COMPACT_AT:
+            buf = buf[pos:]
+            pos = 0
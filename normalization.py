@@ -0,0 +1,162 @@
+"""
+Trade Field Normalization
+Shared parsing for the raw fields every source hands us (amount ranges, trade
+types, chambers, states, politician names), used by all the ingest scripts.
+
+The set of distinct raw values is tiny - a few dozen amount strings and trade
+types across hundreds of thousands of records - so the parsers are memoized
+and each distinct string is only ever parsed once per process.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+AMOUNT_RANGES = {
+    "$1,001 - $15,000": (1001, 15000),
+    "$1,001 -": (1001, 15000),
+    "$15,001 - $50,000": (15001, 50000),
+    "$15,001 -": (15001, 50000),
+    "$50,001 - $100,000": (50001, 100000),
+    "$50,001 -": (50001, 100000),
+    "$100,001 - $250,000": (100001, 250000),
+    "$100,001 -": (100001, 250000),
+    "$250,001 - $500,000": (250001, 500000),
+    "$250,001 -": (250001, 500000),
+    "$500,001 - $1,000,000": (500001, 1000000),
+    "$500,001 -": (500001, 1000000),
+    "$1,000,001 - $5,000,000": (1000001, 5000000),
+    "$1,000,001 -": (1000001, 5000000),
+    "$5,000,001 - $25,000,000": (5000001, 25000000),
+    "$5,000,001 -": (5000001, 25000000),
+    "$25,000,001 - $50,000,000": (25000001, 50000000),
+    "$50,000,001 and Over": (50000001, 100000000),
+    "Over $50,000,000": (50000001, 100000000),
+}
+
+# Numbers like "1,001", "15000" or "15000.50" inside an amount string
+_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+_CACHE_SIZE = 4096
+
+# Titles and suffixes sources put around the same name ("Hon. ... Jr.")
+_NAME_NOISE = {
+    "hon", "honorable", "rep", "representative", "sen", "senator",
+    "dr", "mr", "mrs", "ms", "jr", "sr", "ii", "iii", "iv",
+}
+
+
+# ============================================
+# AMOUNTS
+# ============================================
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_amount(amount_str):
+    """Parse STOCK Act amount range string into (low, high) integers."""
+    if not amount_str:
+        return None, None
+    if isinstance(amount_str, (int, float)):
+        return int(amount_str), int(amount_str)
+
+    amount_str = str(amount_str).strip()
+
+    # Direct lookup
+    if amount_str in AMOUNT_RANGES:
+        return AMOUNT_RANGES[amount_str]
+
+    # Try partial match (truncated or padded STOCK Act ranges)
+    for key, (low, high) in AMOUNT_RANGES.items():
+        if key in amount_str or amount_str in key:
+            return low, high
+
+    # Try to extract numbers
+    numbers = _NUMBER_RE.findall(amount_str)
+    try:
+        if len(numbers) >= 2:
+            return int(float(numbers[0].replace(",", ""))), int(float(numbers[1].replace(",", "")))
+        if len(numbers) == 1:
+            value = int(float(numbers[0].replace(",", "")))
+            return value, value
+    except ValueError:
+        pass
+
+    return None, None
+
+
+def amount_bound(amount, is_high=False):
+    """One end of an amount range - for loaders that store low and high separately."""
+    low, high = parse_amount(amount)
+    return high if is_high else low
+
+
+# ============================================
+# CATEGORICAL FIELDS
+# ============================================
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalize_trade_type(raw_type):
+    """Normalize trade type to match DB constraint: Purchase, Sale, Exchange."""
+    if not raw_type:
+        return None
+    raw = raw_type.lower().strip()
+    if "purchase" in raw or "buy" in raw:
+        return "Purchase"
+    elif "sale" in raw or "sell" in raw:
+        return "Sale"
+    elif "exchange" in raw or "swap" in raw:
+        return "Exchange"
+    return None
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def normalize_chamber(position):
+    """Normalize chamber from various formats."""
+    if not position:
+        return None
+    pos = position.lower().strip()
+    if "senator" in pos or "senate" in pos:
+        return "Senate"
+    elif "representative" in pos or "house" in pos or "rep" in pos:
+        return "House"
+    return None
+
+
+def extract_state(district):
+    """State from a district code (e.g. "CA12" -> "CA")."""
+    if district and len(district) >= 2:
+        return district[:2].upper()
+    return None
+
+
+# ============================================
+# NAMES
+# ============================================
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def name_key(name):
+    """
+    Spelling-insensitive politician key, so the same person matches across sources:
+    "Hon. Nancy Pelosi", "Pelosi, Nancy" and "Nancy P. Pelosi" -> "nancy pelosi".
+    """
+    if not name:
+        return None
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    text = text.replace("'", "")  # O'Rourke -> orourke, not a dropped "o"
+    if "," in text:
+        # "Last, First" -> "First Last" ("Smith, Jr." ends up as a dropped suffix)
+        last, _, first = text.partition(",")
+        text = f"{first} {last}"
+    tokens = [t for t in re.split(r"[^a-z]+", text) if t and t not in _NAME_NOISE]
+    # Middle initials vary by source; keep first and last name whatever their length
+    tokens = [t for i, t in enumerate(tokens) if len(t) > 1 or i in (0, len(tokens) - 1)]
+    return " ".join(tokens) or None
+
+
+def cache_stats():
+    """Hit rates of the memoized parsers - handy when profiling a backfill."""
+    return {
+        "parse_amount": parse_amount.cache_info()._asdict(),
+        "normalize_trade_type": normalize_trade_type.cache_info()._asdict(),
+        "normalize_chamber": normalize_chamber.cache_info()._asdict(),
+        "name_key": name_key.cache_info()._asdict(),
+    }
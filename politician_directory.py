@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Politician Directory
+Canonical politician ids for congressional_trades (ingest_schema.sql, section 4).
+
+Sources spell the same person differently ("Hon. Nancy Pelosi", "Pelosi, Nancy").
+Every spelling seen at ingest is recorded in politician_aliases and mapped to one
+politicians row via normalization.name_key(), and each trade is stamped with that
+politician_id - so API lookups are an indexed equality filter, not an ILIKE scan.
+
+Different members can share a name key, so a politician is identified by
+(name_key, chamber, state), using whichever of chamber/state the source
+provides. A spelling joins an existing politician only when exactly one
+compatible politician has its key; when several do it is ambiguous and the
+trades are left without an id (the API then falls back to name matching).
+
+Usage:
+  directory = PoliticianDirectory(supabase)
+  directory.assign(trades)                  # sets trade["politician_id"] in place
+
+  python politician_directory.py --backfill # stamp rows loaded before the directory existed
+"""
+
+import os
+import argparse
+from dotenv import load_dotenv
+from supabase import create_client
+
+from analytics_refresh import refresh_politician_aggregates
+from normalization import name_key, normalize_chamber
+
+load_dotenv()
+
+POLITICIANS_TABLE = "politicians"
+ALIASES_TABLE = "politician_aliases"
+
+# PostgREST returns at most this many rows per request
+PAGE_SIZE = 1000
+
+
+def _select_all(supabase, table, columns):
+    """Every row of a small table, one page at a time"""
+    rows = []
+    while True:
+        page = (
+            supabase.table(table)
+            .select(columns)
+            .range(len(rows), len(rows) + PAGE_SIZE - 1)
+            .execute()
+            .data
+        )
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def identity(trade):
+    """(member_name, chamber, state) as the directory keys it - '' where the source has no value"""
+    state = trade.get("state")
+    return (
+        trade.get("member_name"),
+        normalize_chamber(trade.get("chamber")) or "",
+        state.strip().upper() if isinstance(state, str) else "",
+    )
+
+
+def _compatible(a, b):
+    """Chamber/state agree wherever both sides know them"""
+    return all(x == y or not x or not y for x, y in zip(a, b))
+
+
+class PoliticianDirectory:
+    """
+    (member_name, chamber, state) -> politician id, loaded once and extended as
+    new spellings show up
+    """
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+        self.aliases = {}   # identity() -> id
+        self.by_key = {}    # name_key -> {(chamber, state): id}
+        self.created = 0
+        self.ambiguous = 0
+        self._loaded = False
+
+    def load(self):
+        for row in _select_all(self.supabase, POLITICIANS_TABLE, "id,name_key,chamber,state"):
+            self.by_key.setdefault(row["name_key"], {})[(row["chamber"], row["state"])] = row["id"]
+        for row in _select_all(self.supabase, ALIASES_TABLE, "alias,chamber,state,politician_id"):
+            self.aliases[(row["alias"], row["chamber"], row["state"])] = row["politician_id"]
+        self._loaded = True
+
+    def _match(self, key, attrs):
+        """
+        Id of the one politician with this key compatible with attrs.
+        Returns (id, ambiguous) - (None, False) when nobody matches yet.
+        """
+        matches = [i for known, i in self.by_key.get(key, {}).items() if _compatible(known, attrs)]
+        if len(matches) == 1:
+            return matches[0], False
+        return None, len(matches) > 1
+
+    def resolve(self, identities):
+        """
+        Ids for the given identity() tuples, creating politicians and aliases for
+        unseen ones. Returns {identity: politician_id}, None where ambiguous.
+        """
+        if not self._loaded:
+            self.load()
+
+        unseen = {i for i in identities if i[0] and i not in self.aliases and name_key(i[0])}
+        ids = {i: self.aliases.get(i) for i in identities}
+        if not unseen:
+            return ids
+
+        # Most specific first, so "John Smith" (no chamber) can't claim a key
+        # before the House and Senate John Smiths have each been seen
+        ordered = sorted(unseen, key=lambda i: (-bool(i[1]) - bool(i[2]), i))
+        new_politicians = {}
+        for name, chamber, state in ordered:
+            key = name_key(name)
+            if any(k == key and _compatible(attrs, (chamber, state)) for k, attrs in new_politicians):
+                continue
+            politician_id, ambiguous = self._match(key, (chamber, state))
+            if politician_id is None and not ambiguous:
+                # First spelling of a new politician becomes its canonical name
+                new_politicians[(key, (chamber, state))] = name
+
+        if new_politicians:
+            result = self.supabase.table(POLITICIANS_TABLE).upsert(
+                [{"canonical_name": name, "name_key": key, "chamber": attrs[0], "state": attrs[1]}
+                 for (key, attrs), name in new_politicians.items()],
+                on_conflict="name_key,chamber,state",
+            ).execute()
+            for row in result.data:
+                self.by_key.setdefault(row["name_key"], {})[(row["chamber"], row["state"])] = row["id"]
+            self.created += len(new_politicians)
+
+        aliases = []
+        for name, chamber, state in ordered:
+            politician_id, ambiguous = self._match(name_key(name), (chamber, state))
+            if politician_id is None:
+                # Ambiguous - left unresolved (and unrecorded) so the API matches by name
+                self.ambiguous += ambiguous
+                continue
+            aliases.append({"alias": name, "chamber": chamber, "state": state,
+                            "name_key": name_key(name), "politician_id": politician_id})
+            ids[(name, chamber, state)] = politician_id
+
+        if aliases:
+            self.supabase.table(ALIASES_TABLE).upsert(aliases, on_conflict="alias,chamber,state").execute()
+            for row in aliases:
+                self.aliases[(row["alias"], row["chamber"], row["state"])] = row["politician_id"]
+
+        return ids
+
+    def assign(self, trades):
+        """
+        Set politician_id on every trade. A directory failure never blocks a
+        load - the trades go in without ids and --backfill stamps them later.
+        Returns the number of trades that got an id.
+        """
+        try:
+            ids = self.resolve({identity(t) for t in trades})
+        except Exception as e:
+            print(f"  Warning: Could not resolve politician ids ({e}). Loading without them.")
+            ids = {}
+
+        assigned = 0
+        for trade in trades:
+            trade["politician_id"] = ids.get(identity(trade))
+            assigned += trade["politician_id"] is not None
+        print(f"  [DIRECTORY] {assigned}/{len(trades)} trades matched to politicians "
+              f"({self.created} new politicians, {self.ambiguous} ambiguous spellings, "
+              f"{len(self.aliases)} known spellings)")
+        return assigned
+
+
+def _unstamped_names(supabase):
+    """Distinct (member_name, chamber) pairs of congressional_trades rows without an id"""
+    pairs = set()
+    offset = 0
+    while True:
+        page = (
+            supabase.table("congressional_trades")
+            .select("member_name,chamber")
+            .is_("politician_id", "null")
+            .order("id")
+            .range(offset, offset + PAGE_SIZE - 1)
+            .execute()
+            .data
+        )
+        pairs.update((row["member_name"], row["chamber"]) for row in page)
+        offset += len(page)
+        if len(page) < PAGE_SIZE:
+            return pairs
+
+
+def backfill(supabase):
+    """
+    Stamp politician_id on congressional_trades rows that don't have one yet
+    Each (member_name, chamber) is resolved on its own, so same-name members
+    of different chambers get their own ids; ambiguous names stay unstamped.
+    """
+    pairs = _unstamped_names(supabase)
+    ids = PoliticianDirectory(supabase).resolve(
+        {identity({"member_name": name, "chamber": chamber}) for name, chamber in pairs}
+    )
+
+    stamped = set()
+    for name, chamber in sorted(pairs, key=lambda p: (p[0] or "", p[1] or "")):
+        politician_id = ids.get(identity({"member_name": name, "chamber": chamber}))
+        if politician_id is None:
+            continue
+        query = supabase.table("congressional_trades")\
+            .update({"politician_id": politician_id})\
+            .eq("member_name", name)\
+            .is_("politician_id", "null")
+        query = query.eq("chamber", chamber) if chamber is not None else query.is_("chamber", "null")
+        query.execute()
+        stamped.add((name, chamber))
+
+    print(f"✅ Backfilled politician ids for {len(stamped)} of {len(pairs)} name/chamber pairs "
+          f"({len(set(i for i in ids.values() if i))} politicians)")
+
+    # Their leaderboard rows move from per-spelling to per-politician
+    refresh_politician_aggregates(supabase, [name for name, _ in stamped])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the politician directory")
+    parser.add_argument("--backfill", action="store_true",
+                        help="Assign politician ids to trades loaded before the directory existed")
+    args = parser.parse_args()
+
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    if args.backfill:
+        backfill(supabase)
+    else:
+        directory = PoliticianDirectory(supabase)
+        directory.load()
+        politicians = sum(len(by_attrs) for by_attrs in directory.by_key.values())
+        print(f"{politicians} politicians, {len(directory.aliases)} known spellings")
+
+
+if __name__ == "__main__":
+    main()
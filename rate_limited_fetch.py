@@ -0,0 +1,131 @@
+"""
+Rate-Limited Async Fetcher
+Fetch many JSON endpoints from a per-minute-quota API (e.g. Finnhub free tier:
+60 calls/minute) as fast as the quota allows.
+
+- A token bucket paces request starts precisely to the quota, so network
+  latency overlaps with waiting instead of adding to it
+- Bounded concurrency keeps a slow response from stalling the queue
+- 429s honour Retry-After (or back off exponentially) and pause every worker,
+  since the quota is shared
+
+Usage:
+    results = fetch_json_many(
+        "https://finnhub.io/api/v1/stock/congressional-trading",
+        [("AAPL", {"symbol": "AAPL", "token": KEY}), ...],
+        rate_per_minute=60,
+    )
+    for key, data in results: ...
+"""
+
+import asyncio
+import random
+import time
+
+import httpx
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket sized so no 60-second window ever exceeds `rate_per_minute`:
+    `burst` tokens up front, refilled at (rate_per_minute - burst) per minute.
+    """
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.capacity = burst
+        self.refill_per_second = max(rate_per_minute - burst, 1) / 60
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.refill_per_second)
+
+    def pause(self, seconds):
+        """Provider said slow down - hold every worker and start from an empty bucket"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+def _retry_after_seconds(response, attempt):
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return max(float(header), 0.5)
+        except ValueError:
+            pass
+    # No hint from the server: 2, 4, 8, ... seconds (capped) with jitter
+    return min(2 ** (attempt + 1), 60) + random.uniform(0, 1)
+
+
+async def _fetch_one(client, bucket, semaphore, url, params, max_retries):
+    """Returns (status_code, parsed JSON or None)"""
+    async with semaphore:
+        for attempt in range(max_retries + 1):
+            await bucket.acquire()
+            try:
+                response = await client.get(url, params=params)
+            except httpx.HTTPError:
+                if attempt == max_retries:
+                    raise
+                await asyncio.sleep(min(2 ** attempt, 30))
+                continue
+
+            if response.status_code == 429 and attempt < max_retries:
+                bucket.pause(_retry_after_seconds(response, attempt))
+                continue
+
+            if response.status_code != 200:
+                return response.status_code, None
+            return response.status_code, response.json()
+
+    return 429, None
+
+
+async def fetch_json_many_async(url, requests_to_make, rate_per_minute, max_concurrency=4,
+                                burst=1, max_retries=5, headers=None, timeout=15,
+                                on_result=None):
+    """
+    Fetch every (key, params) in requests_to_make against `url`.
+    on_result(key, status, data) is called as each one completes (data is None on failure).
+    Returns [(key, data)] in completion order.
+    """
+    bucket = AsyncTokenBucket(rate_per_minute, burst=burst)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = []
+
+    async with httpx.AsyncClient(headers=headers, timeout=timeout) as client:
+        async def run(key, params):
+            try:
+                status, data = await _fetch_one(client, bucket, semaphore, url, params, max_retries)
+            except Exception as e:
+                status, data = None, None
+                print(f"  {key}: Error - {e}")
+            results.append((key, data))
+            if on_result:
+                on_result(key, status, data)
+
+        await asyncio.gather(*(run(key, params) for key, params in requests_to_make))
+
+    return results
+
+
+def fetch_json_many(url, requests_to_make, rate_per_minute, **kwargs):
+    """Blocking wrapper around fetch_json_many_async for the sync scrapers."""
+    return asyncio.run(fetch_json_many_async(url, requests_to_make, rate_per_minute, **kwargs))
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Multi-Source Refresh
+One entry point for every trade source: runs the HSW, Finnhub, Capitol Trades
+and Quiver adapters concurrently, each within its own time budget, merges
+their results through one cross-source dedup and does a single load.
+
+Wall-clock time is roughly the slowest source instead of the sum of all four.
+A source that overruns its budget is left behind (its results are dropped for
+this run) rather than holding up the others.
+
+Usage:
+  python refresh_all.py                       # All sources -> congressional_trades
+  python refresh_all.py --source hsw --source quiver
+  python refresh_all.py --dry-run             # Fetch + merge, no writes
+  python refresh_all.py --full                # Ignore watermarks and unchanged-payload skips
+  python refresh_all.py --table trades        # Load the wide scraper table instead
+"""
+
+import os
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from supabase import create_client
+
+from http_cache import set_offline
+from trade_loader import TradeLoader
+from batch_normalize import normalize_batch
+from normalization import normalize_trade_type
+from analytics_refresh import refresh_analytics
+from politician_directory import PoliticianDirectory
+from ingest_state import (
+    natural_key,
+    iso_date,
+    get_watermark,
+    set_watermark,
+    watermark_cutoff,
+    filter_since_watermark,
+    max_disclosure_date,
+)
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Seconds each source gets before the run goes ahead without it
+SOURCE_BUDGETS = {
+    "hsw": int(os.getenv("HSW_BUDGET_SECONDS", "300")),
+    "finnhub": int(os.getenv("FINNHUB_BUDGET_SECONDS", "300")),
+    "capitol_trades": int(os.getenv("CAPITOL_TRADES_BUDGET_SECONDS", "90")),
+    "quiver": int(os.getenv("QUIVER_BUDGET_SECONDS", "120")),
+}
+
+# When the same trade comes from several sources, fields are taken from the
+# first source that has them (Quiver and Capitol Trades carry party/chamber)
+SOURCE_PRIORITY = ["quiver", "capitol_trades", "hsw", "finnhub"]
+
+# Watermarks are kept apart from the per-script ones (they track other tables)
+WATERMARK_PREFIX = "refresh_all:"
+
+# Columns of congressional_trades (create_table.sql, plus politician_id from
+# ingest_schema.sql section 4); other tables get full rows
+CONGRESSIONAL_TRADES_COLUMNS = (
+    "member_name", "trade_date", "disclosure_date", "ticker", "trade_type",
+    "amount_low", "amount_high", "party", "chamber", "company_name", "politician_id",
+)
+
+
+# ============================================
+# SOURCE ADAPTERS
+# ============================================
+# Each adapter returns a list of normalized trade dicts. The ingest scripts
+# are imported lazily - some create clients or need extra packages at import.
+
+def fetch_hsw(ctx):
+    from scraper import fetch_house_stock_watcher
+    # Only a fully read file may be marked processed - a truncated one raises first
+    responses = []
+    trades = fetch_house_stock_watcher(skip_unchanged=ctx["skip_unchanged"], responses=responses)
+    ctx["responses"].extend(responses)
+    return trades
+
+
+def fetch_finnhub(ctx):
+    from scraper import fetch_finnhub_trades, LATE_FILING_WINDOW_DAYS
+    date_from = None
+    cutoff = watermark_cutoff(ctx["watermarks"].get("finnhub"))
+    if cutoff:
+        date_from = (datetime.strptime(cutoff, "%Y-%m-%d") - timedelta(days=LATE_FILING_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    return fetch_finnhub_trades(date_from=date_from)
+
+
+def fetch_capitol_trades(ctx):
+    from scraper_v2 import fetch_capitol_trades as fetch
+    return fetch(limit=ctx["capitol_trades_limit"], skip_unchanged=ctx["skip_unchanged"], responses=ctx["responses"])
+
+
+def fetch_quiver(ctx):
+    from fetch_quiver_fixed import fetch_quiver_congressional_trades
+    responses = []
+    raw = fetch_quiver_congressional_trades(responses)
+    ctx["responses"].extend(responses)
+    if ctx["skip_unchanged"] and responses and all(r.unchanged for r in responses):
+        print("  [quiver] Unchanged since the last load. Skipping.")
+        return []
+    return normalize_batch(raw, "quiver").rows()
+
+
+ADAPTERS = {
+    "hsw": fetch_hsw,
+    "finnhub": fetch_finnhub,
+    "capitol_trades": fetch_capitol_trades,
+    "quiver": fetch_quiver,
+}
+
+
+# ============================================
+# RUN SOURCES CONCURRENTLY
+# ============================================
+
+def run_sources(sources, ctx, budgets=SOURCE_BUDGETS):
+    """
+    Run each adapter in its own thread and wait at most its budget.
+    Returns ({source: trades}, {source: status}) for the sources that finished.
+    Threads are daemons, so an overrunning source can't keep the process alive.
+    """
+    results = {}
+    status = {}
+    threads = {}
+    started = time.monotonic()
+
+    def run(source):
+        t0 = time.monotonic()
+        try:
+            results[source] = ADAPTERS[source](ctx)
+            status[source] = f"ok, {len(results[source])} trades in {time.monotonic() - t0:.1f}s"
+        except Exception as e:
+            status[source] = f"failed after {time.monotonic() - t0:.1f}s: {e}"
+
+    for source in sources:
+        threads[source] = threading.Thread(target=run, args=(source,), name=f"source-{source}", daemon=True)
+        threads[source].start()
+
+    for source in sorted(sources, key=lambda s: budgets.get(s, 0)):
+        remaining = budgets.get(source, 0) - (time.monotonic() - started)
+        threads[source].join(max(remaining, 0))
+        if threads[source].is_alive():
+            status[source] = f"over its {budgets.get(source, 0)}s budget - skipped this run"
+
+    finished = {source: results[source] for source in sources
+                if source in results and not threads[source].is_alive()}
+    return finished, dict(status)
+
+
+# ============================================
+# CROSS-SOURCE MERGE
+# ============================================
+
+def _canonical(trade):
+    """Shared key shape across sources: ISO dates, normalized trade type."""
+    trade = dict(trade)
+    trade["trade_type"] = normalize_trade_type(trade.get("trade_type")) or trade.get("trade_type")
+    trade["trade_date"] = iso_date(trade.get("trade_date"))
+    trade["disclosure_date"] = iso_date(trade.get("disclosure_date"))
+    return trade
+
+
+def merge_sources(results, priority=SOURCE_PRIORITY):
+    """
+    One row per natural key across all sources. The highest-priority source
+    wins; its empty fields are filled from the others.
+    Returns (merged trades, {source: rows contributed}).
+    """
+    merged = {}
+    contributed = {}
+    order = [s for s in priority if s in results] + [s for s in results if s not in priority]
+
+    for source in order:
+        count = 0
+        for trade in results[source]:
+            trade = _canonical(trade)
+            if not trade["trade_date"]:
+                continue
+            key = natural_key(trade)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = trade
+                count += 1
+            else:
+                for field, value in trade.items():
+                    if existing.get(field) in (None, "") and value not in (None, ""):
+                        existing[field] = value
+        contributed[source] = count
+
+    return list(merged.values()), contributed
+
+
+def project(trades, columns):
+    return [{c: t.get(c) for c in columns} for t in trades]
+
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh every trade source concurrently")
+    parser.add_argument("--source", action="append", choices=sorted(ADAPTERS),
+                        help="Only run this source (repeatable). Default: all")
+    parser.add_argument("--table", default="congressional_trades",
+                        help="Table to load (default: congressional_trades, which the API serves)")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and merge without writing")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore watermarks and reload payloads that haven't changed")
+    parser.add_argument("--offline", action="store_true", help="Replay cached HTTP responses")
+    parser.add_argument("--capitol-trades-limit", type=int, default=500)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MULTI-SOURCE REFRESH")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("\nERROR: Missing SUPABASE_URL or SUPABASE_KEY in .env")
+        return
+
+    if args.offline:
+        set_offline(True)
+
+    sources = args.source or list(ADAPTERS)
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+    watermarks = {}
+    if not args.full:
+        for source in sources:
+            watermarks[source] = get_watermark(supabase, WATERMARK_PREFIX + source)
+
+    ctx = {
+        "watermarks": watermarks,
+        "skip_unchanged": not (args.full or args.dry_run),
+        "responses": [],
+        "capitol_trades_limit": args.capitol_trades_limit,
+    }
+
+    wall_start = time.monotonic()
+    results, status = run_sources(sources, ctx)
+    fetch_seconds = time.monotonic() - wall_start
+
+    print(f"\n{'=' * 60}")
+    print(f"SOURCES ({fetch_seconds:.1f}s wall clock)")
+    print(f"{'=' * 60}")
+    for source in sources:
+        print(f"  {source:15s} {status.get(source, 'no result')}")
+
+    # Only filings past each source's watermark go on to the merge
+    highs = {}
+    fresh = {}
+    for source, trades in results.items():
+        highs[source] = max_disclosure_date(trades)
+        fresh[source] = filter_since_watermark(trades, watermarks.get(source))
+
+    trades, contributed = merge_sources(fresh)
+    print(f"\n  {sum(len(t) for t in fresh.values())} new filings -> {len(trades)} unique trades")
+    for source, count in contributed.items():
+        print(f"    {source:15s} {count} first seen here")
+
+    if not trades:
+        print("\nNothing new to load.")
+        return
+
+    if args.dry_run:
+        print("\n  DRY RUN - showing first 5 trades:")
+        for t in trades[:5]:
+            print(f"    {t['trade_date']} | {t['member_name']:25s} | {t['ticker']:6s} | {t['trade_type']}")
+        return
+
+    # Single load for every source
+    if args.table == "congressional_trades":
+        PoliticianDirectory(supabase).assign(trades)
+        rows = project(trades, CONGRESSIONAL_TRADES_COLUMNS)
+    else:
+        rows = trades
+    loader = TradeLoader(supabase, args.table, ignore_duplicates=False)
+    written = loader.load(rows)
+    loader.close()
+    print(f"\n[LOAD] {written} rows written to {args.table} in {loader.calls} requests "
+          f"({len(loader.failed)} rejected)")
+
+    # Advance watermarks only for sources that made it into this load
+    for source in results:
+        if highs.get(source):
+            set_watermark(supabase, WATERMARK_PREFIX + source, max_disclosure_date=highs[source],
+                          rows_loaded=len(fresh[source]))
+    for response in ctx["responses"]:
+        response.mark_processed()
+
+    if args.table == "congressional_trades":
+        refresh_analytics(supabase, [t["member_name"] for t in rows], [t["trade_date"] for t in rows])
+
+    print(f"\nFinished in {time.monotonic() - wall_start:.1f}s: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,16 +11,37 @@ Usage:
   python scraper.py --source hsw # House Stock Watcher only
   python scraper.py --source fin # Finnhub only
   python scraper.py --dry-run    # Preview without writing to DB
+  python scraper.py --offline    # Replay cached responses (see http_cache.py)
+  python scraper.py --full       # Ignore ingestion watermarks and reload everything
+
+Raw records already ingested are recognized by fingerprint (fingerprint_index.py)
+and dropped before normalization, so a run only does work for the delta.
 """
 
 import os
-import json
-import time
 import argparse
+import queue
+import threading
 import requests
+from itertools import compress
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from supabase import create_client
+from rate_limited_fetch import fetch_json_many
+from json_stream import iter_json_array
+from http_cache import cached_get, set_offline, is_offline
+from trade_loader import TradeLoader
+from batch_normalize import normalize_batch, TradeColumns
+from fingerprint_index import FingerprintIndex
+from ingest_state import (
+    get_watermark,
+    set_watermark,
+    watermark_cutoff,
+    iso_dates,
+    watermark_mask,
+    NATURAL_KEY,
+    natural_key,
+)
 
 load_dotenv()
 
@@ -32,6 +53,11 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 FINNHUB_KEY = os.getenv("FINNHUB_API_KEY")
 
+# Finnhub endpoint and quota (point FINNHUB_BASE_URL at a local mock server to test)
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")
+FINNHUB_RATE_PER_MINUTE = int(os.getenv("FINNHUB_RATE_PER_MINUTE", "60"))
+FINNHUB_CONCURRENCY = 4
+
 # Top traded tickers by congress members - we'll query Finnhub for each
 # (Finnhub requires a symbol parameter)
 POPULAR_TICKERS = [
@@ -53,198 +79,105 @@ POPULAR_TICKERS = [
     "CAT", "DE", "HON", "MMM", "GE",
 ]
 
+# Filings can trail the trade by weeks; when asking Finnhub for trades since
+# the watermark, reach back this far on trade date
+LATE_FILING_WINDOW_DAYS = 120
+
 HEADERS = {
     "User-Agent": "CongressTradeTracker/1.0 (research project)",
     "Accept": "application/json",
 }
 
-# Amount string -> (low, high) mapping
-AMOUNT_RANGES = {
-    "$1,001 - $15,000": (1001, 15000),
-    "$1,001 -": (1001, 15000),
-    "$15,001 - $50,000": (15001, 50000),
-    "$15,001 -": (15001, 50000),
-    "$50,001 - $100,000": (50001, 100000),
-    "$50,001 -": (50001, 100000),
-    "$100,001 - $250,000": (100001, 250000),
-    "$100,001 -": (100001, 250000),
-    "$250,001 - $500,000": (250001, 500000),
-    "$250,001 -": (250001, 500000),
-    "$500,001 - $1,000,000": (500001, 1000000),
-    "$500,001 -": (500001, 1000000),
-    "$1,000,001 - $5,000,000": (1000001, 5000000),
-    "$1,000,001 -": (1000001, 5000000),
-    "$5,000,001 - $25,000,000": (5000001, 25000000),
-    "$5,000,001 -": (5000001, 25000000),
-    "$25,000,001 - $50,000,000": (25000001, 50000000),
-    "$50,000,001 and Over": (50000001, 100000000),
-    "Over $50,000,000": (50000001, 100000000),
-}
-
-# State lookup from district code (e.g. "CA12" -> "CA")
-def extract_state(district):
-    if district and len(district) >= 2:
-        return district[:2].upper()
-    return None
-
-
 # ============================================
-# AMOUNT PARSING
+# SOURCE 1: HOUSE STOCK WATCHER
 # ============================================
 
-def parse_amount(amount_str):
-    """Parse STOCK Act amount range string into (low, high) integers."""
-    if not amount_str:
-        return None, None
-
-    amount_str = amount_str.strip()
+HSW_URLS = [
+    "https://house-stock-watcher-data.s3-us-west-2.amazonaws.com/data/all_transactions.json",
+    "https://housestockwatcher.com/api",
+]
 
-    # Direct lookup
-    if amount_str in AMOUNT_RANGES:
-        return AMOUNT_RANGES[amount_str]
+# Records per batch passed between pipeline stages
+HSW_BATCH_SIZE = 1000
 
-    # Try partial match
-    for key, (low, high) in AMOUNT_RANGES.items():
-        if key in amount_str or amount_str in key:
-            return low, high
 
-    # Try to extract numbers
-    import re
-    numbers = re.findall(r'[\d,]+', amount_str)
-    if len(numbers) >= 2:
-        try:
-            low = int(numbers[0].replace(',', ''))
-            high = int(numbers[1].replace(',', ''))
-            return low, high
-        except ValueError:
-            pass
-    elif len(numbers) == 1:
-        try:
-            val = int(numbers[0].replace(',', ''))
-            return val, val
-        except ValueError:
-            pass
-
-    return None, None
-
-
-def normalize_trade_type(raw_type):
-    """Normalize trade type to match DB constraint: Purchase, Sale, Exchange."""
-    if not raw_type:
-        return None
-    raw = raw_type.lower().strip()
-    if "purchase" in raw or "buy" in raw:
-        return "Purchase"
-    elif "sale" in raw or "sell" in raw:
-        return "Sale"
-    elif "exchange" in raw or "swap" in raw:
-        return "Exchange"
-    return None
-
-
-def normalize_chamber(position):
-    """Normalize chamber from various formats."""
-    if not position:
-        return None
-    pos = position.lower().strip()
-    if "senator" in pos or "senate" in pos:
-        return "Senate"
-    elif "representative" in pos or "house" in pos or "rep" in pos:
-        return "House"
-    return None
+def iter_hsw_records(skip_unchanged=False, responses=None, with_text=False):
+    """
+    Stream raw records from housestockwatcher.com's bulk file.
+    The file is parsed record by record as it downloads, so memory stays
+    flat no matter how large all_transactions.json grows.
 
+    Requests are conditional (http_cache): with skip_unchanged, a 304 for a file
+    we already loaded yields nothing. The response is appended to `responses`
+    so the caller can mark_processed() it once the load has gone through.
+    with_text=True yields (record, source_text) pairs for fingerprinting.
 
-# ============================================
-# SOURCE 1: HOUSE STOCK WATCHER
-# ============================================
-
-def fetch_house_stock_watcher():
+    A stream that breaks off mid-file raises - records after the cut were never
+    seen, so the caller must not treat the run as complete.
     """
-    Fetch all House trades from housestockwatcher.com.
-    Returns list of normalized trade dicts.
-    """
-    print("\n[HSW] Fetching House Stock Watcher data...")
-
-    trades = []
-    urls_to_try = [
-        "https://house-stock-watcher-data.s3-us-west-2.amazonaws.com/data/all_transactions.json",
-        "https://housestockwatcher.com/api",
-    ]
+    print("\n[HSW] Streaming House Stock Watcher data...")
 
-    raw_data = None
-    for url in urls_to_try:
+    for url in HSW_URLS:
         try:
             print(f"  Trying: {url}")
-            resp = requests.get(url, headers=HEADERS, timeout=30)
+            resp = cached_get(url, headers=HEADERS, timeout=30, stream=True)
             if resp.status_code == 200:
-                raw_data = resp.json()
-                print(f"  Success! Got {len(raw_data) if isinstance(raw_data, list) else '?'} records")
                 break
-            else:
-                print(f"  Got status {resp.status_code}, trying next...")
+            print(f"  Got status {resp.status_code}, trying next...")
+            resp.close()
         except Exception as e:
             print(f"  Error: {e}, trying next...")
-
-    if not raw_data:
+    else:
         print("  [HSW] All URLs failed. Skipping House Stock Watcher.")
-        return []
+        return
 
-    # Handle both list format and dict-with-data format
-    if isinstance(raw_data, dict):
-        raw_data = raw_data.get("data", raw_data.get("transactions", []))
+    if responses is not None:
+        responses.append(resp)
+    if resp.unchanged and skip_unchanged:
+        print("  [HSW] Unchanged since the last load. Skipping.")
+        return
 
-    for record in raw_data:
+    records = 0
+    with resp:
         try:
-            # Skip if no ticker
-            ticker = record.get("ticker", "").strip()
-            if not ticker or ticker == "--" or ticker == "N/A" or len(ticker) > 10:
-                continue
+            for record in iter_json_array(resp.iter_content(chunk_size=65536), with_text=with_text):
+                records += 1
+                yield record
+        except (ValueError, OSError, requests.RequestException) as e:
+            print(f"  [HSW] Stream ended early after {records} records: {e}")
+            raise
 
-            trade_type = normalize_trade_type(
-                record.get("type", record.get("transaction_type", ""))
-            )
-            if not trade_type:
-                continue
-
-            # Parse amount
-            amount_str = record.get("amount", "")
-            amount_low, amount_high = parse_amount(amount_str)
+    print(f"  [HSW] Read {records} records")
 
-            # Parse dates
-            trade_date = record.get("transaction_date", record.get("trade_date"))
-            disclosure_date = record.get("disclosure_date")
 
-            if not trade_date:
-                continue
+def iter_house_stock_watcher(batch_size=HSW_BATCH_SIZE, skip_unchanged=False, responses=None):
+    """Stream House trades from housestockwatcher.com in batches of normalized trades."""
+    parsed = 0
+    raw = []
+    for record in iter_hsw_records(skip_unchanged=skip_unchanged, responses=responses):
+        raw.append(record)
+        if len(raw) >= batch_size:
+            batch = normalize_batch(raw, "hsw").rows()
+            parsed += len(batch)
+            yield batch
+            raw = []
 
-            # Extract member name
-            member_name = record.get("representative", record.get("politician", "")).strip()
-            if not member_name:
-                continue
+    if raw:
+        batch = normalize_batch(raw, "hsw").rows()
+        parsed += len(batch)
+        yield batch
 
-            # Build normalized trade
-            trade = {
-                "member_name": member_name,
-                "chamber": "House",
-                "party": record.get("party", None),
-                "state": extract_state(record.get("district", "")),
-                "ticker": ticker.upper(),
-                "company_name": record.get("asset_description", record.get("asset", ""))[:200],
-                "asset_type": "Stock",
-                "trade_type": trade_type,
-                "amount_low": amount_low,
-                "amount_high": amount_high,
-                "trade_date": trade_date,
-                "disclosure_date": disclosure_date,
-                "source_url": record.get("ptr_link", record.get("source_url", "")),
-                "raw_data": json.dumps(record),
-            }
-            trades.append(trade)
+    print(f"  [HSW] Parsed {parsed} valid House trades")
 
-        except Exception as e:
-            continue  # Skip malformed records silently
 
-    print(f"  [HSW] Parsed {len(trades)} valid House trades")
+def fetch_house_stock_watcher(skip_unchanged=False, responses=None):
+    """
+    Fetch all House trades from housestockwatcher.com.
+    Returns list of normalized trade dicts.
+    """
+    trades = []
+    for batch in iter_house_stock_watcher(skip_unchanged=skip_unchanged, responses=responses):
+        trades.extend(batch)
     return trades
 
 
@@ -252,107 +185,77 @@ def fetch_house_stock_watcher():
 # SOURCE 2: FINNHUB
 # ============================================
 
-def fetch_finnhub_trades():
+def stream_finnhub_records(emit, date_from=None):
     """
-    Fetch congressional trades from Finnhub API.
-    Queries per-ticker (API requires symbol param).
-    Returns list of normalized trade dicts.
+    Query Finnhub per ticker (API requires symbol param), concurrently, paced to
+    the account's per-minute quota. emit(ticker, records) is called with each
+    ticker's raw records as soon as its response arrives.
+    date_from (YYYY-MM-DD) narrows the query; default is the last 2 years.
+    Returns the tickers whose request failed (non-200 after retries).
     """
     if not FINNHUB_KEY:
         print("\n[FINNHUB] No API key found. Set FINNHUB_API_KEY in .env")
         return []
 
     print(f"\n[FINNHUB] Fetching trades for {len(POPULAR_TICKERS)} tickers...")
-    print(f"  (Free tier: 60 req/min — this will take ~{len(POPULAR_TICKERS) // 60 + 2} minutes)")
+    print(f"  (Quota: {FINNHUB_RATE_PER_MINUTE} req/min — this will take ~{len(POPULAR_TICKERS) * 60 // FINNHUB_RATE_PER_MINUTE + 1} seconds)")
 
-    trades = []
-    seen = set()  # Dedupe within Finnhub results
-
-    # Date range: last 2 years to get plenty of data
-    date_from = (datetime.now() - timedelta(days=730)).strftime("%Y-%m-%d")
+    # Date range: last 2 years to get plenty of data (unless resuming from a watermark)
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=730)).strftime("%Y-%m-%d")
     date_to = datetime.now().strftime("%Y-%m-%d")
 
-    for i, ticker in enumerate(POPULAR_TICKERS):
-        try:
-            url = f"https://finnhub.io/api/v1/stock/congressional-trading"
-            params = {
-                "symbol": ticker,
-                "from": date_from,
-                "to": date_to,
-                "token": FINNHUB_KEY,
-            }
-
-            resp = requests.get(url, params=params, headers=HEADERS, timeout=15)
-
-            if resp.status_code == 429:
-                # Rate limited - wait and retry
-                print(f"  Rate limited at {ticker}. Waiting 60s...")
-                time.sleep(62)
-                resp = requests.get(url, params=params, headers=HEADERS, timeout=15)
-
-            if resp.status_code != 200:
-                if i % 20 == 0:
-                    print(f"  [{i}/{len(POPULAR_TICKERS)}] {ticker}: HTTP {resp.status_code}")
-                continue
-
-            data = resp.json()
-            records = data.get("data", [])
-
-            for record in records:
-                try:
-                    name = record.get("name", "").strip()
-                    txn_date = record.get("transactionDate", "")
-                    txn_type = normalize_trade_type(record.get("transactionType", ""))
-
-                    if not name or not txn_date or not txn_type:
-                        continue
-
-                    # Dedupe key
-                    key = f"{name}|{ticker}|{txn_date}|{txn_type}"
-                    if key in seen:
-                        continue
-                    seen.add(key)
-
-                    # Parse amounts - Finnhub provides amountFrom/amountTo directly
-                    amount_low = record.get("amountFrom")
-                    amount_high = record.get("amountTo")
-                    if not amount_low or not amount_high:
-                        amount_low, amount_high = parse_amount(
-                            record.get("transactionAmount", "")
-                        )
-
-                    chamber = normalize_chamber(record.get("position", ""))
-
-                    trade = {
-                        "member_name": name,
-                        "chamber": chamber,
-                        "party": None,  # Finnhub doesn't reliably provide party
-                        "state": None,  # Finnhub doesn't provide state
-                        "ticker": ticker.upper(),
-                        "company_name": record.get("assetName", "")[:200],
-                        "asset_type": "Stock",
-                        "trade_type": txn_type,
-                        "amount_low": amount_low,
-                        "amount_high": amount_high,
-                        "trade_date": txn_date,
-                        "disclosure_date": record.get("filingDate"),
-                        "source_url": record.get("sourceUrl", ""),
-                        "raw_data": json.dumps(record),
-                    }
-                    trades.append(trade)
-
-                except Exception:
-                    continue
+    requests_to_make = [
+        (ticker, {"symbol": ticker, "from": date_from, "to": date_to, "token": FINNHUB_KEY})
+        for ticker in POPULAR_TICKERS
+    ]
 
-            if i % 10 == 0:
-                print(f"  [{i}/{len(POPULAR_TICKERS)}] {ticker}: {len(records)} trades found | Total: {len(trades)}")
+    done = []
+    failed = []
+
+    def report(ticker, status, data):
+        done.append(ticker)
+        if status != 200:
+            failed.append(ticker)
+            print(f"  [{len(done)}/{len(POPULAR_TICKERS)}] {ticker}: HTTP {status}")
+            return
+        if len(done) % 10 == 0:
+            print(f"  [{len(done)}/{len(POPULAR_TICKERS)}] {ticker}: {len(data.get('data', []))} trades found")
+        if data and data.get("data"):
+            emit(ticker, data["data"])
+
+    fetch_json_many(
+        f"{FINNHUB_BASE_URL}/stock/congressional-trading",
+        requests_to_make,
+        rate_per_minute=FINNHUB_RATE_PER_MINUTE,
+        max_concurrency=FINNHUB_CONCURRENCY,
+        headers=HEADERS,
+        on_result=report,
+    )
+    return failed
+
+
+def fetch_finnhub_trades(date_from=None):
+    """
+    Fetch congressional trades from Finnhub API.
+    Returns list of normalized trade dicts.
+    """
+    results = []
+    failed = stream_finnhub_records(lambda ticker, records: results.append((ticker, records)), date_from=date_from)
+    if failed:
+        print(f"  [FINNHUB] Warning: {len(failed)} tickers failed and are missing: {', '.join(sorted(failed))}")
 
-            # Rate limiting: ~55 requests per minute to stay safe
-            time.sleep(1.1)
+    trades = []
+    seen = set()  # Dedupe within Finnhub results
 
-        except Exception as e:
-            print(f"  [{i}] {ticker}: Error - {e}")
-            continue
+    for ticker, records in results:
+        for trade in normalize_batch(records, "finnhub", ticker).rows():
+            # Dedupe key
+            key = (trade["member_name"], trade["ticker"], trade["trade_date"], trade["trade_type"])
+            if key in seen:
+                continue
+            seen.add(key)
+            trades.append(trade)
 
     print(f"  [FINNHUB] Total: {len(trades)} unique trades")
     return trades
@@ -362,10 +265,17 @@ def fetch_finnhub_trades():
 # SUPABASE LOADER
 # ============================================
 
-def load_to_supabase(trades, dry_run=False):
+def load_to_supabase(trades, dry_run=False, supabase=None, loader=None):
     """
     Load trades into Supabase, skipping duplicates.
-    Dedupes on (member_name, ticker, trade_date, trade_type).
+    Upserts on (member_name, ticker, trade_date, trade_type) via the
+    trades_natural_key constraint - rows already in the table are ignored.
+    Batching is handled by TradeLoader (trade_loader.py): adaptive batch
+    sizes, and failing batches are bisected down to the bad rows.
+
+    `trades` is a list of trade dicts or a TradeColumns batch. When loading
+    a stream batch by batch, pass the same loader each time so duplicates
+    across batches are skipped and batch sizing carries over.
     """
     if not trades:
         print("\n[LOAD] No trades to load.")
@@ -373,73 +283,246 @@ def load_to_supabase(trades, dry_run=False):
 
     print(f"\n[LOAD] Loading {len(trades)} trades into Supabase...")
 
+    columnar = isinstance(trades, TradeColumns)
+
     if dry_run:
         print("  DRY RUN - showing first 5 trades:")
-        for t in trades[:5]:
+        for t in (trades.rows(0, 5) if columnar else trades[:5]):
             print(f"    {t['trade_date']} | {t['member_name']:25s} | {t['ticker']:6s} | {t['trade_type']:8s} | ${t.get('amount_low', '?'):>10} - ${t.get('amount_high', '?'):>10}")
         print(f"  ... and {len(trades) - 5} more")
         return 0
 
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    if loader is None:
+        loader = TradeLoader(supabase or create_client(SUPABASE_URL, SUPABASE_KEY), "trades")
+
+    inserted = loader.load_columns(trades) if columnar else loader.load(trades)
+
+    print(f"  [LOAD] Done! Inserted {inserted} new trades "
+          f"({loader.calls} calls so far, batch size {loader.batch_size}, {len(loader.failed)} rejected)")
+    return inserted
+
+
+# ============================================
+# PIPELINE
+# ============================================
+# Source producers -> raw queue -> normalizer -> load queue -> loader.
+# Each stage runs in its own thread, so downloads, parsing and database
+# writes overlap; the bounded queues block fast stages until slow ones
+# catch up, which keeps memory flat.
+
+# Batches buffered between stages
+PIPELINE_QUEUE_SIZE = 8
+
+# Rows previewed per batch in --dry-run (real loads follow TradeLoader's adaptive size)
+PIPELINE_DRY_RUN_BATCH = 500
+
+_DONE = object()
+
 
-    # Get existing trades for dedup
-    print("  Fetching existing trades for dedup check...")
-    existing = set()
+def produce_hsw(raw_queue, skip_unchanged=False, responses=None):
+    """Producer: raw HSW records (and their source text) in HSW_BATCH_SIZE chunks."""
+    batch = []
+    texts = []
     try:
-        # Fetch in batches (Supabase default limit is 1000)
-        offset = 0
-        while True:
-            result = (
-                supabase.table("trades")
-                .select("member_name, ticker, trade_date, trade_type")
-                .range(offset, offset + 999)
-                .execute()
-            )
-            for r in result.data:
-                key = f"{r['member_name']}|{r['ticker']}|{r['trade_date']}|{r['trade_type']}"
-                existing.add(key)
-            if len(result.data) < 1000:
-                break
-            offset += 1000
-    except Exception as e:
-        print(f"  Warning: Could not fetch existing trades ({e}). May insert duplicates.")
+        for record, text in iter_hsw_records(skip_unchanged=skip_unchanged, responses=responses, with_text=True):
+            batch.append(record)
+            texts.append(text)
+            if len(batch) >= HSW_BATCH_SIZE:
+                raw_queue.put(("hsw", None, batch, texts))
+                batch = []
+                texts = []
+        if batch:
+            raw_queue.put(("hsw", None, batch, texts))
+    finally:
+        raw_queue.put(_DONE)
+
+
+def produce_finnhub(raw_queue, date_from=None):
+    """
+    Producer: one raw batch per Finnhub ticker, as each response lands.
+    Raises if any ticker failed, so the run fails and the finnhub watermark
+    stays put - its filings would otherwise fall behind the overlap window.
+    """
+    try:
+        failed = stream_finnhub_records(
+            lambda ticker, records: raw_queue.put(("finnhub", ticker, records, None)),
+            date_from=date_from,
+        )
+        if failed:
+            raise RuntimeError(f"Finnhub requests failed for {len(failed)} tickers: {', '.join(sorted(failed))}")
+    finally:
+        raw_queue.put(_DONE)
+
+
+def _normalize_stage(raw_queue, load_queue, producer_count, watermarks, source_stats, summary,
+                     result, fingerprints=None, skip_seen=True):
+    """
+    Drop raw records ingested before (by fingerprint), normalize the rest,
+    drop filings behind the watermark and pass what's left on, as
+    (source, columns, fingerprint per row) so the loader can un-pend rejected rows.
+    A batch that fails to normalize fails the run and its fingerprints are un-pended.
+    """
+    remaining = producer_count
+    while remaining:
+        item = raw_queue.get()
+        if item is _DONE:
+            remaining -= 1
+            continue
 
-    print(f"  Found {len(existing)} existing trades in DB")
+        source, context, records, texts = item
+        hashes = None
+        try:
+            stats = source_stats.setdefault(source, {"seen": 0, "fetched": 0, "processed": 0, "high": None})
+            hash_of = None
+            if fingerprints is not None:
+                fresh, hashes = fingerprints.filter(source, records, texts, skip_seen=skip_seen, with_hashes=True)
+                stats["seen"] += len(records) - len(fresh)
+                records = fresh
+                if not records:
+                    continue
+                hash_of = {id(r): h for r, h in zip(fresh, hashes)}
 
-    # Filter out duplicates
-    new_trades = []
-    for t in trades:
-        key = f"{t['member_name']}|{t['ticker']}|{t['trade_date']}|{t['trade_type']}"
-        if key not in existing:
-            new_trades.append(t)
+            columns = normalize_batch(records, source, context)
+            stats["fetched"] += len(columns)
+            if not len(columns):
+                continue
 
-    print(f"  {len(new_trades)} new trades to insert ({len(trades) - len(new_trades)} duplicates skipped)")
+            # raw_data holds the surviving raw records themselves
+            row_hashes = None
+            if hash_of is not None and "raw_data" in columns.columns:
+                row_hashes = [hash_of.get(id(r)) for r in columns["raw_data"]]
+
+            disclosed = iso_dates(columns["disclosure_date"])
+            high = max(filter(None, disclosed), default=None)
+            if high and (not stats["high"] or high > stats["high"]):
+                stats["high"] = high
+
+            keep = watermark_mask(disclosed, watermarks.get(source))
+            if keep is not None:
+                columns = columns.take(keep)
+                if row_hashes is not None:
+                    row_hashes = list(compress(row_hashes, keep))
+            stats["processed"] += len(columns)
+            if not len(columns):
+                continue
 
-    if not new_trades:
-        print("  Nothing new to insert.")
-        return 0
+            for field in ("chamber", "trade_type"):
+                for value in columns[field]:
+                    value = value or "Unknown"
+                    summary[value] = summary.get(value, 0) + 1
+
+            load_queue.put((source, columns, row_hashes))
+        except Exception as e:
+            result["error"] = e
+            print(f"  [PIPELINE] Error normalizing a {source} batch: {e}")
+            if hashes:
+                fingerprints.discard(source, hashes)
 
-    # Insert in batches of 50
-    inserted = 0
-    batch_size = 50
-    for i in range(0, len(new_trades), batch_size):
-        batch = new_trades[i : i + batch_size]
+    load_queue.put(_DONE)
+
+
+def _load_stage(load_queue, supabase, dry_run, result, fingerprints=None):
+    """
+    Accumulate normalized columns until the loader's next batch is full, then upsert.
+    Fingerprints of rows the database rejected are discarded, so they're retried next run.
+    """
+    loader = None if dry_run else TradeLoader(supabase, "trades")
+    pending = []
+    pending_rows = 0
+
+    def discard_rejected(rejected):
+        keys = {natural_key(t) for t in rejected}
+        for source, columns, row_hashes in pending:
+            if row_hashes is None:
+                continue
+            row_keys = zip(*(columns[c] for c in NATURAL_KEY))
+            fingerprints.discard(source, [h for key, h in zip(row_keys, row_hashes) if key in keys])
+
+    def flush():
+        nonlocal pending_rows
+        if not pending:
+            return
+        batch = TradeColumns.concat([columns for _, columns, _ in pending])
+        if dry_run:
+            # Preview the first batch only; the rest are just counted
+            if not result["loaded"]:
+                load_to_supabase(batch, dry_run=True)
+        else:
+            failed_before = len(loader.failed)
+            result["inserted"] += load_to_supabase(batch, loader=loader)
+            if fingerprints is not None and len(loader.failed) > failed_before:
+                discard_rejected(loader.failed[failed_before:])
+        result["loaded"] += len(batch)
+        pending.clear()
+        pending_rows = 0
+
+    while True:
+        item = load_queue.get()
+        if item is _DONE:
+            break
+        if result["error"]:
+            continue  # Keep draining so upstream stages never block
         try:
-            result = supabase.table("trades").insert(batch).execute()
-            inserted += len(result.data)
-            print(f"  Inserted batch {i // batch_size + 1}: {len(result.data)} trades")
+            pending.append(item)
+            pending_rows += len(item[1])
+            if pending_rows >= (loader.next_batch_size() if loader else PIPELINE_DRY_RUN_BATCH):
+                flush()
         except Exception as e:
-            print(f"  Error inserting batch {i // batch_size + 1}: {e}")
-            # Try inserting one by one to find the bad record
-            for trade in batch:
-                try:
-                    supabase.table("trades").insert(trade).execute()
-                    inserted += 1
-                except Exception as e2:
-                    print(f"    Skipped: {trade['member_name']} {trade['ticker']} {trade['trade_date']} - {e2}")
-
-    print(f"\n  [LOAD] Done! Inserted {inserted} new trades.")
-    return inserted
+            result["error"] = e
+            print(f"  [PIPELINE] Loader failed: {e}")
+
+    if not result["error"]:
+        try:
+            flush()
+        except Exception as e:
+            result["error"] = e
+            print(f"  [PIPELINE] Loader failed: {e}")
+
+    if loader:
+        loader.close()
+
+
+def run_pipeline(supabase, producers, watermarks, dry_run=False, fingerprints=None, skip_seen=True):
+    """
+    Run producer callables (each takes the raw queue) through the shared
+    normalizer and loader. Returns (per-source stats, summary counts, load result).
+    A producer that raises (e.g. a truncated download) or a batch that fails to
+    normalize sets result["error"] like a failed load, so the caller leaves
+    watermarks and fingerprints alone.
+    """
+    raw_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    load_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    source_stats = {}
+    summary = {}
+    result = {"loaded": 0, "inserted": 0, "error": None}
+
+    def run_producer(producer):
+        try:
+            producer(raw_queue)
+        except Exception as e:
+            result["error"] = e
+            print(f"  [PIPELINE] Producer failed: {e}")
+
+    threads = [
+        threading.Thread(target=run_producer, args=(producer,), daemon=True)
+        for producer in producers
+    ]
+    threads.append(threading.Thread(
+        target=_normalize_stage,
+        args=(raw_queue, load_queue, len(producers), watermarks, source_stats, summary, result,
+              fingerprints, skip_seen),
+        daemon=True,
+    ))
+    threads.append(threading.Thread(
+        target=_load_stage, args=(load_queue, supabase, dry_run, result, fingerprints), daemon=True,
+    ))
+
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return source_stats, summary, result
 
 
 # ============================================
@@ -494,6 +577,10 @@ def main():
                         help="Preview trades without writing to DB")
     parser.add_argument("--stats", action="store_true",
                         help="Print DB stats and exit")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore ingestion watermarks and reprocess all history")
+    parser.add_argument("--offline", action="store_true",
+                        help="Replay cached HTTP responses instead of hitting the network")
     args = parser.parse_args()
 
     print("=" * 60)
@@ -513,44 +600,90 @@ def main():
         print_stats()
         return
 
-    # Scrape
-    all_trades = []
+    if args.offline:
+        set_offline(True)
 
-    if args.source in ("hsw", "all"):
-        hsw_trades = fetch_house_stock_watcher()
-        all_trades.extend(hsw_trades)
-
-    if args.source in ("fin", "all"):
-        fin_trades = fetch_finnhub_trades()
-        all_trades.extend(fin_trades)
-
-    if not all_trades:
-        print("\nNo trades fetched from any source.")
-        print("Check your internet connection and API keys.")
-        return
+    # Where each source left off last time
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    watermarks = {}
+    if not args.full:
+        for source in ("hsw", "finnhub"):
+            watermarks[source] = get_watermark(supabase, source)
+            cutoff = watermark_cutoff(watermarks[source])
+            if cutoff:
+                print(f"  [{source}] Resuming from filings disclosed since {cutoff}")
+
+    # Scrape, normalize and load concurrently - only filings at or after each
+    # source's watermark are loaded. Bulk files that are byte-for-byte what we
+    # loaded last time are skipped (dry runs replay them).
+    skip_unchanged = not (args.full or args.dry_run)
+    responses = []
+    producers = []
 
-    # Summary before loading
-    print(f"\n{'=' * 60}")
-    print(f"SCRAPE SUMMARY")
-    print(f"{'=' * 60}")
-    print(f"  Total trades scraped: {len(all_trades)}")
-
-    chambers = {}
-    for t in all_trades:
-        c = t.get("chamber", "Unknown")
-        chambers[c] = chambers.get(c, 0) + 1
-    for c, count in sorted(chambers.items()):
-        print(f"  {c}: {count}")
-
-    types = {}
-    for t in all_trades:
-        tt = t.get("trade_type", "Unknown")
-        types[tt] = types.get(tt, 0) + 1
-    for tt, count in sorted(types.items()):
-        print(f"  {tt}: {count}")
-
-    # Load
-    inserted = load_to_supabase(all_trades, dry_run=args.dry_run)
+    if args.source in ("hsw", "all"):
+        producers.append(lambda q: produce_hsw(q, skip_unchanged=skip_unchanged, responses=responses))
+
+    if args.source in ("fin", "all") and is_offline():
+        print("\n[FINNHUB] Offline - per-ticker queries are not cached. Skipping.")
+    elif args.source in ("fin", "all"):
+        fin_cutoff = watermark_cutoff(watermarks.get("finnhub"))
+        fin_from = None
+        if fin_cutoff:
+            fin_from = (datetime.strptime(fin_cutoff, "%Y-%m-%d") - timedelta(days=LATE_FILING_WINDOW_DAYS)).strftime("%Y-%m-%d")
+        producers.append(lambda q: produce_finnhub(q, date_from=fin_from))
+
+    # Full reloads still record fingerprints, they just don't skip on them
+    with FingerprintIndex() as fingerprints:
+        source_stats, summary, result = run_pipeline(
+            supabase, producers, watermarks, dry_run=args.dry_run,
+            fingerprints=fingerprints, skip_seen=not args.full,
+        )
+
+        seen = sum(stats["seen"] for stats in source_stats.values())
+        fetched = sum(stats["fetched"] for stats in source_stats.values())
+        processed = sum(stats["processed"] for stats in source_stats.values())
+
+        if not processed:
+            # Nothing survived to load, so the new records are done with too
+            if not args.dry_run and not result["error"]:
+                fingerprints.commit()
+            if result["error"]:
+                print("\nRun failed - watermarks left where they were.")
+            elif any(r.unchanged for r in responses) and not fetched and not seen:
+                print("\nNo source has changed since the last run.")
+            elif seen and not fetched:
+                print(f"\nAll {seen} records were ingested before. Nothing new.")
+            elif not fetched:
+                print("\nNo trades fetched from any source.")
+                print("Check your internet connection and API keys.")
+            else:
+                print("\nNo new filings since the last run.")
+            return
+
+        # Summary
+        print(f"\n{'=' * 60}")
+        print(f"SCRAPE SUMMARY")
+        print(f"{'=' * 60}")
+        print(f"  Total trades scraped: {processed}")
+        for source, stats in sorted(source_stats.items()):
+            print(f"  [{source}] {stats['processed']} new of {stats['fetched']} fetched "
+                  f"({stats['seen']} raw records skipped as already ingested)")
+        for value, count in sorted(summary.items()):
+            print(f"  {value}: {count}")
+        print(f"  Inserted: {result['inserted']}")
+
+        if result["error"]:
+            print("\nRun failed - watermarks left where they were.")
+            return
+
+        # Advance watermarks only after the load has gone through
+        if not args.dry_run:
+            for source, stats in source_stats.items():
+                if stats["high"]:
+                    set_watermark(supabase, source, max_disclosure_date=stats["high"], rows_loaded=stats["processed"])
+            for resp in responses:
+                resp.mark_processed()
+            fingerprints.commit()
 
     # Final stats
     if not args.dry_run:
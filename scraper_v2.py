@@ -4,13 +4,20 @@ Scrapes directly from Senate and House disclosure websites
 """
 
 import os
-import json
 import time
-import requests
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from supabase import create_client
 from bs4 import BeautifulSoup
+from http_cache import cached_get, set_offline
+from trade_loader import TradeLoader
+from batch_normalize import normalize_batch
+from ingest_state import (
+    get_watermark,
+    set_watermark,
+    filter_since_watermark,
+    max_disclosure_date,
+)
 
 load_dotenv()
 
@@ -30,7 +37,7 @@ HEADERS = {
 }
 
 
-def fetch_capitol_trades(limit=500):
+def fetch_capitol_trades(limit=500, skip_unchanged=False, responses=None):
     """
     Fetch recent trades from Capitol Trades public API
     This is a reliable alternative source that aggregates government filings
@@ -46,39 +53,20 @@ def fetch_capitol_trades(limit=500):
             "page": 1,
         }
 
-        response = requests.get(CAPITOL_TRADES_API, params=params, headers=HEADERS, timeout=30)
+        response = cached_get(CAPITOL_TRADES_API, params=params, headers=HEADERS, timeout=30)
 
         if response.status_code == 200:
+            if responses is not None:
+                responses.append(response)
+            if response.unchanged and skip_unchanged:
+                print("  ✓ Unchanged since the last load. Skipping.")
+                return []
+
             data = response.json()
 
             if "data" in data:
-                for record in data["data"]:
-                    try:
-                        # Parse Capitol Trades format
-                        politician = record.get("politician", {})
-
-                        trade = {
-                            "member_name": politician.get("firstName", "") + " " + politician.get("lastName", ""),
-                            "chamber": "Senate" if politician.get("chamber") == "senate" else "House",
-                            "party": politician.get("party", ""),
-                            "state": politician.get("state", ""),
-                            "ticker": record.get("ticker", ""),
-                            "company_name": record.get("assetDescription", "")[:200],
-                            "asset_type": record.get("assetType", "Stock"),
-                            "trade_type": "Purchase" if record.get("txType") == "buy" else "Sale" if record.get("txType") == "sell" else "Exchange",
-                            "amount_low": record.get("size", {}).get("low"),
-                            "amount_high": record.get("size", {}).get("high"),
-                            "trade_date": record.get("txDate", ""),
-                            "disclosure_date": record.get("pubDate", ""),
-                            "source_url": f"https://capitoltrades.com/trades/{record.get('id', '')}",
-                            "raw_data": json.dumps(record),
-                        }
-
-                        if trade["ticker"] and trade["member_name"] and trade["trade_date"]:
-                            trades.append(trade)
-
-                    except Exception as e:
-                        continue
+                # Parse Capitol Trades format, a whole page at a time
+                trades = normalize_batch(data["data"], "capitol_trades").rows()
 
             print(f"  ✓ Fetched {len(trades)} trades from Capitol Trades")
             return trades
@@ -103,7 +91,7 @@ def fetch_quiver_quant():
     url = "https://api.quiverquant.com/beta/historical/congresstrading"
 
     try:
-        response = requests.get(url, headers=HEADERS, timeout=20)
+        response = cached_get(url, headers=HEADERS, timeout=20)
 
         if response.status_code == 200:
             data = response.json()
@@ -135,58 +123,14 @@ def load_to_supabase(trades, dry_run=False):
         print(f"  ... and {len(trades) - 5} more")
         return 0
 
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-    # Get existing trades for dedup
-    print("  Fetching existing trades for dedup...")
-    existing = set()
-
-    try:
-        offset = 0
-        while True:
-            result = (
-                supabase.table("trades")
-                .select("member_name, ticker, trade_date, trade_type")
-                .range(offset, offset + 999)
-                .execute()
-            )
-            for r in result.data:
-                key = f"{r['member_name']}|{r['ticker']}|{r['trade_date']}|{r['trade_type']}"
-                existing.add(key)
-            if len(result.data) < 1000:
-                break
-            offset += 1000
-    except Exception as e:
-        print(f"  Warning: Could not fetch existing trades ({e})")
-
-    print(f"  Found {len(existing)} existing trades in DB")
-
-    # Filter out duplicates
-    new_trades = []
-    for t in trades:
-        key = f"{t['member_name']}|{t['ticker']}|{t['trade_date']}|{t['trade_type']}"
-        if key not in existing:
-            new_trades.append(t)
-
-    print(f"  {len(new_trades)} new trades to insert ({len(trades) - len(new_trades)} duplicates skipped)")
-
-    if not new_trades:
-        print("  Nothing new to insert.")
-        return 0
-
-    # Insert in batches
-    inserted = 0
-    batch_size = 50
-
-    for i in range(0, len(new_trades), batch_size):
-        batch = new_trades[i : i + batch_size]
-        try:
-            result = supabase.table("trades").insert(batch).execute()
-            inserted += len(result.data)
-            print(f"  ✓ Inserted batch {i // batch_size + 1}: {len(result.data)} trades")
-        except Exception as e:
-            print(f"  ✗ Error inserting batch: {e}")
+    # Upserts on trades_natural_key - rows already in the table are skipped,
+    # so there's no need to read existing keys (see trade_loader.py)
+    loader = TradeLoader(create_client(SUPABASE_URL, SUPABASE_KEY), "trades")
+    inserted = loader.load(trades)
+    loader.close()
 
+    if loader.failed:
+        print(f"  ✗ {len(loader.failed)} trades rejected by the database")
     print(f"\n  [LOAD] Done! Inserted {inserted} new trades.")
     return inserted
 
@@ -197,6 +141,8 @@ def main():
     parser = argparse.ArgumentParser(description="Congressional Trade Scraper V2")
     parser.add_argument("--dry-run", action="store_true", help="Preview without writing to DB")
     parser.add_argument("--limit", type=int, default=500, help="Max trades to fetch")
+    parser.add_argument("--full", action="store_true", help="Ignore the ingestion watermark")
+    parser.add_argument("--offline", action="store_true", help="Replay cached HTTP responses")
     args = parser.parse_args()
 
     print("=" * 60)
@@ -208,15 +154,34 @@ def main():
         print("\nERROR: Missing SUPABASE_URL or SUPABASE_KEY in .env")
         return
 
-    # Try Capitol Trades first (most reliable)
-    all_trades = fetch_capitol_trades(limit=args.limit)
+    if args.offline:
+        set_offline(True)
+
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    watermark = None if args.full else get_watermark(supabase, "capitol_trades")
+
+    # Try Capitol Trades first (most reliable) - skipped if the payload hasn't changed
+    responses = []
+    capitol_trades = fetch_capitol_trades(
+        limit=args.limit, skip_unchanged=not (args.full or args.dry_run), responses=responses
+    )
+    if not capitol_trades and any(r.unchanged for r in responses):
+        print("\n✓ No new filings since the last run.")
+        return
+    all_trades = filter_since_watermark(capitol_trades, watermark)
+    if len(all_trades) < len(capitol_trades):
+        print(f"  Skipping {len(capitol_trades) - len(all_trades)} filings already loaded")
 
     # Fallback: try Quiver Quant
-    if len(all_trades) < 100:
+    if len(capitol_trades) < 100:
         print("\n[INFO] Trying alternative source (Quiver Quant)...")
         quiver_trades = fetch_quiver_quant()
         all_trades.extend(quiver_trades)
 
+    if not all_trades and capitol_trades:
+        print("\n✓ No new filings since the last run.")
+        return
+
     if not all_trades:
         print("\n✗ No trades fetched from any source.")
         print("  Try running this script from your Mac (not in a restricted network)")
@@ -237,6 +202,14 @@ def main():
     # Load to database
     inserted = load_to_supabase(all_trades, dry_run=args.dry_run)
 
+    # Advance the watermark only after the load has gone through
+    high = max_disclosure_date(capitol_trades)
+    if high and not args.dry_run:
+        set_watermark(supabase, "capitol_trades", max_disclosure_date=high, rows_loaded=len(all_trades))
+    if not args.dry_run:
+        for response in responses:
+            response.mark_processed()
+
     print(f"\n✓ Finished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
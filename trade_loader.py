@@ -0,0 +1,266 @@
+"""
+Bulk Trade Loader
+Shared write path for the scrapers: upserts normalized trades on the natural
+key (ingest_schema.sql) in batches that size themselves to the connection.
+
+- Batches grow while round trips stay fast and shrink when they get slow,
+  capped by payload bytes so one request never gets too large
+- A failing batch is split in half until the bad rows are isolated - one bad
+  row in 10,000 costs ~14 extra calls, not 10,000
+- With DATABASE_URL set (direct Postgres connection string) and psycopg2
+  installed, batches go through COPY into a temp table plus one
+  INSERT ... ON CONFLICT, falling back to the REST path on error
+- load_columns() takes TradeColumns (batch_normalize.py) and encodes the COPY
+  payload straight from the columns; trade dicts are only built for REST writes
+
+Usage:
+    loader = TradeLoader(supabase, "trades")
+    loader.load(trades)          # Call repeatedly for streamed batches
+    print(loader.stats())
+"""
+
+import io
+import json
+import os
+import time
+
+from batch_normalize import LAZY_JSON_COLUMNS, TradeColumns, _encode_json
+from ingest_state import NATURAL_KEY, natural_key
+
+try:
+    import psycopg2
+except ImportError:  # Optional - only needed for the COPY path
+    psycopg2 = None
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Adaptive batch sizing
+LOADER_INITIAL_BATCH = 200
+LOADER_MIN_BATCH = 25
+LOADER_MAX_BATCH = 5000
+LOADER_TARGET_SECONDS = 2.0          # Aim for round trips about this long
+LOADER_MAX_BATCH_BYTES = 1_000_000   # Keep request bodies under ~1 MB
+
+
+class TradeLoader:
+    def __init__(self, supabase, table, ignore_duplicates=True, database_url=DATABASE_URL):
+        """
+        ignore_duplicates=True keeps rows already in the table as they are;
+        False updates them with the incoming values.
+        """
+        self.supabase = supabase
+        self.table = table
+        self.ignore_duplicates = ignore_duplicates
+        self.batch_size = LOADER_INITIAL_BATCH
+        self.row_bytes = None  # Running average JSON size of a row
+
+        self.seen = set()       # Natural keys already sent this run
+        self.inserted = 0
+        self.calls = 0
+        self.failed = []        # Rows the database rejected on their own
+
+        self._conn = None
+        if database_url and psycopg2 is not None:
+            try:
+                self._conn = psycopg2.connect(database_url)
+            except Exception as e:
+                print(f"  [LOAD] COPY disabled, could not connect ({e})")
+
+    # ---------- public ----------
+
+    def load(self, trades):
+        """Upsert trades; returns how many rows the database reported written."""
+        rows = []
+        for t in trades:
+            key = natural_key(t)
+            if key not in self.seen:
+                self.seen.add(key)
+                rows.append(t)
+
+        return self._load_slices(len(rows), lambda start, stop: rows[start:stop])
+
+    def load_columns(self, columns):
+        """
+        load() for a TradeColumns batch (batch_normalize.py). Dedupes on the key
+        columns and writes column slices - COPY encodes them without building
+        trade dicts; the REST path builds them one write batch at a time.
+        """
+        if not len(columns):
+            return 0
+
+        keep = []
+        for key in zip(*(columns[c] for c in NATURAL_KEY)):
+            fresh = key not in self.seen
+            if fresh:
+                self.seen.add(key)
+            keep.append(fresh)
+        if not all(keep):
+            columns = columns.take(keep)
+
+        return self._load_slices(len(columns), columns.slice)
+
+    def _load_slices(self, total, get_rows):
+        """
+        Write rows [0:total) in adaptively sized batches fetched via
+        get_rows(start, stop) - a list of trade dicts or a TradeColumns slice.
+        """
+        written = 0
+        i = 0
+        while i < total:
+            batch = get_rows(i, i + self.next_batch_size())
+            i += len(batch)
+
+            started = time.monotonic()
+            count = self._write(batch)
+            self._adapt(batch, time.monotonic() - started)
+            written += count
+
+        self.inserted += written
+        return written
+
+    def stats(self):
+        return {
+            "inserted": self.inserted,
+            "calls": self.calls,
+            "failed": len(self.failed),
+            "batch_size": self.batch_size,
+            "copy": self._conn is not None,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ---------- sizing ----------
+
+    def next_batch_size(self):
+        """Rows the next write will take - callers can buffer this many before calling load()."""
+        size = self.batch_size
+        if self.row_bytes:
+            size = min(size, int(LOADER_MAX_BATCH_BYTES / self.row_bytes))
+        return max(LOADER_MIN_BATCH, min(size, LOADER_MAX_BATCH))
+
+    def _adapt(self, batch, elapsed):
+        # Sample a few rows rather than serializing the whole batch again
+        sample = _as_rows(batch, 20)
+        sample_bytes = len(json.dumps(sample, default=str)) / len(sample)
+        self.row_bytes = sample_bytes if self.row_bytes is None else 0.8 * self.row_bytes + 0.2 * sample_bytes
+
+        if len(batch) < self.batch_size:
+            return  # Tail of the input - says nothing about the connection
+        if elapsed < LOADER_TARGET_SECONDS / 2:
+            self.batch_size = min(int(self.batch_size * 1.5) + 1, LOADER_MAX_BATCH)
+        elif elapsed > LOADER_TARGET_SECONDS:
+            self.batch_size = max(int(self.batch_size / 2), LOADER_MIN_BATCH)
+
+    # ---------- writing ----------
+
+    def _write(self, batch):
+        if self._conn is not None:
+            try:
+                return self._copy(batch)
+            except Exception as e:
+                self._conn.rollback()
+                print(f"  [LOAD] COPY failed ({e}), retrying batch over REST")
+        return self._upsert_bisect(_as_rows(batch))
+
+    def _upsert_bisect(self, batch):
+        """Upsert a batch; on failure split it and retry the halves."""
+        try:
+            self.calls += 1
+            result = (
+                self.supabase.table(self.table)
+                .upsert(batch, on_conflict=",".join(NATURAL_KEY), ignore_duplicates=self.ignore_duplicates)
+                .execute()
+            )
+            return len(result.data or [])
+        except Exception as e:
+            if len(batch) == 1:
+                trade = batch[0]
+                self.failed.append(trade)
+                print(f"    Skipped: {trade.get('member_name')} {trade.get('ticker')} {trade.get('trade_date')} - {e}")
+                return 0
+            mid = len(batch) // 2
+            return self._upsert_bisect(batch[:mid]) + self._upsert_bisect(batch[mid:])
+
+    def _copy(self, batch):
+        """COPY the batch into a temp table, then merge it with one INSERT ... ON CONFLICT."""
+        columns, buf = copy_payload(batch)
+        column_list = ", ".join(f'"{c}"' for c in columns)
+
+        if self.ignore_duplicates:
+            conflict = "DO NOTHING"
+        else:
+            updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in columns if c not in NATURAL_KEY)
+            conflict = f"DO UPDATE SET {updates}"
+
+        self.calls += 1
+        with self._conn.cursor() as cur:
+            # Same column types as the target, none of its constraints or defaults
+            cur.execute(
+                f"CREATE TEMP TABLE _load_{self.table} ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM public.{self.table} WITH NO DATA"
+            )
+            cur.copy_expert(
+                f"COPY _load_{self.table} ({column_list}) FROM STDIN",
+                buf,
+            )
+            cur.execute(
+                f"INSERT INTO public.{self.table} ({column_list}) "
+                f"SELECT {column_list} FROM _load_{self.table} "
+                f"ON CONFLICT ({', '.join(NATURAL_KEY)}) {conflict}"
+            )
+            written = cur.rowcount
+        self._conn.commit()
+        return written
+
+
+def copy_payload(batch):
+    """
+    (column names, buffer) in COPY's text format for a list of trade dicts or a
+    TradeColumns batch - the latter is encoded column by column, no dicts.
+    """
+    if isinstance(batch, TradeColumns):
+        columns = sorted(batch.columns)
+        # The JSON encoder escapes control characters itself - only backslashes are left
+        encoded = [
+            [_encode_json(v).replace("\\", "\\\\") for v in batch[c]] if c in LAZY_JSON_COLUMNS
+            else _copy_column(batch[c])
+            for c in columns
+        ]
+        rows = zip(*encoded)
+    else:
+        columns = sorted({column for row in batch for column in row})
+        rows = ([_copy_value(row.get(c)) for c in columns] for row in batch)
+    return columns, io.StringIO("".join("\t".join(row) + "\n" for row in rows))
+
+
+def _as_rows(batch, limit=None):
+    """Trade dicts for (the first `limit` rows of) a write batch"""
+    if isinstance(batch, TradeColumns):
+        return batch.rows(0, limit)
+    return batch[:limit]
+
+
+# Characters COPY's text format needs escaped
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_column(values):
+    """_copy_value over a column, encoding each distinct value once"""
+    try:
+        table = {v: _copy_value(v) for v in set(values)}
+    except TypeError:  # Unhashable values somewhere in the column
+        return [_copy_value(v) for v in values]
+    return [table[v] for v in values]
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif not isinstance(value, str):
+        return str(value)
+    return value.translate(_COPY_ESCAPES)